@@ -2,7 +2,8 @@
 SQLAlchemy models for ScoutConnect database tables
 """
 
-from sqlalchemy import Column, Integer, String, Date, Text, TIMESTAMP, DECIMAL, ForeignKey, Boolean, JSON
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, Text, TIMESTAMP, DECIMAL, Float, ForeignKey, Boolean, JSON, Index, DDL, event, null
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.scoutconnect.db import Base
@@ -26,6 +27,7 @@ class Player(Base):
     __tablename__ = "players"
 
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(100), unique=True, index=True)  # id in the club's roster system
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     date_of_birth = Column(Date)
@@ -34,11 +36,24 @@ class Player(Base):
     height_cm = Column(Integer)
     weight_kg = Column(Integer)
     created_at = Column(TIMESTAMP, server_default=func.now())
-    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow, index=True)
+    deleted_at = Column(TIMESTAMP, index=True)  # soft delete; purged in the background
+    block_key = Column(String(80), index=True)  # sport|soundex(last_name)|birth year, for duplicate detection
+    change_seq = Column(Integer, index=True, onupdate=null())  # change feed position; reset on write, stamped at commit
 
     # Relationships
     evaluations = relationship("Evaluation", back_populates="player")
     watchlists = relationship("Watchlist", back_populates="player")
+    rating_entry = relationship("PlayerRating", uselist=False, lazy="joined", viewonly=True)
+
+    @property
+    def rating(self):
+        return float(self.rating_entry.rating) if self.rating_entry else None
+
+    __table_args__ = (
+        # Natural key used to match roster rows that carry no external id
+        Index("uq_players_identity", "first_name", "last_name", "date_of_birth", "sport", unique=True),
+    )
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
@@ -51,12 +66,67 @@ class Evaluation(Base):
     score = Column(DECIMAL(5, 2))
     notes = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
-    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow, index=True)
+    change_seq = Column(Integer, index=True, onupdate=null())  # change feed position; reset on write, stamped at commit
 
     # Relationships
     player = relationship("Player", back_populates="evaluations")
     evaluator = relationship("User", back_populates="evaluations")
 
+    archived = False
+
+class ArchivedEvaluation(Base):
+    """Evaluations moved out of the hot table once they age past ARCHIVE_AFTER_DAYS"""
+    __tablename__ = "evaluations_archive"
+
+    id = Column(Integer, primary_key=True)
+    player_id = Column(Integer, nullable=False, index=True)
+    evaluator_id = Column(Integer)
+    sport = Column(String(50), nullable=False)
+    criteria = Column(JSON)
+    score = Column(DECIMAL(5, 2))
+    notes = Column(Text)
+    created_at = Column(TIMESTAMP, index=True)
+    updated_at = Column(TIMESTAMP)
+    archived_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow)
+
+    archived = True
+
+class PlayerRating(Base):
+    """Running rating state for a player, updated on every new evaluation"""
+    __tablename__ = "player_ratings"
+
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    rating = Column(DECIMAL(6, 2), nullable=False, index=True)
+    weighted_sum = Column(Float, nullable=False, default=0.0)  # time-decayed sum of bias-corrected scores
+    weight = Column(Float, nullable=False, default=0.0)  # time-decayed number of evaluations
+    as_of = Column(TIMESTAMP, nullable=False)  # time the decayed sums are anchored at
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class EvaluatorStats(Base):
+    """How far an evaluator's scores tend to sit from the consensus"""
+    __tablename__ = "evaluator_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    bias = Column(Float, nullable=False, default=0.0)
+    evaluations = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ScoringProfile(Base):
+    """Criterion weights used to compute evaluation scores for a sport (and optionally a position)"""
+    __tablename__ = "scoring_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sport = Column(String(50), nullable=False)
+    position = Column(String(50))  # NULL is the sport-wide default
+    weights = Column(JSON, nullable=False)  # {"criterion": weight}
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_scoring_profiles_sport_position", "sport", "position", unique=True),
+    )
+
 class Watchlist(Base):
     __tablename__ = "watchlists"
 
@@ -65,6 +135,8 @@ class Watchlist(Base):
     player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False, index=True)
     notes = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow, index=True)
+    change_seq = Column(Integer, index=True, onupdate=null())  # change feed position; reset on write, stamped at commit
 
     # Relationships
     user = relationship("User", back_populates="watchlists")
@@ -72,4 +144,40 @@ class Watchlist(Base):
 
     __table_args__ = (
         {'schema': None}
-    )
\ No newline at end of file
+    )
+
+class DeletedRecord(Base):
+    """Tombstone left behind when a synced row is deleted"""
+    __tablename__ = "deleted_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(20), nullable=False)  # 'player', 'evaluation', 'watchlist'
+    entity_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, index=True)  # owner, for watchlist entries
+    deleted_at = Column(TIMESTAMP, nullable=False, default=datetime.utcnow, index=True)
+    change_seq = Column(Integer, index=True)
+
+class ChangeCounter(Base):
+    """Single row holding the last change feed position handed out"""
+    __tablename__ = "change_counter"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+event.listen(ChangeCounter.__table__, "after_create", DDL("INSERT INTO change_counter (id, value) VALUES (1, 0)"))
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default='queued', index=True)  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    params = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    tenant = Column(String(63))  # the tenant whose database holds the job; NULL for the default database
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
@@ -0,0 +1,86 @@
+"""
+Script to add the uq_players_identity index to an existing database
+Players sharing first name, last name, birth date and sport are merged into
+the oldest live one (history moved, duplicates purged) before the unique
+index is created, since the index build fails while duplicates remain
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import database module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import engine
+from sqlalchemy import and_, create_engine, func, inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from src.scoutconnect.dedup import merge_players
+from src.scoutconnect.deletion import purge_players
+from models import Player
+
+IDENTITY_COLUMNS = ("first_name", "last_name", "date_of_birth", "sport")
+INDEX_NAME = "uq_players_identity"
+
+
+def find_identity_duplicates(db) -> list:
+    """Player ids per duplicated identity, survivor first: live rows before soft-deleted, then oldest.
+
+    Rows without a birth date never collide in a unique index, so they are skipped.
+    """
+    columns = [getattr(Player, c) for c in IDENTITY_COLUMNS]
+    groups = (
+        select(*columns)
+        .where(Player.date_of_birth.isnot(None))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Player.id, *columns)
+        .join(groups, and_(*[groups.c[c] == getattr(Player, c) for c in IDENTITY_COLUMNS]))
+        .order_by(*columns, Player.deleted_at.isnot(None), Player.id)
+        .execution_options(include_deleted=True)
+    ).all()
+
+    duplicates = {}
+    for row in rows:
+        duplicates.setdefault(tuple(row[1:]), []).append(row.id)
+    return list(duplicates.values())
+
+
+def add_identity_index(db_engine=None, dry_run: bool = False) -> dict:
+    """Merge identity duplicates, then create the unique index; returns what was done"""
+    db_engine = db_engine or engine
+    existing = {index["name"] for index in inspect(db_engine).get_indexes("players")}
+    Session = sessionmaker(bind=db_engine)
+    with Session() as db:
+        groups = find_identity_duplicates(db)
+        result = {"groups": len(groups), "merged": sum(len(ids) - 1 for ids in groups), "created": False}
+        if dry_run:
+            return result
+        for keep_id, *duplicate_ids in groups:
+            merge_players(db, keep_id, duplicate_ids)
+            # Soft-deleted rows still count toward the index, so they go for good
+            purge_players(db, duplicate_ids, pause=0)
+
+    if INDEX_NAME not in existing:
+        with db_engine.begin() as conn:
+            conn.execute(text(f"CREATE UNIQUE INDEX {INDEX_NAME} ON players ({', '.join(IDENTITY_COLUMNS)})"))
+        result["created"] = True
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate players and add the uq_players_identity index")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--dry-run", action="store_true", help="only count the duplicates")
+    args = parser.parse_args()
+
+    target = create_engine(args.database_url) if args.database_url else engine
+    result = add_identity_index(target, args.dry_run)
+    print(f"{result['groups']} duplicated identities, {result['merged']} players "
+          f"{'to merge' if args.dry_run else 'merged'}")
+    if result["created"]:
+        print(f"Created {INDEX_NAME}")
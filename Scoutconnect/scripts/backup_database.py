@@ -0,0 +1,309 @@
+"""
+Script for incremental ScoutConnect backups
+The first run writes a full export; later runs write only the rows changed
+since the previous run's watermark, as sequenced delta files. Restoring
+loads the base and applies the deltas in order
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to import database module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import engine
+from sqlalchemy import DateTime, bindparam, column, create_engine, inspect, text
+
+from scripts.export_database import (
+    EXPORT_BATCH_SIZE, EXPORT_TABLES, _text_writer, export_database, snapshot_connections, sql_literal,
+)
+from scripts.restore_database import open_dump, read_statements, restore_database
+from src.scoutconnect.loading import bulk_load
+
+BACKUP_DIR = Path(__file__).parent / "backups"
+MANIFEST = "manifest.json"
+# Rows stamped this close to the watermark are exported again, so transactions
+# that were still committing when the last backup ran are never skipped
+BACKUP_LAG_SECONDS = 60
+
+# Columns stamped when a row is written; a row changed since the watermark when any of them is newer
+CHANGE_COLUMNS = {
+    "users": ("created_at", "updated_at"),
+    "players": ("created_at", "updated_at"),
+    "evaluations": ("created_at", "updated_at"),
+    "evaluations_archive": ("archived_at", "updated_at"),
+    "scoring_profiles": ("created_at", "updated_at"),
+    "watchlists": ("created_at", "updated_at"),
+    "deleted_records": ("deleted_at",),
+}
+# Derived state whose rows vanish without a tombstone (rating rebuilds, merges). One row
+# per player or evaluator, so a delta copies the whole table whenever it changed
+REWRITTEN_TABLES = {
+    "player_ratings": ("updated_at",),
+    "evaluator_stats": ("updated_at",),
+}
+# Tombstone entity for each table; archived evaluations keep their ids, and rows moved
+# to the archive also leave evaluations
+TOMBSTONES = {
+    "players": "player", "evaluations": "evaluation", "evaluations_archive": "evaluation",
+    "watchlists": "watchlist",
+}
+# Purging a player tombstones only the player; these rows go with it
+PLAYER_CHILDREN = ("evaluations", "evaluations_archive", "watchlists")
+
+
+def read_manifest(directory):
+    """Backups made so far, oldest first"""
+    path = Path(directory) / MANIFEST
+    if not path.exists():
+        return {"files": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_manifest(directory, manifest):
+    path = Path(directory) / MANIFEST
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_watermark(conn):
+    """Newest change stamp per table"""
+    watermark = {}
+    for table in EXPORT_TABLES:
+        values = [
+            conn.execute(text(f"SELECT max({name}) AS value FROM {table}").columns(column("value", DateTime))).scalar()
+            for name in _change_columns(table)
+        ]
+        values = [value for value in values if value is not None]
+        watermark[table] = max(values).isoformat() if values else None
+    return watermark
+
+
+def read_counts(conn):
+    """Row count per table, checked after a restore"""
+    return {table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() for table in EXPORT_TABLES}
+
+
+def _change_columns(table):
+    return CHANGE_COLUMNS.get(table) or REWRITTEN_TABLES[table]
+
+
+def _since(watermark, name):
+    value = (watermark or {}).get(name)
+    if value is None:
+        return datetime.min
+    return datetime.fromisoformat(value) - timedelta(seconds=BACKUP_LAG_SECONDS)
+
+
+def _query(sql, **params):
+    """Text query whose parameters are all timestamps"""
+    return text(sql).bindparams(*[bindparam(name, value, type_=DateTime) for name, value in params.items()])
+
+
+def _changed_rows(table, watermark, columns="*"):
+    condition = " OR ".join(f"{name} > :since" for name in _change_columns(table))
+    return _query(f"SELECT {columns} FROM {table} WHERE {condition}", since=_since(watermark, table))
+
+
+def _rewritten_tables(conn, watermark, previous_rows):
+    """Derived tables that changed since the last backup: a newer stamp, or rows gone missing"""
+    tables = []
+    for table in REWRITTEN_TABLES:
+        changed = conn.execute(_changed_rows(table, watermark, "count(*)")).scalar()
+        count = conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+        if changed or count != (previous_rows or {}).get(table):
+            tables.append(table)
+    return tables
+
+
+def _write_deletes(conn, out, watermark, rewritten, batch_size):
+    """DELETEs for rows that left the database since the watermark; children first"""
+    deleted = 0
+    for table in reversed(EXPORT_TABLES):
+        if table in rewritten:
+            out.write(f"DELETE FROM {table};\n")
+            continue
+        entity = TOMBSTONES.get(table)
+        if entity is None:
+            continue
+        # A tombstoned id that exists again (restored, or a soft-deleted player) is handled by its upsert
+        queries = [("id", _query(
+            f"SELECT DISTINCT entity_id FROM deleted_records d WHERE d.entity = '{entity}' "
+            f"AND d.deleted_at > :since AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = d.entity_id)",
+            since=_since(watermark, "deleted_records"),
+        ))]
+        if table in PLAYER_CHILDREN:
+            # Rows merged into another player are upserted again afterwards
+            queries.append(("player_id", _query(
+                "SELECT DISTINCT entity_id FROM deleted_records d WHERE d.entity = 'player' "
+                "AND d.deleted_at > :since AND NOT EXISTS (SELECT 1 FROM players p WHERE p.id = d.entity_id)",
+                since=_since(watermark, "deleted_records"),
+            )))
+        if table == "evaluations":
+            queries.append(("id", _query(
+                "SELECT id FROM evaluations_archive a WHERE a.archived_at > :since "
+                "AND NOT EXISTS (SELECT 1 FROM evaluations e WHERE e.id = a.id)",
+                since=_since(watermark, "evaluations_archive"),
+            )))
+        for column, query in queries:
+            result = conn.execution_options(stream_results=True).execute(query)
+            for rows in result.partitions(batch_size):
+                out.write(f"DELETE FROM {table} WHERE {column} IN ({', '.join(str(row[0]) for row in rows)});\n")
+                deleted += len(rows)
+    return deleted
+
+
+def _write_rows(conn, out, table, query, batch_size, upsert):
+    """Multi-row INSERTs for the rows ``query`` returns; upserts on the primary key when ``upsert`` is set"""
+    result = conn.execution_options(stream_results=True).execute(query)
+    columns = list(result.keys())
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n"
+    suffix = ";\n"
+    if upsert:
+        key = inspect(conn).get_pk_constraint(table)["constrained_columns"]
+        # Same syntax on SQLite (3.24+) and Postgres
+        suffix = f"\nON CONFLICT ({', '.join(key)}) DO UPDATE SET " + ", ".join(
+            f"{name} = excluded.{name}" for name in columns if name not in key
+        ) + ";\n"
+
+    count = 0
+    for rows in result.partitions(batch_size):
+        out.write(prefix)
+        out.write(",\n".join("(" + ", ".join(map(sql_literal, row)) + ")" for row in rows))
+        out.write(suffix)
+        count += len(rows)
+    return count
+
+
+def write_delta(path, watermark, compress=False, batch_size=EXPORT_BATCH_SIZE, db_engine=None, previous_rows=None):
+    """Write the changes since ``watermark`` to ``path``; returns the new watermark and counts.
+
+    ``previous_rows`` are the row counts of the last backup, used to notice
+    derived rows that were removed.
+    """
+    db_engine = db_engine or engine
+    with open(path, "wb") as raw, snapshot_connections(db_engine, 1) as (conn,):
+        new_watermark = read_watermark(conn)
+        # Row counts in the same snapshot, checked after a restore
+        rows = read_counts(conn)
+        rewritten = _rewritten_tables(conn, watermark, previous_rows)
+        with _text_writer(raw, compress) as out:
+            out.write("-- ScoutConnect Incremental Backup\n")
+            out.write(f"-- Generated on {datetime.now().isoformat()}\n\n")
+            out.write("-- Deleted rows\n")
+            deleted = _write_deletes(conn, out, watermark, rewritten, batch_size)
+            out.write("\n-- Changed rows\n")
+            changed = 0
+            for table in EXPORT_TABLES:
+                if table in rewritten:
+                    changed += _write_rows(conn, out, table, text(f"SELECT * FROM {table}"), batch_size, upsert=False)
+                elif table not in REWRITTEN_TABLES:
+                    changed += _write_rows(conn, out, table, _changed_rows(table, watermark), batch_size, upsert=True)
+    return new_watermark, {"rows": rows, "changed": changed, "deleted": deleted}
+
+
+def backup_database(directory=None, full=False, compress=False, batch_size=EXPORT_BATCH_SIZE, db_engine=None):
+    """Add a backup to ``directory``: a full base on the first run or with ``full``, a delta otherwise.
+
+    Returns the manifest entry describing the new file.
+    """
+    db_engine = db_engine or engine
+    directory = Path(directory or BACKUP_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(directory)
+    # A base starts a new chain; earlier chains stay restorable from their files
+    previous = manifest["files"][-1] if manifest["files"] and not full else None
+
+    sequence = len(manifest["files"])
+    kind = "delta" if previous else "base"
+    name = f"{sequence:04d}-{kind}.sql" + (".gz" if compress else "")
+    tmp = directory / (name + ".tmp")
+
+    if previous:
+        watermark, details = write_delta(tmp, previous["watermark"], compress, batch_size, db_engine,
+                                         previous.get("rows"))
+    else:
+        # Read before the export starts: anything newer is in the base and simply applied again later.
+        # A count that drifts meanwhile only makes the next delta copy a derived table whole
+        with db_engine.connect() as conn:
+            watermark = read_watermark(conn)
+            details = {"rows": read_counts(conn)}
+        export_database(tmp, compress, batch_size, db_engine=db_engine)
+    os.replace(tmp, directory / name)
+
+    entry = {"sequence": sequence, "kind": kind, "file": name, "created_at": datetime.now().isoformat(),
+             "watermark": watermark, **details}
+    manifest["files"].append(entry)
+    _write_manifest(directory, manifest)
+    return entry
+
+
+def apply_delta(conn, path):
+    """Run a delta file's statements on ``conn``; the caller commits"""
+    with open_dump(path) as dump:
+        for _, statement, _ in read_statements(dump):
+            conn.exec_driver_sql(statement.strip())
+
+
+def restore_backup(directory=None, db_engine=None, replace=False):
+    """Restore the latest base in ``directory`` and apply its deltas in order; returns the row count per table.
+
+    Raises RuntimeError when the result doesn't match the counts recorded by the last delta.
+    """
+    db_engine = db_engine or engine
+    directory = Path(directory or BACKUP_DIR)
+    files = read_manifest(directory)["files"]
+    if not files:
+        raise ValueError(f"No backups in {directory}")
+
+    base = max(i for i, entry in enumerate(files) if entry["kind"] == "base")
+    counts = restore_database(directory / files[base]["file"], db_engine, replace=replace)
+    deltas = files[base + 1:]
+    if not deltas:
+        return counts
+    with bulk_load(db_engine, (), defer_indexes=False) as conn:
+        for entry in deltas:
+            # One transaction per delta, so a failure leaves the last complete state
+            apply_delta(conn, directory / entry["file"])
+            conn.commit()
+        counts = read_counts(conn)
+
+    expected = deltas[-1]["rows"]
+    mismatched = [f"{table}: backup {expected[table]}, database {counts[table]}"
+                  for table in EXPORT_TABLES if counts[table] != expected[table]]
+    if mismatched:
+        raise RuntimeError("Row counts don't match the backup: " + "; ".join(mismatched))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental ScoutConnect backups")
+    parser.add_argument("--dir", default=str(BACKUP_DIR), help="backup directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backup_parser = commands.add_parser("backup", help="write a delta, or a base on the first run")
+    backup_parser.add_argument("--full", action="store_true", help="start a new chain with a full base")
+    backup_parser.add_argument("--gzip", action="store_true", help="compress the new file")
+    restore_parser = commands.add_parser("restore", help="load the base and apply every delta")
+    restore_parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    restore_parser.add_argument("--replace", action="store_true", help="drop tables that already exist")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "backup":
+        entry = backup_database(args.dir, args.full, args.gzip)
+        summary = f"{entry['changed']} changed, {entry['deleted']} deleted rows" if entry["kind"] == "delta" else "full export"
+        print(f"Wrote {entry['file']} ({summary}) in {time.perf_counter() - started:.1f}s")
+    else:
+        target = create_engine(args.database_url) if args.database_url else engine
+        try:
+            counts = restore_backup(args.dir, target, args.replace)
+        except (ValueError, RuntimeError) as e:
+            print(f"Restore failed: {e}")
+            sys.exit(1)
+        print(f"Restored {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
@@ -11,32 +11,32 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database import engine
-from sqlalchemy import text
+from sqlalchemy import inspect
 
 def describe_table(table_name):
-    """Get table structure information using SQLite PRAGMA"""
-    with engine.connect() as conn:
-        result = conn.execute(text(f"PRAGMA table_info({table_name})"))
-        columns = result.fetchall()
+    """Get table structure information from the database catalog"""
+    inspector = inspect(engine)
+    columns = inspector.get_columns(table_name)
 
-        if not columns:
-            return f"Table '{table_name}' not found or empty."
+    if not columns:
+        return f"Table '{table_name}' not found or empty."
 
-        output = f"\n=== TABLE: {table_name.upper()} ===\n"
-        output += f"{'Column':<20} {'Type':<15} {'Not Null':<10} {'Default':<15} {'Primary Key':<12}\n"
-        output += "-" * 75 + "\n"
+    primary_key = set(inspector.get_pk_constraint(table_name)["constrained_columns"])
 
-        for col in columns:
-            cid, name, type_, notnull, default, pk = col
-            output += f"{name:<20} {type_:<15} {bool(notnull):<10} {str(default):<15} {bool(pk):<12}\n"
+    output = f"\n=== TABLE: {table_name.upper()} ===\n"
+    output += f"{'Column':<20} {'Type':<15} {'Not Null':<10} {'Default':<15} {'Primary Key':<12}\n"
+    output += "-" * 75 + "\n"
 
-        return output
+    for col in columns:
+        type_ = col["type"].compile(dialect=engine.dialect)
+        not_null = not col["nullable"]
+        output += f"{col['name']:<20} {type_:<15} {not_null:<10} {str(col['default']):<15} {col['name'] in primary_key:<12}\n"
+
+    return output
 
 def get_table_list():
     """Get list of all tables in the database"""
-    with engine.connect() as conn:
-        result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"))
-        return [row[0] for row in result.fetchall()]
+    return inspect(engine).get_table_names()
 
 def generate_describe_documentation():
     """Generate documentation for all tables"""
@@ -44,7 +44,7 @@ def generate_describe_documentation():
 
     documentation = "SCOUTCONNECT DATABASE TABLE STRUCTURES\n"
     documentation += "=" * 50 + "\n"
-    documentation += f"Generated using SQLite PRAGMA table_info()\n"
+    documentation += f"Generated from the {engine.dialect.name} catalog via SQLAlchemy inspection\n"
     documentation += f"Found {len(tables)} tables: {', '.join(tables)}\n\n"
 
     for table in tables:
@@ -0,0 +1,287 @@
+"""
+Script to export ScoutConnect tables as typed columnar files for analytics
+Writes Parquet when pyarrow is installed, otherwise one NumPy .npy file per
+column plus schema.json. Evaluation criteria become one float column per
+criterion, and .npy columns load memory-mapped, without parsing or copying
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import database module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import engine
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, Numeric, text
+import models  # registers the table definitions the column types come from
+from src.scoutconnect.db import Base
+from src.scoutconnect.scoring import criteria_matrix
+from scripts.export_database import EXPORT_TABLES, snapshot_connections
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+DEFAULT_OUTPUT = Path(__file__).parent / "snapshot"
+SCHEMA_FILE = "schema.json"
+COLUMNAR_CHUNK_ROWS = 100000
+# Credentials have no place in an analytics copy
+EXCLUDED_COLUMNS = {("users", "password_hash")}
+CRITERIA_PREFIX = "criteria_"
+
+CRITERIA_KEYS = {
+    "sqlite": "SELECT DISTINCT j.key FROM {table}, json_each({table}.{column}) AS j",
+    "postgresql": "SELECT DISTINCT json_object_keys({column}::json) FROM {table}",
+}
+
+NUMPY_TYPES = {"int": "int64", "float": "float64", "bool": "bool", "datetime": "datetime64[us]", "date": "datetime64[D]"}
+
+
+def column_kind(column):
+    """Storage kind for a model column"""
+    type_ = column.type
+    if isinstance(type_, Boolean):
+        return "bool"
+    if isinstance(type_, Integer):
+        return "int"
+    if isinstance(type_, (Float, Numeric)):
+        return "float"
+    if isinstance(type_, DateTime):
+        return "datetime"
+    if isinstance(type_, Date):
+        return "date"
+    if isinstance(type_, JSON):
+        return "json"
+    return "string"
+
+
+def criteria_names(conn, table, column):
+    """Every criterion used in ``table.column``, sorted"""
+    query = CRITERIA_KEYS.get(conn.dialect.name)
+    if query:
+        keys = conn.execute(text(query.format(table=table, column=column))).scalars()
+    else:
+        keys = set()
+        for (value,) in conn.execute(text(f"SELECT {column} FROM {table}")):
+            value = json.loads(value) if isinstance(value, str) else value
+            keys.update(value or {})
+    return sorted(key for key in keys if isinstance(key, str))
+
+
+def _convert(kind, values):
+    """Typed array for one column of a chunk, plus a null mask where the type has no null value"""
+    count = len(values)
+    if kind in ("int", "bool"):
+        mask = np.fromiter((value is None for value in values), dtype=bool, count=count)
+        data = np.fromiter((value or 0 for value in values), dtype=NUMPY_TYPES[kind], count=count)
+        return data, mask
+    if kind == "float":
+        # NaN is the float null
+        return np.array([np.nan if value is None else float(value) for value in values], dtype="float64"), None
+    if kind in ("datetime", "date"):
+        # None becomes NaT; SQLite's text timestamps parse directly
+        return np.array(values, dtype=NUMPY_TYPES[kind]), None
+    if kind == "json":
+        return [None if value is None else value if isinstance(value, str) else json.dumps(value)
+                for value in values], None
+    return list(values), None
+
+
+def read_chunks(conn, table, columns, criteria, chunk_rows=COLUMNAR_CHUNK_ROWS):
+    """Yield ``{name: (data, mask)}`` chunks of ``table`` in key order, criteria spread over their own columns"""
+    names = [name for name, _ in columns if name not in criteria] + (["criteria"] if criteria else [])
+    kinds = dict(columns)
+    key = ", ".join(c.name for c in Base.metadata.tables[table].primary_key)
+    result = conn.execution_options(stream_results=True).execute(
+        text(f"SELECT {', '.join(names)} FROM {table} ORDER BY {key}")
+    )
+    for rows in result.partitions(chunk_rows):
+        values = dict(zip(names, zip(*rows)))
+        chunk = {name: _convert(kinds[name], values[name]) for name in names if name != "criteria"}
+        if criteria:
+            parsed = [json.loads(value) if isinstance(value, str) else value for value in values["criteria"]]
+            matrix = criteria_matrix(parsed, [name[len(CRITERIA_PREFIX):] for name in criteria])
+            for i, name in enumerate(criteria):
+                chunk[name] = (np.ascontiguousarray(matrix[:, i]), None)
+        yield chunk
+
+
+class NumpyWriter:
+    """One .npy file per column, filled chunk by chunk through a memory map.
+
+    Strings are dictionary-encoded: int32 codes (-1 for NULL) plus the
+    distinct values as UTF-8 bytes and offsets. Nullable integers and
+    booleans get a separate mask file.
+    """
+
+    def __init__(self, directory, table, columns, rows, nullable=()):
+        self.directory = directory / table
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.columns = columns
+        self.rows = rows
+        self.offset = 0
+        self.arrays, self.masks, self.dictionaries = {}, {}, {}
+        for name, kind in columns:
+            if kind in ("string", "json"):
+                self.arrays[name] = self._memmap(f"{name}.codes", "int32")
+                self.dictionaries[name] = {}
+            else:
+                self.arrays[name] = self._memmap(name, NUMPY_TYPES[kind])
+                if kind in ("int", "bool") and name in nullable:
+                    self.masks[name] = self._memmap(f"{name}.mask", "bool")
+
+    def _memmap(self, name, dtype):
+        return np.lib.format.open_memmap(self.directory / f"{name}.npy", mode="w+", dtype=dtype, shape=(self.rows,))
+
+    def write(self, chunk):
+        end = None
+        for name, (data, mask) in chunk.items():
+            end = self.offset + len(data)
+            if name in self.dictionaries:
+                index = self.dictionaries[name]
+                data = np.fromiter((-1 if value is None else index.setdefault(value, len(index)) for value in data),
+                                   dtype="int32", count=len(data))
+            self.arrays[name][self.offset:end] = data
+            if name in self.masks:
+                self.masks[name][self.offset:end] = mask
+        self.offset = end if end is not None else self.offset
+
+    def close(self):
+        for array in (*self.arrays.values(), *self.masks.values()):
+            array.flush()
+        schema = []
+        for name, kind in self.columns:
+            if name in self.dictionaries:
+                encoded = [value.encode("utf-8") for value in self.dictionaries[name]]
+                offsets = np.zeros(len(encoded) + 1, dtype="int64")
+                np.cumsum([len(value) for value in encoded], out=offsets[1:])
+                np.save(self.directory / f"{name}.offsets.npy", offsets)
+                np.save(self.directory / f"{name}.values.npy", np.frombuffer(b"".join(encoded), dtype="uint8"))
+                files = {"codes": f"{name}.codes.npy", "offsets": f"{name}.offsets.npy", "values": f"{name}.values.npy"}
+            else:
+                files = {"data": f"{name}.npy"}
+                if name in self.masks:
+                    files["mask"] = f"{name}.mask.npy"
+            schema.append({"name": name, "type": kind, "files": files})
+        return {"rows": self.rows, "path": self.directory.name, "columns": schema}
+
+
+class ParquetWriter:
+    """A Parquet file per table, one row group per chunk"""
+
+    ARROW_TYPES = {"int": "int64", "float": "float64", "bool": "bool_", "string": "string", "json": "string",
+                   "date": "date32"}
+
+    def __init__(self, directory, table, columns, rows, nullable=()):
+        self.path = directory / f"{table}.parquet"
+        self.columns = columns
+        self.rows = rows
+        self.types = {
+            name: pa.timestamp("us") if kind == "datetime" else getattr(pa, self.ARROW_TYPES[kind])()
+            for name, kind in columns
+        }
+        self.schema = pa.schema([pa.field(name, self.types[name], nullable=name in nullable) for name, _ in columns])
+        self.writer = pq.ParquetWriter(self.path, self.schema)
+
+    def write(self, chunk):
+        arrays = [
+            pa.array(chunk[name][0], type=self.types[name], mask=chunk[name][1], from_pandas=True)
+            for name, _ in self.columns
+        ]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        return {"rows": self.rows, "path": self.path.name,
+                "columns": [{"name": name, "type": kind} for name, kind in self.columns]}
+
+
+def export_columnar(output_dir=None, fmt="auto", chunk_rows=COLUMNAR_CHUNK_ROWS, tables=None, db_engine=None):
+    """Snapshot ``tables`` into ``output_dir`` as Parquet or NumPy columns; returns the schema written"""
+    db_engine = db_engine or engine
+    output_dir = Path(output_dir or DEFAULT_OUTPUT)
+    tables = tables or EXPORT_TABLES
+    if fmt == "auto":
+        fmt = "parquet" if pa is not None else "numpy"
+    if fmt == "parquet" and pa is None:
+        raise ValueError("Parquet output needs pyarrow; install it or use --format numpy")
+    writer_class = ParquetWriter if fmt == "parquet" else NumpyWriter
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    schema = {"format": fmt, "generated_at": datetime.now().isoformat(), "tables": {}}
+    # Every table from the same snapshot, so the files agree with each other
+    with snapshot_connections(db_engine, 1) as (conn,):
+        for table in tables:
+            model_columns = [c for c in Base.metadata.tables[table].columns if (table, c.name) not in EXCLUDED_COLUMNS]
+            columns = [(c.name, column_kind(c)) for c in model_columns if c.name != "criteria"]
+            criteria = []
+            if any(c.name == "criteria" for c in model_columns):
+                criteria = [CRITERIA_PREFIX + name for name in criteria_names(conn, table, "criteria")]
+                columns += [(name, "float") for name in criteria]
+            rows = conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+            nullable = {c.name for c in model_columns if c.nullable} | set(criteria)
+            writer = writer_class(output_dir, table, columns, rows, nullable)
+            for chunk in read_chunks(conn, table, columns, criteria, chunk_rows):
+                writer.write(chunk)
+            schema["tables"][table] = writer.close()
+
+    (output_dir / SCHEMA_FILE).write_text(json.dumps(schema, indent=2), encoding="utf-8")
+    return schema
+
+
+def load_table(directory, table):
+    """Open one table of a snapshot.
+
+    Parquet snapshots come back as a memory-mapped pyarrow Table. NumPy
+    snapshots come back as a dict of arrays memory-mapped from disk; string
+    columns are decoded from their dictionary (each distinct value once),
+    and nullable integers and booleans become masked arrays.
+    """
+    directory = Path(directory)
+    schema = json.loads((directory / SCHEMA_FILE).read_text(encoding="utf-8"))
+    entry = schema["tables"][table]
+    if schema["format"] == "parquet":
+        return pq.read_table(directory / entry["path"], memory_map=True)
+
+    path = directory / entry["path"]
+    columns = {}
+    for column in entry["columns"]:
+        files = column["files"]
+        if "codes" in files:
+            codes = np.load(path / files["codes"], mmap_mode="r")
+            offsets = np.load(path / files["offsets"])
+            data = np.load(path / files["values"]).tobytes()
+            values = np.array([data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+                              + [None], dtype=object)
+            # Code -1 picks the trailing None
+            columns[column["name"]] = values[codes]
+        else:
+            data = np.load(path / files["data"], mmap_mode="r")
+            if "mask" in files:
+                data = np.ma.masked_array(data, mask=np.load(path / files["mask"], mmap_mode="r"))
+            columns[column["name"]] = data
+    return columns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export ScoutConnect tables as columnar files for analytics")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="output directory")
+    parser.add_argument("--format", choices=["auto", "parquet", "numpy"], default="auto",
+                        help="parquet needs pyarrow; auto picks it when installed")
+    parser.add_argument("--chunk-rows", type=int, default=COLUMNAR_CHUNK_ROWS, help="rows read per batch")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = export_columnar(args.output, args.format, args.chunk_rows)
+    for table, entry in result["tables"].items():
+        print(f"  {table:<12} {entry['rows']:>10} rows  {len(entry['columns']):>3} columns")
+    print(f"Wrote a {result['format']} snapshot to {args.output} in {time.perf_counter() - started:.1f}s")
@@ -1,123 +1,283 @@
 """
 Script to export ScoutConnect database to SQL file
 Includes both schema creation and data insertion statements
+Rows are streamed to the file in multi-row INSERT batches (COPY blocks on
+Postgres), so memory stays flat however large the database is; tables are
+exported concurrently from one consistent snapshot
 """
 
-import os
+import argparse
+import gzip
+import io
+import json
+import queue
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, time
 
 # Add parent directory to path to import database module
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database import engine
-from sqlalchemy import text, inspect
+from sqlalchemy import inspect, text
 
-def export_table_schema(table_name):
+# Parents before children, so the dump restores with foreign keys enforced.
+# jobs is left out: queued work belongs to the running deployment, not to a backup.
+# change_counter is too: the change feed raises it past the restored change_seq values
+EXPORT_TABLES = [
+    'users', 'players', 'evaluations', 'evaluations_archive', 'scoring_profiles', 'watchlists',
+    'player_ratings', 'evaluator_stats', 'deleted_records',
+]
+EXPORT_BATCH_SIZE = 500  # rows per INSERT statement
+EXPORT_GZIP_LEVEL = 6
+DEFAULT_OUTPUT = Path(__file__).parent / "scoutconnect_export.sql"
+
+
+def _column_type(conn, column):
+    """Declared type; Postgres serial keys become SERIAL again instead of a nextval() default"""
+    type_ = column["type"].compile(dialect=conn.dialect)
+    default = column["default"]
+    if conn.dialect.name == "postgresql" and default and default.startswith("nextval(") and column.get("autoincrement"):
+        return {"INTEGER": "SERIAL", "BIGINT": "BIGSERIAL", "SMALLINT": "SMALLSERIAL"}.get(type_, type_), None
+    return type_, default
+
+
+def export_table_schema(conn, table_name):
     """Export CREATE TABLE statement for a table"""
-    with engine.connect() as conn:
-        # Get table info
-        result = conn.execute(text(f"PRAGMA table_info({table_name})"))
-        columns = result.fetchall()
-
-        # Get foreign keys
-        fk_result = conn.execute(text(f"PRAGMA foreign_key_list({table_name})"))
-        foreign_keys = fk_result.fetchall()
-
-        # Build CREATE TABLE statement
-        create_stmt = f"CREATE TABLE {table_name} (\n"
-
-        col_defs = []
-        for col in columns:
-            cid, name, type_, notnull, default, pk = col
-            col_def = f"    {name} {type_}"
-            if notnull:
-                col_def += " NOT NULL"
-            if default is not None:
-                col_def += f" DEFAULT {default}"
-            if pk:
-                col_def += " PRIMARY KEY"
-            col_defs.append(col_def)
-
-        # Add foreign keys
-        for fk in foreign_keys:
-            id_, seq, table, from_col, to_col, on_update, on_delete, match = fk
-            fk_def = f"    FOREIGN KEY ({from_col}) REFERENCES {table} ({to_col})"
-            if on_delete != "NO ACTION":
-                fk_def += f" ON DELETE {on_delete}"
-            if on_update != "NO ACTION":
-                fk_def += f" ON UPDATE {on_update}"
-            col_defs.append(fk_def)
-
-        create_stmt += ",\n".join(col_defs)
-        create_stmt += "\n);\n\n"
-
-        return create_stmt
-
-def export_table_data(table_name):
-    """Export INSERT statements for table data"""
-    with engine.connect() as conn:
-        # Get all data from table
-        result = conn.execute(text(f"SELECT * FROM {table_name}"))
-        rows = result.fetchall()
-
-        if not rows:
-            return ""
-
-        # Get column names
-        column_names = result.keys()
-
-        insert_stmts = []
-        for row in rows:
-            values = []
-            for value in row:
-                if value is None:
-                    values.append("NULL")
-                elif isinstance(value, str):
-                    # Escape single quotes
-                    escaped_value = value.replace("'", "''")
-                    values.append(f"'{escaped_value}'")
-                elif isinstance(value, datetime):
-                    values.append(f"'{value.isoformat()}'")
-                else:
-                    values.append(str(value))
-
-            values_str = ", ".join(values)
-            insert_stmt = f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({values_str});"
-            insert_stmts.append(insert_stmt)
-
-        return "\n".join(insert_stmts) + "\n\n"
-
-def export_database():
-    """Export complete database to SQL file"""
-    tables = ['users', 'players', 'evaluations', 'watchlists']
-
-    export_content = "-- ScoutConnect Database Export\n"
-    export_content += f"-- Generated on {datetime.now().isoformat()}\n\n"
-    export_content += "-- Schema\n\n"
-
-    # Export schema
-    for table in tables:
-        export_content += export_table_schema(table)
-
-    export_content += "-- Data\n\n"
-
-    # Export data
-    for table in tables:
-        export_content += f"-- Data for {table}\n"
-        export_content += export_table_data(table)
-
-    # Save to file
-    output_file = Path(__file__).parent / "scoutconnect_export.sql"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(export_content)
+    inspector = inspect(conn)
+    primary_key = set(inspector.get_pk_constraint(table_name)["constrained_columns"])
+    foreign_keys = inspector.get_foreign_keys(table_name)
+    if conn.dialect.name == "sqlite":
+        # PRAGMA foreign_key_list numbers keys from the last declared; earlier exports used that order
+        foreign_keys.reverse()
+
+    # Build CREATE TABLE statement
+    create_stmt = f"CREATE TABLE {table_name} (\n"
+
+    col_defs = []
+    for column in inspector.get_columns(table_name):
+        type_, default = _column_type(conn, column)
+        col_def = f"    {column['name']} {type_}"
+        if not column["nullable"]:
+            col_def += " NOT NULL"
+        if default is not None:
+            col_def += f" DEFAULT {default}"
+        if column["name"] in primary_key:
+            col_def += " PRIMARY KEY"
+        col_defs.append(col_def)
+
+    # Add foreign keys
+    for fk in foreign_keys:
+        fk_def = (f"    FOREIGN KEY ({', '.join(fk['constrained_columns'])}) "
+                  f"REFERENCES {fk['referred_table']} ({', '.join(fk['referred_columns'])})")
+        options = fk.get("options", {})
+        if options.get("ondelete"):
+            fk_def += f" ON DELETE {options['ondelete']}"
+        if options.get("onupdate"):
+            fk_def += f" ON UPDATE {options['onupdate']}"
+        col_defs.append(fk_def)
+
+    create_stmt += ",\n".join(col_defs)
+    create_stmt += "\n);\n\n"
+
+    return create_stmt
+
+
+def _quote(value):
+    # Escape single quotes
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _literal(value):
+    if isinstance(value, (datetime, date, time)):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, (dict, list)):
+        return _quote(json.dumps(value))
+    return str(value)
+
+
+# Looked up by exact type first: this runs once per exported value
+_LITERALS = {
+    str: _quote, int: str, float: str,
+    bool: lambda value: "TRUE" if value else "FALSE",
+    type(None): lambda value: "NULL",
+}
+
+
+def sql_literal(value):
+    """Render a value as an SQL literal"""
+    return _LITERALS.get(type(value), _literal)(value)
+
+
+def copy_table_data(conn, table_name, out):
+    """Stream a Postgres table to ``out`` as a ``COPY ... FROM stdin`` block; returns the row count
+
+    The server formats the rows itself, which is far faster than building
+    INSERT statements in Python. psql restores the block as written.
+    """
+    columns = ", ".join(column["name"] for column in inspect(conn).get_columns(table_name))
+    out.write(f"COPY {table_name} ({columns}) FROM stdin;\n")
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table_name} ({columns}) TO STDOUT", out)
+        count = cursor.rowcount
+    finally:
+        cursor.close()
+    out.write("\\.\n")
+    # Rows keep their ids, so move the serial sequences past them
+    for column in inspect(conn).get_columns(table_name):
+        if _column_type(conn, column)[0].endswith("SERIAL"):
+            name = column["name"]
+            out.write(f"SELECT setval(pg_get_serial_sequence('{table_name}', '{name}'), "
+                      f"coalesce(max({name}), 0) + 1, false) FROM {table_name};\n")
+    out.write("\n")
+    return count
+
+
+def export_table_data(conn, table_name, out, batch_size=EXPORT_BATCH_SIZE):
+    """Stream multi-row INSERT statements for a table to ``out``; returns the row count"""
+    if conn.dialect.name == "postgresql":
+        return copy_table_data(conn, table_name, out)
+    # Rows are fetched a batch at a time instead of all at once
+    result = conn.execution_options(stream_results=True).execute(text(f"SELECT * FROM {table_name}"))
+    prefix = f"INSERT INTO {table_name} ({', '.join(result.keys())}) VALUES\n"
+
+    count = 0
+    for rows in result.partitions(batch_size):
+        out.write(prefix)
+        out.write(",\n".join("(" + ", ".join(map(sql_literal, row)) + ")" for row in rows))
+        out.write(";\n")
+        count += len(rows)
+    if count:
+        out.write("\n")
+    return count
+
+
+@contextmanager
+def snapshot_connections(db_engine, count):
+    """Yield ``count`` connections that all read the same committed state.
+
+    Postgres readers import one exported snapshot. On SQLite a write lock is
+    held while the readers open their transactions, so nothing can commit in
+    between. Other databases get a single connection.
+    """
+    dialect = db_engine.dialect.name
+    with ExitStack() as stack:
+        if dialect == "postgresql":
+            leader = stack.enter_context(db_engine.connect()).execution_options(isolation_level="REPEATABLE READ")
+            snapshot = leader.execute(text("SELECT pg_export_snapshot()")).scalar()
+            connections = []
+            for _ in range(count):
+                conn = stack.enter_context(db_engine.connect()).execution_options(isolation_level="REPEATABLE READ")
+                conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+                connections.append(conn)
+        elif dialect == "sqlite":
+            # Transactions are managed by hand: the driver would not begin one for a SELECT
+            leader = stack.enter_context(db_engine.connect()).execution_options(isolation_level="AUTOCOMMIT")
+            leader.exec_driver_sql("BEGIN IMMEDIATE")
+            connections = []
+            try:
+                for _ in range(count):
+                    conn = stack.enter_context(db_engine.connect()).execution_options(isolation_level="AUTOCOMMIT")
+                    stack.callback(conn.exec_driver_sql, "ROLLBACK")
+                    conn.exec_driver_sql("BEGIN")
+                    # The first read fixes what this transaction sees
+                    conn.exec_driver_sql("SELECT count(*) FROM sqlite_master").scalar()
+                    connections.append(conn)
+            finally:
+                leader.exec_driver_sql("ROLLBACK")
+        else:
+            connections = [stack.enter_context(db_engine.connect())]
+        yield connections
+
+
+@contextmanager
+def _text_writer(raw, compress):
+    """Text stream over the binary file ``raw``, which stays open afterwards.
+
+    Each compressed section is a complete gzip member; members concatenate
+    into a valid gzip file, so sections written in parallel can be joined
+    with a plain byte copy.
+    """
+    stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=EXPORT_GZIP_LEVEL) if compress else raw
+    out = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+    try:
+        yield out
+    finally:
+        if compress:
+            out.close()
+        else:
+            out.flush()
+            out.detach()
+
+
+def export_database(output_file=None, compress=False, batch_size=EXPORT_BATCH_SIZE, workers=None,
+                    tables=None, db_engine=None):
+    """Export complete database to SQL file, gzip-compressed when ``compress`` is set"""
+    db_engine = db_engine or engine
+    tables = tables or EXPORT_TABLES
+    if output_file is None:
+        output_file = DEFAULT_OUTPUT.with_suffix(".sql.gz") if compress else DEFAULT_OUTPUT
+    output_file = Path(output_file)
+    workers = max(1, min(workers or len(tables), len(tables)))
+
+    with open(output_file, "wb") as raw, snapshot_connections(db_engine, workers) as connections:
+        with _text_writer(raw, compress) as out:
+            out.write("-- ScoutConnect Database Export\n")
+            out.write(f"-- Generated on {datetime.now().isoformat()}\n\n")
+            out.write("-- Schema\n\n")
+            # Export schema
+            for table in tables:
+                out.write(export_table_schema(connections[0], table))
+            out.write("-- Data\n\n")
+
+        # Each table is spooled to its own temporary file by whichever connection is free,
+        # then the files are appended in table order
+        free = queue.Queue()
+        for conn in connections:
+            free.put(conn)
+
+        def export_table(table):
+            conn = free.get()
+            spool = tempfile.TemporaryFile(dir=output_file.parent)
+            try:
+                with _text_writer(spool, compress) as section:
+                    section.write(f"-- Data for {table}\n")
+                    rows = export_table_data(conn, table, section, batch_size)
+            except BaseException:
+                spool.close()
+                raise
+            finally:
+                free.put(conn)
+            return spool, rows
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=len(connections), thread_name_prefix="export") as pool:
+            futures = [pool.submit(export_table, table) for table in tables]
+            for future in futures:
+                spool, rows = future.result()
+                with spool:
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, raw)
+                total += rows
 
     print(f"Database export completed: {output_file}")
-    print(f"Exported {len(tables)} tables with schema and data")
+    print(f"Exported {len(tables)} tables with schema and data ({total} rows)")
     return output_file
 
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the ScoutConnect database to an SQL file")
+    parser.add_argument("--output", help=f"output path (default: {DEFAULT_OUTPUT.name}[.gz])")
+    parser.add_argument("--gzip", action="store_true", help="compress the export")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows per INSERT statement")
+    parser.add_argument("--workers", type=int, help="tables exported at once (default: one per table)")
+    args = parser.parse_args()
+
     print("Exporting ScoutConnect database...")
-    export_file = export_database()
-    print(f"Export saved to: {export_file}")
\ No newline at end of file
+    export_file = export_database(args.output, args.gzip, args.batch_size, args.workers)
+    print(f"Export saved to: {export_file}")
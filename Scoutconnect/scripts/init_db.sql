@@ -22,6 +22,7 @@ CREATE TABLE users (
 -- Players table
 CREATE TABLE players (
     id SERIAL PRIMARY KEY,
+    external_id VARCHAR(100) UNIQUE, -- id in the club's roster system
     first_name VARCHAR(50) NOT NULL,
     last_name VARCHAR(50) NOT NULL,
     date_of_birth DATE,
@@ -30,7 +31,10 @@ CREATE TABLE players (
     height_cm INTEGER,
     weight_kg INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    deleted_at TIMESTAMP, -- soft delete; purged in the background
+    block_key VARCHAR(80), -- sport|soundex(last_name)|birth year, for duplicate detection
+    change_seq INTEGER -- change feed position; reset on write, stamped at commit
 );
 
 -- Evaluations table
@@ -43,9 +47,53 @@ CREATE TABLE evaluations (
     score DECIMAL(5,2),
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    change_seq INTEGER
+);
+
+-- Archive for evaluations older than ARCHIVE_AFTER_DAYS
+CREATE TABLE evaluations_archive (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL,
+    evaluator_id INTEGER,
+    sport VARCHAR(50) NOT NULL,
+    criteria JSONB,
+    score DECIMAL(5,2),
+    notes TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Running player ratings (bias-corrected, time-decayed)
+CREATE TABLE player_ratings (
+    player_id INTEGER PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+    rating DECIMAL(6,2) NOT NULL,
+    weighted_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    weight DOUBLE PRECISION NOT NULL DEFAULT 0,
+    as_of TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-evaluator scoring bias
+CREATE TABLE evaluator_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    bias DOUBLE PRECISION NOT NULL DEFAULT 0,
+    evaluations INTEGER NOT NULL DEFAULT 0,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Scoring weight profiles per sport (position NULL is the sport default)
+CREATE TABLE scoring_profiles (
+    id SERIAL PRIMARY KEY,
+    sport VARCHAR(50) NOT NULL,
+    position VARCHAR(50),
+    weights JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(sport, position)
+);
+
 -- Watchlists table
 CREATE TABLE watchlists (
     id SERIAL PRIMARY KEY,
@@ -53,14 +101,64 @@ CREATE TABLE watchlists (
     player_id INTEGER REFERENCES players(id) ON DELETE CASCADE,
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    change_seq INTEGER,
     UNIQUE(user_id, player_id)
 );
 
+-- Tombstones for deleted rows, read by the change feed
+CREATE TABLE deleted_records (
+    id SERIAL PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL, -- 'player', 'evaluation', 'watchlist'
+    entity_id INTEGER NOT NULL,
+    user_id INTEGER,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    change_seq INTEGER
+);
+
+-- Last change feed position handed out
+CREATE TABLE change_counter (
+    id INTEGER PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO change_counter (id, value) VALUES (1, 0);
+
+-- Background jobs table
+CREATE TABLE jobs (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    params JSONB,
+    result JSONB,
+    error TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    tenant VARCHAR(63),
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
 -- Indexes for performance
 CREATE INDEX idx_players_sport ON players(sport);
+CREATE UNIQUE INDEX uq_players_identity ON players(first_name, last_name, date_of_birth, sport);
 CREATE INDEX idx_evaluations_player_id ON evaluations(player_id);
 CREATE INDEX idx_evaluations_evaluator_id ON evaluations(evaluator_id);
 CREATE INDEX idx_watchlists_user_id ON watchlists(user_id);
+CREATE INDEX idx_jobs_status ON jobs(status);
+CREATE INDEX idx_players_updated_at ON players(updated_at);
+CREATE INDEX idx_players_deleted_at ON players(deleted_at);
+CREATE INDEX idx_players_block_key ON players(block_key);
+CREATE INDEX idx_evaluations_updated_at ON evaluations(updated_at);
+CREATE INDEX idx_watchlists_updated_at ON watchlists(updated_at);
+CREATE INDEX idx_deleted_records_deleted_at ON deleted_records(deleted_at);
+CREATE INDEX idx_players_change_seq ON players(change_seq);
+CREATE INDEX idx_evaluations_change_seq ON evaluations(change_seq);
+CREATE INDEX idx_watchlists_change_seq ON watchlists(change_seq);
+CREATE INDEX idx_deleted_records_change_seq ON deleted_records(change_seq);
+CREATE INDEX idx_evaluations_archive_player_id ON evaluations_archive(player_id);
+CREATE INDEX idx_evaluations_archive_created_at ON evaluations_archive(created_at);
+CREATE INDEX idx_player_ratings_rating ON player_ratings(rating);
 
 -- Insert sample data (optional)
 -- INSERT INTO users (username, email, password_hash, role) VALUES ('admin', 'admin@scoutconnect.com', 'hashed_password', 'admin');
\ No newline at end of file
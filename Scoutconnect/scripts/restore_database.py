@@ -0,0 +1,201 @@
+"""
+Script to restore a ScoutConnect SQL export
+Reads the dump as a stream, merges its INSERTs into large statements and
+transactions with relaxed durability, builds indexes once the rows are in
+and checks every table's row count against the dump
+"""
+
+import argparse
+import gzip
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import database module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import engine
+from sqlalchemy import create_engine, inspect, text
+import models  # registers the tables whose indexes are rebuilt
+from src.scoutconnect.db import Base
+from src.scoutconnect.loading import bulk_load
+
+RESTORE_BATCH_ROWS = 5000  # rows per INSERT after merging
+RESTORE_COMMIT_ROWS = 250000  # rows per transaction
+DEFAULT_INPUT = Path(__file__).parent / "scoutconnect_export.sql"
+
+_TABLE = re.compile(r"(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|COPY|CREATE\s+TABLE)\s+(\w+)", re.IGNORECASE)
+
+
+def open_dump(path):
+    """Text stream over a dump, gzip-compressed or not"""
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    # newline="\n" keeps carriage returns inside string values intact
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8", newline="\n")
+    return open(path, encoding="utf-8", newline="\n")
+
+
+def read_statements(lines, copy_chunk=RESTORE_BATCH_ROWS):
+    """Split a dump into statements, holding only one in memory at a time.
+
+    Yields ``("statement", sql, rows)``, where ``rows`` counts the value
+    tuples of an INSERT, and ``("copy", header, data_lines)`` chunks for
+    COPY blocks. Quotes are tracked per line, so semicolons and newlines
+    inside string values don't end a statement.
+    """
+    buffer, rows, quoted = [], 0, False
+    copy, data = None, []
+    for line in lines:
+        if copy is not None:
+            if line.rstrip("\n") == "\\.":
+                if data:
+                    yield "copy", copy, data
+                copy, data = None, []
+            else:
+                data.append(line)
+                if len(data) >= copy_chunk:
+                    yield "copy", copy, data
+                    data = []
+            continue
+
+        if not buffer:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("--"):
+                continue
+            if stripped.startswith("COPY ") and stripped.endswith("FROM stdin;"):
+                copy = stripped[:-1]
+                continue
+            if stripped.upper().startswith("INSERT"):
+                # One-row statements carry their values on the first line, batches on the lines after
+                rows = 1 if line.partition(" VALUES")[2].strip() else 0
+        elif not quoted and line.startswith("("):
+            rows += 1
+        buffer.append(line)
+        if line.count("'") % 2:
+            quoted = not quoted
+        if not quoted and line.rstrip().endswith(";"):
+            yield "statement", "".join(buffer), rows
+            buffer, rows = [], 0
+    if buffer:
+        raise ValueError("Dump ends in the middle of a statement")
+
+
+def _create_indexes(conn, tables):
+    """Build the app's indexes on restored tables whose columns are all there"""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if {column.name for column in index.columns} <= columns:
+                index.create(conn, checkfirst=True)
+
+
+def restore_database(input_file=None, db_engine=None, replace=False, batch_rows=RESTORE_BATCH_ROWS,
+                     commit_rows=RESTORE_COMMIT_ROWS):
+    """Load a dump made by export_database.py; returns the row count per table.
+
+    Tables in the dump must not exist yet unless ``replace`` is set, which
+    drops them first. Raises RuntimeError when a table ends up with a
+    different number of rows than the dump holds.
+    """
+    db_engine = db_engine or engine
+    input_file = Path(input_file or DEFAULT_INPUT)
+    postgres = db_engine.dialect.name == "postgresql"
+    expected = {}
+
+    # Tables are created bare by the dump, so every index is built after the load
+    with bulk_load(db_engine, (), defer_indexes=False) as conn:
+        existing = set(inspect(conn).get_table_names())
+        prefix, bodies, pending, uncommitted = None, [], 0, 0
+
+        def flush():
+            nonlocal prefix, bodies, pending, uncommitted
+            if bodies:
+                conn.exec_driver_sql(prefix + " VALUES\n" + ",\n".join(bodies) + ";")
+                uncommitted += pending
+            prefix, bodies, pending = None, [], 0
+            if uncommitted >= commit_rows:
+                conn.commit()
+                uncommitted = 0
+
+        with open_dump(input_file) as dump:
+            for kind, sql, rows in read_statements(dump):
+                match = _TABLE.match(sql.lstrip())
+                table = match.group(1) if match else None
+
+                if kind == "copy":
+                    if not postgres:
+                        raise ValueError(f"{input_file.name} holds COPY data, which only PostgreSQL can restore")
+                    flush()
+                    cursor = conn.connection.cursor()
+                    cursor.copy_expert(sql, io.StringIO("".join(rows)))
+                    cursor.close()
+                    expected[table] = expected.get(table, 0) + len(rows)
+                    uncommitted += len(rows)
+                    continue
+
+                statement = sql.strip()
+                if rows:
+                    # Consecutive INSERTs into the same columns become one statement
+                    head, _, values = statement.partition(" VALUES")
+                    if head != prefix or pending + rows > batch_rows:
+                        flush()
+                        prefix = head
+                    bodies.append(values.strip().rstrip(";").rstrip())
+                    pending += rows
+                    expected[table] = expected.get(table, 0) + rows
+                    if pending >= batch_rows:
+                        flush()
+                    continue
+
+                flush()
+                if statement.upper().startswith("SELECT SETVAL") and not postgres:
+                    continue
+                if statement.upper().startswith("CREATE TABLE"):
+                    expected.setdefault(table, 0)
+                    if table in existing:
+                        if not replace:
+                            raise ValueError(f"Table {table} already exists; pass --replace to drop it")
+                        conn.exec_driver_sql(f"DROP TABLE {table}" + (" CASCADE" if postgres else ""))
+                conn.exec_driver_sql(statement)
+        flush()
+        conn.commit()
+
+        _create_indexes(conn, expected)
+        conn.commit()
+        counts = {table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() for table in expected}
+
+    mismatched = [f"{table}: dump {expected[table]}, database {counts[table]}"
+                  for table in expected if counts[table] != expected[table]]
+    if mismatched:
+        raise RuntimeError("Row counts don't match the dump: " + "; ".join(mismatched))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Restore a ScoutConnect SQL export")
+    parser.add_argument("input", nargs="?", default=str(DEFAULT_INPUT), help="dump to load, plain or gzip")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--replace", action="store_true", help="drop tables that already exist")
+    parser.add_argument("--batch-rows", type=int, default=RESTORE_BATCH_ROWS, help="rows per INSERT")
+    parser.add_argument("--commit-rows", type=int, default=RESTORE_COMMIT_ROWS, help="rows per transaction")
+    args = parser.parse_args()
+
+    target = create_engine(args.database_url) if args.database_url else engine
+    print(f"Restoring {args.input}...")
+    started = time.perf_counter()
+    try:
+        counts = restore_database(args.input, target, args.replace, args.batch_rows, args.commit_rows)
+    except (ValueError, RuntimeError) as e:
+        print(f"Restore failed: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f"  {table:<20} {count:>10} rows")
+    print(f"Restored {sum(counts.values())} rows in {elapsed:.1f}s; row counts match the dump")
@@ -0,0 +1,72 @@
+"""
+ScoutConnect command line
+python -m src.scoutconnect serve [--host HOST] [--port PORT] [--workers N]
+python -m src.scoutconnect generate [--users N] [--players N] [--evaluations N] [--watchlists N] [--reset]
+python -m src.scoutconnect provision TENANT
+"""
+
+import argparse
+import logging
+import os
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scoutconnect", description="ScoutConnect command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the production API server")
+    serve_parser.add_argument("--host", help="bind address (SERVER_HOST)")
+    serve_parser.add_argument("--port", type=int, help="bind port (PORT)")
+    serve_parser.add_argument("--workers", type=int, help="worker processes (WEB_CONCURRENCY, default: cores)")
+
+    generate_parser = commands.add_parser("generate", help="load a deterministic synthetic dataset")
+    generate_parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./scoutconnect.db"))
+    generate_parser.add_argument("--users", type=int, default=1000)
+    generate_parser.add_argument("--players", type=int, default=100000)
+    generate_parser.add_argument("--evaluations", type=int, default=1000000)
+    generate_parser.add_argument("--watchlists", type=int, default=50000)
+    generate_parser.add_argument("--seed", type=int, default=42)
+    generate_parser.add_argument("--batch-size", type=int, help="rows per INSERT batch (GENERATE_BATCH_SIZE)")
+    generate_parser.add_argument("--reset", action="store_true", help="empty every table first")
+    generate_parser.add_argument("--ratings", action="store_true", help="rebuild player ratings afterwards")
+
+    provision_parser = commands.add_parser("provision", help="create a tenant's database or schema (MULTI_TENANT)")
+    provision_parser.add_argument("tenant", help="tenant name, as sent in X-Tenant")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "serve":
+        from .server import serve
+        serve(args.host, args.port, args.workers)
+    elif args.command == "generate":
+        generate(args)
+    elif args.command == "provision":
+        from .tenants import tenant_registry
+        tenant = args.tenant.lower()
+        tenant_registry.provision(tenant)
+        tenant_registry.dispose()
+        print(f"Provisioned tenant {tenant}")
+
+
+def generate(args):
+    import time
+    from sqlalchemy import create_engine
+    from .synthetic import generate, GENERATE_BATCH_SIZE
+
+    def progress(table, rows, seconds):
+        print(f"{table:<12} {rows:>10,} rows  {seconds:7.2f}s  {rows / max(seconds, 1e-9):>12,.0f} rows/s")
+
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    counts = generate(
+        engine, args.users, args.players, args.evaluations, args.watchlists, seed=args.seed,
+        reset=args.reset, ratings=args.ratings, batch_size=args.batch_size or GENERATE_BATCH_SIZE, progress=progress,
+    )
+    total = sum(v for k, v in counts.items() if k != "ratings")
+    print(f"{'total':<12} {total:>10,} rows  {time.perf_counter() - started:7.2f}s (including index builds)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
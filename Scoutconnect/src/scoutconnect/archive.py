@@ -0,0 +1,100 @@
+"""
+Time-based archival of old evaluations
+Keeps the hot evaluations table (and its indexes) down to recent seasons while
+reads that reach further back transparently include the archive
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from .jobs import job_session, register_job
+from .projection import evaluation_columns
+from models import Evaluation, ArchivedEvaluation
+
+# Roughly the current and previous season
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "730"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+ARCHIVED_COLUMNS = [
+    "id", "player_id", "evaluator_id", "sport", "criteria",
+    "score", "notes", "created_at", "updated_at",
+]
+
+
+def archive_evaluations(db: Session, older_than: Optional[datetime] = None,
+                        batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move evaluations created before ``older_than`` into the archive table"""
+    if older_than is None:
+        older_than = datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(Evaluation.id).where(Evaluation.created_at < older_than).order_by(Evaluation.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        source = select(
+            *[getattr(Evaluation, c) for c in ARCHIVED_COLUMNS], literal(datetime.utcnow())
+        ).where(Evaluation.id.in_(ids))
+        db.execute(insert(ArchivedEvaluation).from_select(ARCHIVED_COLUMNS + ["archived_at"], source))
+        db.execute(delete(Evaluation).where(Evaluation.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def archive_horizon(db: Session) -> Optional[datetime]:
+    """Newest created_at in the archive, or None when nothing is archived"""
+    return db.query(func.max(ArchivedEvaluation.created_at)).scalar()
+
+
+def list_player_evaluations(db: Session, player_id: int, since: Optional[datetime] = None,
+                            until: Optional[datetime] = None, skip: int = 0, limit: int = 100,
+                            fields: Optional[List[str]] = None) -> List:
+    """Evaluations for a player, newest first, reading the archive only when the range reaches it.
+
+    With ``fields`` only those columns are selected and dicts are returned instead of models.
+    """
+    def in_range(model):
+        if fields is None:
+            query = db.query(model)
+        else:
+            # Sort keys ride along and are dropped again below
+            query = db.query(*evaluation_columns(model, fields),
+                             model.created_at.label("sort_created_at"), model.id.label("sort_id"))
+        query = query.filter(model.player_id == player_id)
+        if since is not None:
+            query = query.filter(model.created_at >= since)
+        if until is not None:
+            query = query.filter(model.created_at < until)
+        return query.order_by(model.created_at.desc(), model.id.desc()).limit(skip + limit)
+
+    def sort_key(row):
+        if fields is None:
+            return row.created_at or datetime.min, row.id
+        return row.sort_created_at or datetime.min, row.sort_id
+
+    rows = in_range(Evaluation).all()
+    # Archived rows are older than the hot ones, so a full hot page only needs
+    # them when it reaches back past the horizon; a short one when the range does
+    boundary = sort_key(rows[-1])[0] if rows and len(rows) >= skip + limit else since
+    horizon = archive_horizon(db)
+    if horizon is not None and (boundary is None or boundary <= horizon):
+        rows += in_range(ArchivedEvaluation).all()
+        rows.sort(key=sort_key, reverse=True)
+    rows = rows[skip:skip + limit]
+    if fields is None:
+        return rows
+    return [{name: row._mapping[name] for name in fields} for row in rows]
+
+
+@register_job("archive_evaluations", limit=1)
+def archive_evaluations_job(params: dict) -> dict:
+    """Background archival run; ``older_than_days`` overrides ARCHIVE_AFTER_DAYS"""
+    days = params.get("older_than_days", ARCHIVE_AFTER_DAYS)
+    with job_session(params) as db:
+        moved = archive_evaluations(db, datetime.utcnow() - timedelta(days=days))
+    return {"archived": moved}
@@ -0,0 +1,328 @@
+"""
+Transactional batch operations
+A list of create/update/delete operations on players, evaluations and watchlist
+entries runs in one transaction with a single commit. Operations apply in
+request order; consecutive operations of the same kind run as one set-based
+statement. Nothing is committed unless every operation succeeds.
+"""
+
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .changes import record_deletes
+from .db import begin_transaction
+from .dedup import blocking_key
+from .players import refresh_block_keys, IDENTITY_FIELDS
+from .ratings import apply_evaluation
+from .scoring import resolve_profile, compute_score
+from models import User, Player, Evaluation, Watchlist
+
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "1000"))
+
+PLAYER_ROLES = ("admin", "coach")
+EVALUATOR_ROLES = ("admin", "coach", "scout")
+
+CONFLICT_DETAIL = {
+    "player": "Player already exists",
+    "evaluation": "Evaluation conflicts with existing data",
+    "watchlist": "Player already on watchlist",
+}
+NOT_FOUND_DETAIL = {
+    "player": "Player not found",
+    "evaluation": "Evaluation not found",
+    "watchlist": "Watchlist entry not found",
+}
+
+players = Player.__table__
+evaluations = Evaluation.__table__
+watchlists = Watchlist.__table__
+
+Item = Tuple[int, Optional[int], dict]  # (index in the request, target id, validated data)
+
+
+def _result(index: int, status: int, id: Optional[int] = None, error: Optional[str] = None) -> dict:
+    return {"index": index, "status": status, "id": id, "error": error}
+
+
+def _patch_groups(items: List[Item]) -> Dict[str, List[Item]]:
+    """Group updates carrying the same patch so each group is one UPDATE ... WHERE id IN"""
+    groups = defaultdict(list)
+    for item in items:
+        groups[json.dumps(item[2], sort_keys=True, default=str)].append(item)
+    return groups
+
+
+# --- Players ---
+
+def _create_players(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    if user.role not in PLAYER_ROLES:
+        return {i: _result(i, 403, error="Only admins and coaches can perform this action") for i, _, _ in items}
+    rows = [
+        {**data, "block_key": blocking_key(data.get("sport"), data.get("last_name"), data.get("date_of_birth"))}
+        for _, _, data in items
+    ]
+    ids = db.execute(insert(players).returning(players.c.id, sort_by_parameter_order=True), rows).scalars().all()
+    return {i: _result(i, 201, id=player_id) for (i, _, _), player_id in zip(items, ids)}
+
+
+def _update_players(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    if user.role not in PLAYER_ROLES:
+        return {i: _result(i, 403, error="Only admins and coaches can perform this action") for i, _, _ in items}
+    results = {}
+    now = datetime.utcnow()
+    moved = set()
+    for group in _patch_groups(items).values():
+        ids = [player_id for _, player_id, _ in group]
+        patch = group[0][2]
+        updated = set(db.execute(
+            update(players)
+            .where(players.c.id.in_(ids), players.c.deleted_at.is_(None))
+            .values(**patch, updated_at=now)
+            .returning(players.c.id)
+        ).scalars())
+        if any(field in patch for field in IDENTITY_FIELDS):
+            moved |= updated
+        for i, player_id, _ in group:
+            results[i] = _result(i, 200, id=player_id) if player_id in updated else \
+                _result(i, 404, id=player_id, error=NOT_FOUND_DETAIL["player"])
+    refresh_block_keys(db, moved)
+    return results
+
+
+def _delete_players(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    if user.role not in PLAYER_ROLES:
+        return {i: _result(i, 403, error="Only admins and coaches can perform this action") for i, _, _ in items}
+    now = datetime.utcnow()
+    deleted = set(db.execute(
+        update(players)
+        .where(players.c.id.in_([player_id for _, player_id, _ in items]), players.c.deleted_at.is_(None))
+        .values(deleted_at=now, updated_at=now)
+        .returning(players.c.id)
+    ).scalars())
+    record_deletes(db, "player", [(player_id, None) for player_id in deleted], now)
+    return {
+        i: _result(i, 204, id=player_id) if player_id in deleted else
+        _result(i, 404, id=player_id, error=NOT_FOUND_DETAIL["player"])
+        for i, player_id, _ in items
+    }
+
+
+# --- Evaluations ---
+
+def _create_evaluations(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    if user.role not in EVALUATOR_ROLES:
+        return {i: _result(i, 403, error="Only admins, coaches and scouts can submit evaluations") for i, _, _ in items}
+    player_ids = {data["player_id"] for _, _, data in items}
+    found = {row.id: row for row in db.query(Player.id, Player.sport, Player.position).filter(Player.id.in_(player_ids))}
+    profiles = {}
+    results, created = {}, []
+    for i, _, data in items:
+        player = found.get(data["player_id"])
+        if player is None:
+            results[i] = _result(i, 404, error=NOT_FOUND_DETAIL["player"])
+            continue
+        data = {**data, "sport": data["sport"] or player.sport}
+        if data["criteria"]:
+            key = (data["sport"], player.position)
+            if key not in profiles:
+                profiles[key] = resolve_profile(db, *key)
+            data["score"] = compute_score(data["criteria"], profiles[key].weights if profiles[key] else None)
+        evaluation = Evaluation(**data, evaluator_id=user.id)
+        db.add(evaluation)
+        # Ratings fold evaluations in one at a time, so this part cannot be set-based
+        apply_evaluation(db, player.id, user.id, evaluation.score)
+        created.append((i, evaluation))
+    db.flush()
+    results.update({i: _result(i, 201, id=evaluation.id) for i, evaluation in created})
+    return results
+
+
+def _owned_evaluations(db: Session, user: User, items: List[Item]) -> Tuple[set, Dict[int, dict]]:
+    """Evaluations the caller may change: their own, or any for admins"""
+    rows = dict(db.execute(
+        select(evaluations.c.id, evaluations.c.evaluator_id)
+        .where(evaluations.c.id.in_([evaluation_id for _, evaluation_id, _ in items]))
+    ).all())
+    allowed, refused = set(), {}
+    for i, evaluation_id, _ in items:
+        if evaluation_id not in rows:
+            refused[i] = _result(i, 404, id=evaluation_id, error=NOT_FOUND_DETAIL["evaluation"])
+        elif user.role != "admin" and rows[evaluation_id] != user.id:
+            refused[i] = _result(i, 403, id=evaluation_id, error="Only the evaluator or an admin can change an evaluation")
+        else:
+            allowed.add(evaluation_id)
+    return allowed, refused
+
+
+def _update_evaluations(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    allowed, results = _owned_evaluations(db, user, items)
+    now = datetime.utcnow()
+    for group in _patch_groups([item for item in items if item[1] in allowed]).values():
+        ids = [evaluation_id for _, evaluation_id, _ in group]
+        db.execute(update(evaluations).where(evaluations.c.id.in_(ids)).values(**group[0][2], updated_at=now))
+        results.update({i: _result(i, 200, id=evaluation_id) for i, evaluation_id, _ in group})
+    return results
+
+
+def _delete_evaluations(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    allowed, results = _owned_evaluations(db, user, items)
+    if allowed:
+        now = datetime.utcnow()
+        deleted = db.execute(
+            delete(evaluations).where(evaluations.c.id.in_(allowed)).returning(evaluations.c.id)
+        ).scalars().all()
+        record_deletes(db, "evaluation", [(evaluation_id, None) for evaluation_id in deleted], now)
+    results.update({i: _result(i, 204, id=evaluation_id) for i, evaluation_id, _ in items if i not in results})
+    return results
+
+
+# --- Watchlists ---
+
+def _create_watchlists(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    player_ids = {data["player_id"] for _, _, data in items}
+    live = set(db.execute(
+        select(players.c.id).where(players.c.id.in_(player_ids), players.c.deleted_at.is_(None))
+    ).scalars())
+    watched = set(db.execute(
+        select(watchlists.c.player_id).where(watchlists.c.user_id == user.id, watchlists.c.player_id.in_(player_ids))
+    ).scalars())
+    results, rows = {}, []
+    for i, _, data in items:
+        if data["player_id"] not in live:
+            results[i] = _result(i, 404, error=NOT_FOUND_DETAIL["player"])
+        elif data["player_id"] in watched:
+            results[i] = _result(i, 400, error=CONFLICT_DETAIL["watchlist"])
+        else:
+            watched.add(data["player_id"])
+            rows.append((i, {"user_id": user.id, "player_id": data["player_id"], "notes": data.get("notes")}))
+    if rows:
+        ids = db.execute(
+            insert(watchlists).returning(watchlists.c.id, sort_by_parameter_order=True), [row for _, row in rows]
+        ).scalars().all()
+        results.update({i: _result(i, 201, id=entry_id) for (i, _), entry_id in zip(rows, ids)})
+    return results
+
+
+def _update_watchlists(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    results = {}
+    now = datetime.utcnow()
+    for group in _patch_groups(items).values():
+        updated = set(db.execute(
+            update(watchlists)
+            .where(watchlists.c.id.in_([entry_id for _, entry_id, _ in group]), watchlists.c.user_id == user.id)
+            .values(**group[0][2], updated_at=now)
+            .returning(watchlists.c.id)
+        ).scalars())
+        for i, entry_id, _ in group:
+            results[i] = _result(i, 200, id=entry_id) if entry_id in updated else \
+                _result(i, 404, id=entry_id, error=NOT_FOUND_DETAIL["watchlist"])
+    return results
+
+
+def _delete_watchlists(db: Session, user: User, items: List[Item]) -> Dict[int, dict]:
+    now = datetime.utcnow()
+    deleted = set(db.execute(
+        delete(watchlists)
+        .where(watchlists.c.id.in_([entry_id for _, entry_id, _ in items]), watchlists.c.user_id == user.id)
+        .returning(watchlists.c.id)
+    ).scalars())
+    record_deletes(db, "watchlist", [(entry_id, user.id) for entry_id in deleted], now)
+    return {
+        i: _result(i, 204, id=entry_id) if entry_id in deleted else
+        _result(i, 404, id=entry_id, error=NOT_FOUND_DETAIL["watchlist"])
+        for i, entry_id, _ in items
+    }
+
+
+HANDLERS = {
+    ("create", "player"): _create_players,
+    ("create", "evaluation"): _create_evaluations,
+    ("create", "watchlist"): _create_watchlists,
+    ("update", "player"): _update_players,
+    ("update", "evaluation"): _update_evaluations,
+    ("update", "watchlist"): _update_watchlists,
+    ("delete", "player"): _delete_players,
+    ("delete", "evaluation"): _delete_evaluations,
+    ("delete", "watchlist"): _delete_watchlists,
+}
+
+
+def _run_group(db: Session, user: User, key: Tuple[str, str], items: List[Item]) -> Dict[int, dict]:
+    handler = HANDLERS[key]
+    try:
+        with db.begin_nested():
+            return handler(db, user, items)
+    except IntegrityError:
+        if len(items) == 1:
+            return {items[0][0]: _result(items[0][0], 400, id=items[0][1], error=CONFLICT_DETAIL[key[1]])}
+    # The set-based statement failed as a whole; replay it op by op to find the culprits
+    results = {}
+    for item in items:
+        results.update(_run_group(db, user, key, [item]))
+    return results
+
+
+def run_batch(db: Session, user: User, operations: List[dict], schemas: dict) -> dict:
+    """Apply ``operations`` atomically, in order, and return one result per operation.
+
+    Each operation is ``{"op", "entity", "id", "data"}``; ``schemas`` maps
+    ``(entity, op)`` to the pydantic model that validates its data. When any
+    operation fails the whole batch is rolled back and the operations that
+    would have succeeded report 424. Invalid operations fail the batch before
+    any SQL runs.
+    """
+    results: Dict[int, dict] = {}
+    # Consecutive operations of one kind form a run; a run ends early when an
+    # id repeats, since grouping by patch could otherwise reorder that row's writes
+    runs: List[Tuple[Tuple[str, str], List[Item]]] = []
+    for i, operation in enumerate(operations):
+        key = (operation["op"], operation["entity"])
+        if key not in HANDLERS:
+            results[i] = _result(i, 400, error=f"Unsupported operation: {operation['op']} {operation['entity']}")
+            continue
+        if key[0] != "create" and operation.get("id") is None:
+            results[i] = _result(i, 400, error="id is required")
+            continue
+        data = {}
+        schema = schemas.get((key[1], key[0]))
+        if schema is not None:
+            try:
+                parsed = schema(**(operation.get("data") or {}))
+            except ValidationError as e:
+                results[i] = _result(i, 422, id=operation.get("id"), error=str(e))
+                continue
+            data = parsed.dict() if key[0] == "create" else parsed.dict(exclude_unset=True)
+            if key[0] == "update" and not data:
+                results[i] = _result(i, 400, id=operation["id"], error="Nothing to update")
+                continue
+        item = (i, operation.get("id"), data)
+        if runs and runs[-1][0] == key and (item[1] is None or item[1] not in {t for _, t, _ in runs[-1][1]}):
+            runs[-1][1].append(item)
+        else:
+            runs.append((key, [item]))
+
+    if not results:
+        begin_transaction(db)
+        for key, items in runs:
+            results.update(_run_group(db, user, key, items))
+
+    committed = all(r["status"] < 400 for r in results.values())
+    if committed:
+        db.commit()
+    else:
+        db.rollback()
+    ordered = []
+    for i, operation in enumerate(operations):
+        result = results.get(i) or _result(i, 424, id=operation.get("id"))
+        if not committed and result["status"] < 400 or result["status"] == 424:
+            result.update(status=424, error="Not applied: another operation in the batch failed")
+        ordered.append({**result, "op": operation["op"], "entity": operation["entity"]})
+    return {"committed": committed, "results": ordered}
@@ -0,0 +1,87 @@
+"""
+Set-based bulk player updates and deletes
+A filter (sport, position, age range, ids) selects players and the whole change
+runs as one UPDATE ... WHERE; deletes are soft deletes with change-feed
+tombstones.
+"""
+
+from datetime import date, datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .changes import record_deletes
+from .players import refresh_block_keys, IDENTITY_FIELDS
+from models import Player
+
+players = Player.__table__
+
+
+def _years_before(day: date, years: int) -> date:
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a non-leap year
+        return day.replace(year=day.year - years, day=28)
+
+
+def player_filter(sport: Optional[str] = None, position: Optional[str] = None,
+                  min_age: Optional[int] = None, max_age: Optional[int] = None,
+                  ids: Optional[Sequence[int]] = None, today: Optional[date] = None) -> list:
+    """WHERE conditions for live players matching every given criterion.
+
+    Ages are whole years on ``today``; players without a birth date never match
+    an age bound. Raises ValueError when no criterion is given, so a bulk write
+    can't touch the whole table by accident.
+    """
+    conditions = []
+    if sport is not None:
+        conditions.append(players.c.sport == sport)
+    if position is not None:
+        conditions.append(players.c.position == position)
+    today = today or date.today()
+    if min_age is not None:
+        conditions.append(players.c.date_of_birth <= _years_before(today, min_age))
+    if max_age is not None:
+        conditions.append(players.c.date_of_birth > _years_before(today, max_age + 1))
+    if ids is not None:
+        conditions.append(players.c.id.in_(list(ids)))
+    if not conditions:
+        raise ValueError("At least one filter is required")
+    return [*conditions, players.c.deleted_at.is_(None)]
+
+
+def count_players(db: Session, conditions: list) -> int:
+    return db.execute(select(func.count()).select_from(players).where(*conditions)).scalar_one()
+
+
+def bulk_update_players(db: Session, conditions: list, patch: dict, dry_run: bool = False) -> dict:
+    """Apply ``patch`` to every matching player in one UPDATE and commit.
+
+    With ``dry_run`` only the number of matching players is returned.
+    """
+    if not patch:
+        raise ValueError("Nothing to update")
+    if dry_run:
+        return {"matched": count_players(db, conditions), "dry_run": True}
+    ids = db.execute(
+        update(players).where(*conditions).values(**patch, updated_at=datetime.utcnow()).returning(players.c.id)
+    ).scalars().all()
+    if any(field in patch for field in IDENTITY_FIELDS):
+        refresh_block_keys(db, ids)
+    db.commit()
+    return {"matched": len(ids), "dry_run": False}
+
+
+def bulk_delete_players(db: Session, conditions: list, dry_run: bool = False) -> dict:
+    """Soft-delete every matching player in one UPDATE, tombstone them and commit"""
+    if dry_run:
+        return {"matched": count_players(db, conditions), "dry_run": True}
+    now = datetime.utcnow()
+    ids = db.execute(
+        update(players).where(*conditions).values(deleted_at=now, updated_at=now).returning(players.c.id)
+    ).scalars().all()
+    record_deletes(db, "player", [(player_id, None) for player_id in ids], now)
+    db.commit()
+    return {"matched": len(ids), "dry_run": False}
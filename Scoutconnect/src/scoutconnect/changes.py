@@ -0,0 +1,193 @@
+"""
+Incremental change feed for offline clients
+Clients send back the cursor from their last sync and only receive the delta
+
+Every write to a synced row resets its ``change_seq`` to NULL, and the writing
+transaction stamps its rows with the next counter value just before it
+commits. Positions follow commit order: a row committed after a client synced
+always lands past that client's cursor, however long its transaction ran.
+Reading the feed writes nothing.
+"""
+
+import os
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, event, func, insert, or_, select, union_all, update
+from sqlalchemy.orm import Session
+
+from models import Player, Evaluation, Watchlist, DeletedRecord, ChangeCounter, User
+
+CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", "1000"))
+
+ENTITY_NAMES = {Player: "player", Evaluation: "evaluation", Watchlist: "watchlist"}
+
+# Feed sections in cursor order; a cursor is (change_seq, section, id)
+SECTIONS = (("players", Player), ("evaluations", Evaluation), ("watchlists", Watchlist), ("deleted", DeletedRecord))
+SYNCED_TABLES = {model.__table__ for _, model in SECTIONS}
+
+# session.info key: synced tables the open transaction wrote to
+PENDING_TABLES = "change_feed_tables"
+
+
+def _note_writes(session, tables: Iterable) -> None:
+    tables = SYNCED_TABLES.intersection(tables)
+    if tables:
+        session.info.setdefault(PENDING_TABLES, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def record_orm_deletes(session, flush_context):
+    """Leave a tombstone for every synced row deleted through the ORM"""
+    now = datetime.utcnow()
+    tombstones = [
+        {
+            "entity": ENTITY_NAMES[type(obj)],
+            "entity_id": obj.id,
+            "user_id": obj.user_id if isinstance(obj, Watchlist) else None,
+            "deleted_at": now,
+        }
+        for obj in session.deleted
+        if type(obj) in ENTITY_NAMES
+    ]
+    if tombstones:
+        session.connection().execute(insert(DeletedRecord), tombstones)
+        _note_writes(session, [DeletedRecord.__table__])
+
+
+@event.listens_for(Session, "after_flush")
+def note_flushed_writes(session, flush_context):
+    written = [*session.new, *session.dirty]
+    _note_writes(session, [getattr(type(obj), "__table__", None) for obj in written])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def note_statement_writes(state):
+    """Track INSERT and UPDATE statements run through the session, which the flush never sees"""
+    if state.is_insert or state.is_update:
+        _note_writes(state.session, [getattr(state.statement, "table", None)])
+
+
+@event.listens_for(Session, "before_commit")
+def sequence_on_commit(session):
+    """Stamp the rows this transaction wrote just before it commits"""
+    session.flush()
+    tables = session.info.pop(PENDING_TABLES, None)
+    if tables:
+        stamp_changes(session.connection(), tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_writes(session):
+    session.info.pop(PENDING_TABLES, None)
+
+
+def record_deletes(db: Session, entity: str, rows, deleted_at: Optional[datetime] = None) -> None:
+    """Tombstones for rows removed by Core statements, which the after_flush hook never sees.
+
+    ``rows`` are ``(entity_id, user_id)`` pairs.
+    """
+    deleted_at = deleted_at or datetime.utcnow()
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "user_id": user_id, "deleted_at": deleted_at}
+        for entity_id, user_id in rows
+    ]
+    if rows:
+        db.execute(insert(DeletedRecord), rows)
+
+
+def _highest_stamped():
+    """Highest ``change_seq`` in any synced table, read from the indexes"""
+    positions = union_all(*[
+        select(func.max(model.__table__.c.change_seq).label("seq")) for _, model in SECTIONS
+    ]).subquery()
+    return select(func.coalesce(func.max(positions.c.seq), 0)).scalar_subquery()
+
+
+def stamp_changes(connection, tables: Optional[Iterable] = None) -> int:
+    """Give unstamped rows of ``tables`` (default: every synced table) the next feed position.
+
+    Runs in the writing transaction right before it commits. The UPDATE that
+    bumps the counter locks its row until then, so writers commit in position
+    order and every lower position is visible once a higher one is. Returns
+    the position handed out.
+    """
+    counter = ChangeCounter.__table__
+    # A restored database can carry positions past its counter
+    floor = _highest_stamped()
+    value = connection.execute(
+        update(counter).where(counter.c.id == 1)
+        .values(value=case((counter.c.value > floor, counter.c.value), else_=floor) + 1)
+        .returning(counter.c.value)
+    ).scalar()
+    if value is None:
+        value = connection.execute(insert(counter).values(id=1, value=floor + 1).returning(counter.c.value)).scalar()
+
+    for _, model in SECTIONS:
+        table = model.__table__
+        if tables is not None and table not in tables:
+            continue
+        # Keep updated_at as it is: stamping is not a change to the row
+        unchanged = {c.name: c for c in table.c if c.onupdate is not None and c.name != "change_seq"}
+        connection.execute(
+            update(table).where(table.c.change_seq.is_(None)).values(change_seq=value, **unchanged)
+        )
+    return value
+
+
+def parse_cursor(cursor: str) -> tuple:
+    """Split a cursor from :func:`get_changes`; raises ValueError when it is malformed"""
+    try:
+        seq, section, row_id = (int(part) for part in cursor.split("."))
+    except ValueError:
+        seq = section = -1
+    if seq < 0 or not 0 <= section <= len(SECTIONS):
+        raise ValueError(f"invalid cursor {cursor!r}")
+    return seq, section, row_id
+
+
+def _after(model, section: int, position: tuple):
+    """Rows of ``section`` that sort after ``position``"""
+    seq, cursor_section, row_id = position
+    if section > cursor_section:
+        return model.change_seq >= seq
+    if section == cursor_section:
+        return or_(model.change_seq > seq, and_(model.change_seq == seq, model.id > row_id))
+    return model.change_seq > seq
+
+
+def get_changes(db: Session, user: User, since: Optional[str] = None, limit: int = CHANGES_PAGE_SIZE) -> dict:
+    """Return up to ``limit`` rows changed after the cursor ``since`` plus tombstones for deletes.
+
+    Without a cursor this is a full sync and no tombstones are sent. Pass
+    ``next_cursor`` back to continue; ``has_more`` says another page is ready
+    now. The cursor never moves backwards.
+    """
+    position = parse_cursor(since) if since else (0, -1, 0)
+    # Rows stamped after this are left for the next call, so a page never skips past them
+    high = db.execute(select(_highest_stamped())).scalar()
+
+    rows = []
+    for section, (name, model) in enumerate(SECTIONS):
+        if model is DeletedRecord and since is None:
+            continue
+        # Nothing commits here to expire rows the session already holds, so refresh them
+        query = db.query(model).populate_existing().filter(model.change_seq <= high, _after(model, section, position))
+        if model is Watchlist:
+            query = query.filter(Watchlist.user_id == user.id)
+        elif model is DeletedRecord:
+            query = query.filter(or_(DeletedRecord.entity != "watchlist", DeletedRecord.user_id == user.id))
+        for row in query.order_by(model.change_seq, model.id).limit(limit + 1):
+            rows.append(((row.change_seq, section, row.id), name, row))
+
+    rows.sort(key=lambda entry: entry[0])
+    page, has_more = rows[:limit], len(rows) > limit
+    if has_more:
+        last = page[-1][0]
+    else:
+        last = (max(high, position[0]), len(SECTIONS), 0)
+
+    feed = {name: [] for name, _ in SECTIONS}
+    for _, name, row in page:
+        feed[name].append(row)
+    return {"next_cursor": ".".join(str(part) for part in last), "has_more": has_more, **feed}
@@ -9,11 +9,26 @@ load_dotenv()
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./scoutconnect.db")
 
+# Log every statement while developing; production turns this off
+SQL_ECHO = os.getenv("SQL_ECHO", "true").lower() in ("1", "true", "yes")
+
 # Create engine
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO)
 
 # Session maker for database connections
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
+
+
+def begin_transaction(db) -> None:
+    """Open the driver's transaction before the first SAVEPOINT.
+
+    pysqlite only sends BEGIN ahead of INSERT/UPDATE/DELETE, so a SAVEPOINT
+    issued first becomes the outermost transaction and releasing it commits
+    on the spot. Other drivers already run inside a transaction.
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
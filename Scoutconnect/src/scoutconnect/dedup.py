@@ -0,0 +1,217 @@
+"""
+Duplicate player detection and merging
+Players are grouped by a blocking key (sport + phonetic last name + birth year)
+stored on the row, so only players inside the same block are ever compared
+"""
+
+import logging
+import os
+import unicodedata
+from datetime import datetime
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import List, Optional
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from .deletion import soft_delete_player
+from .jobs import job_session, register_job
+from .ratings import merge_player_ratings
+from models import Player, Evaluation, ArchivedEvaluation, Watchlist, DeletedRecord
+
+logger = logging.getLogger(__name__)
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", "10000"))
+# Blocks bigger than this are almost always common surnames; only their first
+# players are compared and the block is listed under truncated_blocks
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", "500"))
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"), "L": "4", **dict.fromkeys("MN", "5"), "R": "6",
+}
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase ASCII letters only, so accents and punctuation don't split blocks"""
+    ascii_name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    return "".join(ch for ch in ascii_name.lower() if ch.isalpha())
+
+
+def soundex(name: Optional[str]) -> str:
+    """American Soundex code, e.g. Fields and Feilds both give F432"""
+    letters = normalize_name(name).upper()
+    if not letters:
+        return "0000"
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+        if ch not in "HW":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def blocking_key(sport: Optional[str], last_name: Optional[str], date_of_birth) -> str:
+    year = str(date_of_birth.year) if date_of_birth else "----"
+    return f"{(sport or '').lower()}|{soundex(last_name)}|{year}"
+
+
+@event.listens_for(Player, "before_insert")
+@event.listens_for(Player, "before_update")
+def set_block_key(mapper, connection, target):
+    target.block_key = blocking_key(target.sport, target.last_name, target.date_of_birth)
+
+
+def similarity(a, b) -> float:
+    """Name similarity in [0, 1], nudged by matching or conflicting birth dates"""
+    score = SequenceMatcher(
+        None,
+        f"{normalize_name(a.first_name)} {normalize_name(a.last_name)}",
+        f"{normalize_name(b.first_name)} {normalize_name(b.last_name)}",
+    ).ratio()
+    if a.date_of_birth and b.date_of_birth:
+        score += 0.1 if a.date_of_birth == b.date_of_birth else -0.1
+    if a.position and b.position and a.position != b.position:
+        score -= 0.05
+    return round(max(0.0, min(score, 1.0)), 3)
+
+
+def _compare_block(block: List, threshold: float) -> List[dict]:
+    candidates = []
+    for a, b in combinations(block[:DEDUP_MAX_BLOCK_SIZE], 2):
+        score = similarity(a, b)
+        if score >= threshold:
+            candidates.append({
+                "player_ids": [a.id, b.id],
+                "names": [f"{a.first_name} {a.last_name}", f"{b.first_name} {b.last_name}"],
+                "block": a.block_key,
+                "score": score,
+            })
+    return candidates
+
+
+def find_duplicates(db: Session, sport: Optional[str] = None, threshold: float = DEDUP_THRESHOLD,
+                    max_candidates: int = DEDUP_MAX_CANDIDATES) -> dict:
+    """Stream players in block order and compare pairs within each block only"""
+    query = select(
+        Player.id, Player.first_name, Player.last_name, Player.date_of_birth,
+        Player.position, Player.block_key,
+    ).where(Player.block_key.isnot(None)).order_by(Player.block_key, Player.id)
+    if sport:
+        query = query.where(Player.sport == sport)
+
+    candidates, block, blocks, scanned, truncated = [], [], 0, 0, {}
+
+    def compare(block):
+        if len(block) > DEDUP_MAX_BLOCK_SIZE:
+            truncated[block[0].block_key] = len(block)
+        return _compare_block(block, threshold)
+
+    for row in db.execute(query.execution_options(yield_per=5000)):
+        scanned += 1
+        if block and row.block_key != block[0].block_key:
+            candidates += compare(block)
+            blocks += 1
+            block = []
+        block.append(row)
+        if len(candidates) >= max_candidates:
+            break
+    if block and len(candidates) < max_candidates:
+        candidates += compare(block)
+        blocks += 1
+
+    if truncated:
+        logger.warning("duplicate scan compared only the first %d players of %d blocks: %s",
+                       DEDUP_MAX_BLOCK_SIZE, len(truncated), ", ".join(truncated))
+    candidates.sort(key=lambda c: c["score"], reverse=True)
+    return {
+        "players_scanned": scanned,
+        "blocks": blocks,
+        "truncated_blocks": truncated,  # block key -> players in the block
+        "candidates": candidates[:max_candidates],
+    }
+
+
+def backfill_block_keys(db: Session, batch_size: int = 5000) -> int:
+    """Fill block_key for rows written before blocking keys existed"""
+    filled = 0
+    while True:
+        rows = db.execute(
+            select(Player.id, Player.sport, Player.last_name, Player.date_of_birth)
+            .where(Player.block_key.is_(None))
+            .limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).all()
+        if not rows:
+            return filled
+        db.execute(update(Player), [
+            {"id": r.id, "block_key": blocking_key(r.sport, r.last_name, r.date_of_birth)} for r in rows
+        ])
+        db.commit()
+        filled += len(rows)
+
+
+def merge_players(db: Session, keep_id: int, duplicate_ids: List[int]) -> dict:
+    """Fold duplicates into ``keep_id``: move their history in bulk, then soft-delete them"""
+    duplicate_ids = [d for d in set(duplicate_ids) if d != keep_id]
+    now = datetime.utcnow()
+
+    # Each user keeps one entry: the one on the survivor, else their oldest on a duplicate
+    watching = set(db.execute(select(Watchlist.user_id).where(Watchlist.player_id == keep_id)).scalars())
+    dropped = []
+    for entry in db.execute(
+        select(Watchlist.id, Watchlist.user_id)
+        .where(Watchlist.player_id.in_(duplicate_ids))
+        .order_by(Watchlist.id)
+    ):
+        if entry.user_id in watching:
+            dropped.append(entry)
+        watching.add(entry.user_id)
+    if dropped:
+        db.execute(insert(DeletedRecord), [
+            {"entity": "watchlist", "entity_id": w.id, "user_id": w.user_id, "deleted_at": now} for w in dropped
+        ])
+        db.execute(delete(Watchlist).where(Watchlist.id.in_([w.id for w in dropped])))
+
+    moved = {
+        "evaluations": db.execute(
+            update(Evaluation).where(Evaluation.player_id.in_(duplicate_ids))
+            .values(player_id=keep_id, updated_at=now)
+        ).rowcount,
+        "archived_evaluations": db.execute(
+            update(ArchivedEvaluation).where(ArchivedEvaluation.player_id.in_(duplicate_ids))
+            .values(player_id=keep_id, updated_at=now)
+        ).rowcount,
+        "watchlists": db.execute(
+            update(Watchlist).where(Watchlist.player_id.in_(duplicate_ids))
+            .values(player_id=keep_id, updated_at=now)
+        ).rowcount,
+    }
+    merge_player_ratings(db, keep_id, duplicate_ids)
+
+    # Carry an external id over so the next roster sync matches the survivor
+    keep = db.get(Player, keep_id)
+    if keep.external_id is None:
+        dup = db.query(Player).filter(Player.id.in_(duplicate_ids), Player.external_id.isnot(None)).first()
+        if dup is not None:
+            external_id, dup.external_id = dup.external_id, None
+            db.flush()
+            keep.external_id = external_id
+    db.commit()
+
+    for duplicate_id in duplicate_ids:
+        soft_delete_player(db, duplicate_id)
+    return {"kept": keep_id, "merged": duplicate_ids, **moved, "watchlists_dropped": len(dropped)}
+
+
+@register_job("find_duplicates", cpu_bound=True, limit=1)
+def find_duplicates_job(params: dict) -> dict:
+    """Background duplicate scan; the merge-candidates report is the job result"""
+    with job_session(params) as db:
+        backfill_block_keys(db)
+        return find_duplicates(db, params.get("sport"), params.get("threshold", DEDUP_THRESHOLD))
@@ -0,0 +1,110 @@
+"""
+Soft delete for players with a batched background purge
+Deleting a player only stamps deleted_at; the cascade is cleaned up later in small batches.
+The player's tombstone covers its evaluations and watchlist entries, so the purge adds none for them
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from .jobs import job_session, register_job
+from models import Player, PlayerRating, Evaluation, ArchivedEvaluation, Watchlist, DeletedRecord
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", "0.05"))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def hide_deleted_players(state):
+    """Filter soft-deleted players out of every ORM query.
+
+    Pass ``execution_options(include_deleted=True)`` to see them.
+    """
+    if (
+        state.is_select
+        and not state.is_column_load
+        and not state.is_relationship_load
+        and not state.execution_options.get("include_deleted", False)
+    ):
+        state.statement = state.statement.options(
+            with_loader_criteria(Player, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
+
+
+def soft_delete_player(db: Session, player_id: int) -> bool:
+    """Mark a player deleted in one UPDATE; returns False if there was nothing to delete"""
+    now = datetime.utcnow()
+    deleted = db.query(Player).filter(Player.id == player_id, Player.deleted_at.is_(None)).update(
+        {Player.deleted_at: now, Player.updated_at: now}, synchronize_session=False
+    )
+    if not deleted:
+        return False
+    db.execute(insert(DeletedRecord).values(entity="player", entity_id=player_id, deleted_at=now))
+    db.commit()
+    return True
+
+
+def _purge_children(db: Session, model, player_id: int, batch_size: int, pause: float) -> int:
+    """Delete one player's rows from a child table a batch at a time"""
+    removed = 0
+    while True:
+        # Joining the player stops the purge if it was restored in the meantime
+        ids = db.execute(
+            select(model.id)
+            .join(Player, Player.id == model.player_id)
+            .where(model.player_id == player_id, Player.deleted_at.isnot(None))
+            .limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).scalars().all()
+        if not ids:
+            return removed
+        db.execute(delete(model).where(model.id.in_(ids)))
+        db.commit()
+        removed += len(ids)
+        if pause:
+            # Give other writers a turn at the lock between batches
+            time.sleep(pause)
+
+
+def purge_players(db: Session, player_ids: Optional[List[int]] = None,
+                  batch_size: int = PURGE_BATCH_SIZE, pause: float = PURGE_PAUSE_SECONDS) -> dict:
+    """Remove soft-deleted players and everything that hangs off them"""
+    query = select(Player.id).where(Player.deleted_at.isnot(None))
+    if player_ids:
+        query = query.where(Player.id.in_(player_ids))
+    ids = db.execute(query.execution_options(include_deleted=True)).scalars().all()
+
+    counts = {"players": 0, "evaluations": 0, "watchlists": 0}
+    for player_id in ids:
+        counts["evaluations"] += _purge_children(db, Evaluation, player_id, batch_size, pause)
+        counts["evaluations"] += _purge_children(db, ArchivedEvaluation, player_id, batch_size, pause)
+        counts["watchlists"] += _purge_children(db, Watchlist, player_id, batch_size, pause)
+        db.execute(delete(PlayerRating).where(PlayerRating.player_id == player_id))
+        purged = db.execute(
+            delete(Player).where(Player.id == player_id, Player.deleted_at.isnot(None))
+        ).rowcount
+        if purged:
+            # Re-date the soft delete's tombstone so incremental backups see the row go
+            now = datetime.utcnow()
+            tombstoned = db.execute(
+                update(DeletedRecord)
+                .where(DeletedRecord.entity == "player", DeletedRecord.entity_id == player_id)
+                .values(deleted_at=now)
+            ).rowcount
+            if not tombstoned:
+                db.execute(insert(DeletedRecord).values(entity="player", entity_id=player_id, deleted_at=now))
+        counts["players"] += purged
+        db.commit()
+    return counts
+
+
+@register_job("purge_players", limit=1)
+def purge_players_job(params: dict) -> dict:
+    """Background purge of soft-deleted players; purges all of them when no ids are given"""
+    with job_session(params) as db:
+        return purge_players(db, params.get("player_ids"))
@@ -0,0 +1,182 @@
+"""
+In-process pub/sub for pushing new evaluations to connected coaches
+Each connection gets a bounded queue so one slow client cannot hold up the rest.
+With several server workers, brokers relay events to each other over Unix
+datagram sockets in STREAM_RELAY_DIR
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import socket
+from contextlib import suppress
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "1000"))
+# Shared by the workers of one server; serve() sets it when it runs more than one
+STREAM_RELAY_DIR = os.getenv("STREAM_RELAY_DIR")
+STREAM_RELAY_MAX_BYTES = 65536
+
+
+class TooManySubscribers(Exception):
+    """Raised when the broker is already serving STREAM_MAX_SUBSCRIBERS connections"""
+
+
+class Subscription:
+    """One connected client and its pending events"""
+
+    def __init__(self, tenant: Optional[str], user_id: int, queue_size: int):
+        self.tenant = tenant
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def offer(self, event: str, data: dict):
+        """Queue an event, or flag the client as lagged when it cannot keep up"""
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # Drop the backlog; the client is told to resync from /changes
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.lagged = True
+            self.queue.put_nowait(("lagged", {"resync": "/changes"}))
+
+    async def next_event(self, timeout: float):
+        """Wait for the next event, returning None when the heartbeat is due"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event[0] == "lagged":
+            self.lagged = False
+        return event
+
+
+class EventBroker:
+    """Fans published events out to the subscriptions of the target users.
+
+    User ids repeat across tenant databases, so subscriptions are keyed by
+    ``(tenant, user_id)``; tenant is None when multi-tenant mode is off.
+    Once started with a ``relay_dir``, published events also reach the
+    brokers of the other worker processes bound in that directory.
+    """
+
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE, max_subscribers: int = STREAM_MAX_SUBSCRIBERS,
+                 relay_dir: Optional[str] = STREAM_RELAY_DIR):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.relay_dir = relay_dir
+        self._subscribers: Dict[Tuple[Optional[str], int], Set[Subscription]] = {}
+        self._count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._relay: Optional[socket.socket] = None
+        self._relay_path: Optional[str] = None
+
+    async def start(self):
+        """Bind this worker's relay socket; a no-op without a relay directory"""
+        if not self.relay_dir or not hasattr(socket, "AF_UNIX") or self._relay is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        os.makedirs(self.relay_dir, exist_ok=True)
+        self._relay_path = os.path.join(self.relay_dir, f"{os.getpid()}-{secrets.token_hex(4)}.sock")
+        relay = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        relay.bind(self._relay_path)
+        relay.setblocking(False)
+        self._relay = relay
+        self._loop.add_reader(relay.fileno(), self._receive)
+
+    async def stop(self):
+        if self._relay is None:
+            return
+        self._loop.remove_reader(self._relay.fileno())
+        self._relay.close()
+        self._relay = None
+        with suppress(FileNotFoundError):
+            os.unlink(self._relay_path)
+
+    def subscribe(self, tenant: Optional[str], user_id: int) -> Subscription:
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribers()
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(tenant, user_id, self.queue_size)
+        self._subscribers.setdefault((tenant, user_id), set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        key = (subscription.tenant, subscription.user_id)
+        subscriptions = self._subscribers.get(key)
+        if subscriptions and subscription in subscriptions:
+            subscriptions.discard(subscription)
+            self._count -= 1
+            if not subscriptions:
+                del self._subscribers[key]
+
+    def publish(self, tenant: Optional[str], user_ids: Iterable[int], event: str, data: dict):
+        """Deliver an event to every connection of the given users of ``tenant``.
+
+        Safe to call from worker threads; delivery then hops onto the loop.
+        """
+        user_ids = list(user_ids)
+        if self._relay is not None:
+            self._forward(tenant, user_ids, event, data)
+        if not self._subscribers or self._loop is None:
+            return
+        keys = [(tenant, user_id) for user_id in user_ids]
+        if self._on_loop():
+            self._deliver(keys, event, data)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, keys, event, data)
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _deliver(self, keys, event: str, data: dict):
+        for key in keys:
+            for subscription in list(self._subscribers.get(key, ())):
+                subscription.offer(event, data)
+
+    def _forward(self, tenant: Optional[str], user_ids: list, event: str, data: dict):
+        """Send an event to every other worker's relay socket"""
+        message = json.dumps([tenant, user_ids, event, data], default=str).encode()
+        if len(message) > STREAM_RELAY_MAX_BYTES:
+            return
+        for entry in os.scandir(self.relay_dir):
+            if entry.path == self._relay_path or not entry.name.endswith(".sock"):
+                continue
+            try:
+                self._relay.sendto(message, entry.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody reads it any more: the worker behind it exited without cleaning up
+                with suppress(FileNotFoundError):
+                    os.unlink(entry.path)
+            except OSError:
+                # The peer's buffer is full; its clients resync from /changes like any lagged stream
+                pass
+
+    def _receive(self):
+        """Deliver events relayed by other workers to this worker's subscribers"""
+        while True:
+            try:
+                message = self._relay.recv(STREAM_RELAY_MAX_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            tenant, user_ids, event, data = json.loads(message)
+            self._deliver([(tenant, user_id) for user_id in user_ids], event, data)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+evaluation_events = EventBroker()
@@ -0,0 +1,134 @@
+"""
+Readiness checks for load balancers
+``/health/ready`` answers 503 when this worker can't serve traffic well: the
+database is slow or unreachable, the connection pool is nearly exhausted, the
+event loop is lagging or work is piling up in front of the executors
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import anyio.to_thread
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", "1.0"))
+HEALTH_MAX_DB_MS = float(os.getenv("HEALTH_MAX_DB_MS", "250"))
+# Share of pool + overflow connections checked out
+HEALTH_MAX_POOL_USAGE = float(os.getenv("HEALTH_MAX_POOL_USAGE", "0.9"))
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "200"))
+# Calls waiting for a threadpool slot plus queued jobs and writes
+HEALTH_MAX_BACKLOG = int(os.getenv("HEALTH_MAX_BACKLOG", "100"))
+HEALTH_LAG_INTERVAL = float(os.getenv("HEALTH_LAG_INTERVAL", "0.5"))
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task"""
+
+    def __init__(self, interval: float = HEALTH_LAG_INTERVAL):
+        self.interval = interval
+        self.lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = (time.perf_counter() - started - self.interval) * 1000
+            # Jump straight to a spike, recover gradually so one good tick doesn't hide a stall
+            self.lag_ms = lag if lag > self.lag_ms else 0.5 * self.lag_ms + 0.5 * lag
+
+
+def pool_status(engine: Engine) -> dict:
+    """Checked-out connections against what the pool can hand out; usage is None when unbounded"""
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    if not hasattr(pool, "checkedout"):
+        return status
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    capacity = size + max_overflow if max_overflow >= 0 else None
+    status.update(size=size, checked_out=checked_out, overflow=pool.overflow(), capacity=capacity,
+                  usage=round(checked_out / capacity, 3) if capacity else None)
+    return status
+
+
+def threadpool_backlog() -> dict:
+    """Sync dependencies and endpoints run on anyio's threadpool; waiting tasks are the backlog"""
+    stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    return {"busy": stats.borrowed_tokens, "limit": stats.total_tokens, "waiting": stats.tasks_waiting}
+
+
+class ReadinessProbe:
+    """Runs the checks; the database probe gets its own thread and never piles up"""
+
+    def __init__(self, engine: Engine, lag_monitor: LoopLagMonitor):
+        self.engine = engine
+        self.lag_monitor = lag_monitor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health")
+        self._pending: Optional[asyncio.Future] = None
+
+    def _select_one(self) -> float:
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return (time.perf_counter() - started) * 1000
+
+    async def database(self, timeout: Optional[float] = None) -> dict:
+        """SELECT 1 bounded by ``timeout``, including the wait for a pooled connection"""
+        timeout = timeout if timeout is not None else HEALTH_DB_TIMEOUT
+        if self._pending is not None and not self._pending.done():
+            # A probe stuck on a dead database or an empty pool is still running
+            return {"ok": False, "error": "previous probe still pending"}
+        self._pending = asyncio.get_running_loop().run_in_executor(self._executor, self._select_one)
+        try:
+            latency = await asyncio.wait_for(asyncio.shield(self._pending), timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no answer within {timeout:g}s"}
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__}
+        return {"ok": latency <= HEALTH_MAX_DB_MS, "latency_ms": round(latency, 2)}
+
+    async def check(self, queues: Optional[Dict[str, int]] = None) -> dict:
+        """Readiness report; ``failing`` names every check over its threshold"""
+        database = await self.database()
+        pool = pool_status(self.engine)
+        threads = threadpool_backlog()
+        backlog = {"threadpool": threads["waiting"], **(queues or {})}
+        lag_ms = round(self.lag_monitor.lag_ms, 2)
+
+        failing = []
+        if not database["ok"]:
+            failing.append("database")
+        if pool.get("usage") is not None and pool["usage"] >= HEALTH_MAX_POOL_USAGE:
+            failing.append("pool")
+        if lag_ms > HEALTH_MAX_LOOP_LAG_MS:
+            failing.append("event_loop")
+        if sum(backlog.values()) > HEALTH_MAX_BACKLOG:
+            failing.append("backlog")
+        return {
+            "status": "unavailable" if failing else "ready",
+            "failing": failing,
+            "database": database,
+            "pool": pool,
+            "event_loop_lag_ms": lag_ms,
+            "threadpool": threads,
+            "backlog": backlog,
+        }
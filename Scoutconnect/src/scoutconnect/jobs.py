@@ -0,0 +1,391 @@
+"""
+Background job runner for ScoutConnect
+Runs slow work (exports, analytics recomputation) outside the request handlers
+"""
+
+import asyncio
+import inspect
+import json
+import multiprocessing
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import update
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every runner owns its jobs
+    fcntl = None
+
+from .db import SessionLocal
+from .projection import PLAYER_FIELDS, parse_fields, player_columns, json_default
+from .tenants import tenant_registry
+from models import Job, Player, Evaluation
+
+# Runner settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_PROCESS_WORKERS = int(os.getenv("JOB_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR", "exports"))
+# Lock file electing the one server worker that runs jobs; serve() sets it when it runs more than one
+JOB_RUNNER_LOCK = os.getenv("JOB_RUNNER_LOCK")
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """Raised when the in-memory job queue cannot take more work"""
+
+
+class JobSpec:
+    """A registered job kind and how it should be executed"""
+
+    def __init__(self, kind: str, func: Callable, cpu_bound: bool = False, limit: Optional[int] = None):
+        self.kind = kind
+        self.func = func
+        self.cpu_bound = cpu_bound
+        self.limit = limit
+        self.is_async = inspect.iscoroutinefunction(func)
+
+
+JOB_REGISTRY: Dict[str, JobSpec] = {}
+
+
+def job_session(params: dict):
+    """Session on the database the job was submitted to; the runner sets ``params["tenant"]``"""
+    tenant = params.get("tenant")
+    return tenant_registry.sessionmaker(tenant)() if tenant else SessionLocal()
+
+
+def register_job(kind: str, cpu_bound: bool = False, limit: Optional[int] = None):
+    """Register a job handler.
+
+    Handlers take the job params dict and return a JSON-serializable result;
+    they open their sessions with ``job_session(params)``.
+    Coroutines run on the event loop, cpu_bound handlers run in the process
+    pool and everything else runs in the default thread executor. ``limit``
+    caps how many jobs of this kind may run at the same time.
+    """
+    def decorator(func):
+        JOB_REGISTRY[kind] = JobSpec(kind, func, cpu_bound=cpu_bound, limit=limit)
+        return func
+    return decorator
+
+
+class JobRunner:
+    """In-process worker pool backed by the persistent jobs table.
+
+    A tenant's jobs live in the tenant's own database, so jobs are keyed by
+    ``(tenant, job_id)`` and every claim and update goes to that database.
+
+    With a ``lock_path``, only the runner holding the lock runs jobs, so
+    per-kind limits hold across server workers. The others stand by: they
+    persist submitted jobs for the owner's poller and take over the lock
+    when the owner exits.
+    """
+
+    def __init__(self, session_factory=SessionLocal, workers: int = JOB_WORKERS,
+                 process_workers: int = JOB_PROCESS_WORKERS, queue_size: int = JOB_QUEUE_SIZE,
+                 poll_seconds: float = JOB_POLL_SECONDS, tenants=tenant_registry,
+                 lock_path: Optional[str] = JOB_RUNNER_LOCK):
+        self.session_factory = session_factory
+        self.tenants = tenants
+        self.workers = workers
+        self.process_workers = process_workers
+        self.queue_size = queue_size
+        self.poll_seconds = poll_seconds
+        self.lock_path = lock_path
+        self._lock = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued_ids = set()
+        self._running: Dict[tuple, asyncio.Task] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._tasks = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stopping = False
+
+    @property
+    def backlog(self) -> int:
+        """Jobs queued in this process and not yet picked up by a worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def owner(self) -> bool:
+        """Whether this runner executes jobs rather than standing by"""
+        return self._queue is not None
+
+    async def start(self):
+        """Start the worker tasks and pick up jobs left queued by a previous run"""
+        self._stopping = False
+        if not self._acquire_lock():
+            self._tasks.append(asyncio.create_task(self._standby()))
+            return
+        self._begin()
+
+    def _begin(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        self._tasks.append(asyncio.create_task(self._poller()))
+        self._poll_once()
+
+    def _acquire_lock(self) -> bool:
+        """Take the runner lock without blocking; the OS releases it if the process dies"""
+        if not self.lock_path or fcntl is None or self._lock is not None:
+            return True
+        handle = open(self.lock_path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock = handle
+        return True
+
+    async def _standby(self):
+        while not self._acquire_lock():
+            await asyncio.sleep(self.poll_seconds)
+        self._begin()
+
+    async def stop(self):
+        """Stop the workers; interrupted jobs go back to queued"""
+        # Cancelling a worker also cancels the job it awaits; the flag tells _run this is not a user cancel
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued_ids.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def submit(self, db, kind: str, params: Optional[dict] = None, user_id: Optional[int] = None,
+               tenant: Optional[str] = None) -> Job:
+        """Persist a new job and queue it for execution; ``db`` must be the session of ``tenant``.
+
+        On a standby runner the job is only persisted; the owner's poller picks it up.
+        """
+        if kind not in JOB_REGISTRY:
+            raise KeyError(kind)
+        if self._queue is not None and self._queue.full():
+            raise JobQueueFull()
+        job = Job(kind=kind, status="queued", params=params or {}, created_by=user_id, tenant=tenant)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._enqueue((tenant, job.id))
+        return job
+
+    def cancel(self, db, job: Job) -> Job:
+        """Cancel a queued job immediately or ask a running one to stop"""
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+        job.cancel_requested = True
+        db.commit()
+        db.refresh(job)
+        task = self._running.get((job.tenant, job.id))
+        if task is not None:
+            task.cancel()
+        return job
+
+    def _sessions(self, tenant: Optional[str]):
+        """Session factory for the database holding ``tenant``'s jobs"""
+        return self.tenants.sessionmaker(tenant) if tenant else self.session_factory
+
+    def _enqueue(self, key: tuple):
+        if self._queue is None or key in self._queued_ids:
+            return
+        try:
+            self._queue.put_nowait(key)
+            self._queued_ids.add(key)
+        except asyncio.QueueFull:
+            # The poller will pick it up again once there is room
+            pass
+
+    def _poll_once(self):
+        """Queue jobs submitted by other processes and honour remote cancels.
+
+        Covers the default database and every tenant with an open engine; a
+        tenant's leftover jobs are picked up once it serves a request again.
+        """
+        for tenant in [None, *self.tenants.cached()]:
+            try:
+                self._poll_database(tenant)
+            except Exception:
+                # One unreachable tenant must not hold up the others
+                if tenant is None:
+                    raise
+
+    def _poll_database(self, tenant: Optional[str]):
+        running = [job_id for key_tenant, job_id in self._running if key_tenant == tenant]
+        with self._sessions(tenant)() as db:
+            queued = db.query(Job.id).filter(Job.status == "queued").order_by(Job.id).limit(self.queue_size).all()
+            if running:
+                cancelled = db.query(Job.id).filter(Job.id.in_(running), Job.cancel_requested.is_(True)).all()
+            else:
+                cancelled = []
+        for (job_id,) in queued:
+            self._enqueue((tenant, job_id))
+        for (job_id,) in cancelled:
+            task = self._running.get((tenant, job_id))
+            if task is not None:
+                task.cancel()
+
+    async def _poller(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self._poll_once()
+            except Exception:
+                # A failed poll must never stop the runner
+                pass
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            self._queued_ids.discard(key)
+            try:
+                await self._run(*key)
+            finally:
+                self._queue.task_done()
+
+    def _claim(self, tenant: Optional[str], job_id: int) -> Optional[Job]:
+        """Atomically move a job from queued to running so only one worker gets it"""
+        with self._sessions(tenant)() as db:
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(status="running", started_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            job = db.get(Job, job_id)
+            db.expunge(job)
+            return job
+
+    def _finish(self, tenant: Optional[str], job_id: int, status: str, result=None, error: Optional[str] = None):
+        with self._sessions(tenant)() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+            )
+            db.commit()
+
+    def _requeue(self, tenant: Optional[str], job_id: int):
+        with self._sessions(tenant)() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running")
+                .values(status="queued", started_at=None)
+            )
+            db.commit()
+
+    async def _run(self, tenant: Optional[str], job_id: int):
+        job = self._claim(tenant, job_id)
+        if job is None:
+            return
+        spec = JOB_REGISTRY.get(job.kind)
+        if spec is None:
+            self._finish(tenant, job_id, "failed", error=f"Unknown job kind: {job.kind}")
+            return
+
+        # The tenant comes from where the job is stored, never from client-supplied params
+        params = {**(job.params or {}), "tenant": tenant}
+        task = asyncio.create_task(self._execute(spec, params))
+        self._running[(tenant, job_id)] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                # The runner is shutting down, leave the job for the next start
+                task.cancel()
+                self._requeue(tenant, job_id)
+                raise
+            self._finish(tenant, job_id, "cancelled")
+        except Exception as e:
+            self._finish(tenant, job_id, "failed", error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(tenant, job_id, "succeeded", result=result)
+        finally:
+            self._running.pop((tenant, job_id), None)
+
+    async def _execute(self, spec: JobSpec, params: dict):
+        limit = self._limits.get(spec.kind)
+        if limit is None and spec.limit:
+            limit = self._limits[spec.kind] = asyncio.Semaphore(spec.limit)
+        if limit is None:
+            return await self._call(spec, params)
+        async with limit:
+            return await self._call(spec, params)
+
+    async def _call(self, spec: JobSpec, params: dict):
+        if spec.is_async:
+            return await spec.func(params)
+        loop = asyncio.get_running_loop()
+        if spec.cpu_bound:
+            return await loop.run_in_executor(self._process_pool(), spec.func, params)
+        return await loop.run_in_executor(None, spec.func, params)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn keeps the children clear of the event loop and open DB connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+
+# --- Built-in jobs ---
+
+EXPORT_FIELDS = "id,first_name,last_name,date_of_birth,sport,position,height_cm,weight_kg"
+
+
+@register_job("players_export", limit=1)
+def export_players(params: dict) -> dict:
+    """Write every player to a JSON lines file under EXPORT_DIR; ``fields`` picks the columns"""
+    fields = parse_fields(params.get("fields") or EXPORT_FIELDS, PLAYER_FIELDS)
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    sport = params.get("sport")
+    output_file = EXPORT_DIR / f"players_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"
+    rows = 0
+    with job_session(params) as db, open(output_file, "w", encoding="utf-8") as f:
+        query = db.query(*player_columns(fields)).select_from(Player).order_by(Player.id)
+        if sport:
+            query = query.filter(Player.sport == sport)
+        for row in query.yield_per(1000):
+            f.write(json.dumps(dict(row._mapping), default=json_default) + "\n")
+            rows += 1
+    return {"path": str(output_file), "rows": rows}
+
+
+@register_job("evaluation_summary", cpu_bound=True, limit=1)
+def summarize_evaluations(params: dict) -> dict:
+    """Compute per-sport score statistics across all evaluations"""
+    scores: Dict[str, list] = {}
+    with job_session(params) as db:
+        rows = db.query(Evaluation.sport, Evaluation.score).filter(Evaluation.score.isnot(None)).yield_per(5000)
+        for sport, score in rows:
+            scores.setdefault(sport, []).append(float(score))
+    return {
+        sport: {
+            "count": len(values),
+            "mean": round(statistics.fmean(values), 2),
+            "median": round(statistics.median(values), 2),
+            "stdev": round(statistics.pstdev(values), 2),
+        }
+        for sport, values in scores.items()
+    }
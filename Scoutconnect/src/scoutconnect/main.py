@@ -4,22 +4,51 @@ Main FastAPI application entry point with complete Players CRUD
 """
 
 from datetime import datetime, timedelta, date
-from typing import Optional, List
+from typing import Optional, List, Any
+import asyncio
 import os
-from fastapi import FastAPI, HTTPException, Depends, status
+import random
+import time
+from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 from .db import SessionLocal, engine
-from models import User, Player, Base
+from .jobs import JobRunner, JobQueueFull, FINISHED_STATUSES
+from .rosters import upsert_players, UPSERT_KEYS
+from .changes import CHANGES_PAGE_SIZE, get_changes
+from .deletion import soft_delete_player
+from .archive import list_player_evaluations
+from .scoring import resolve_profile, compute_score
+from .ratings import apply_evaluation
+from .dedup import merge_players
+from .batch import run_batch, BATCH_MAX_OPERATIONS
+from .bulk import player_filter, bulk_update_players, bulk_delete_players
+from .players import insert_player, update_player as update_player_row
+from .projection import PLAYER_FIELDS, EVALUATION_FIELDS, parse_fields, player_columns
+from .writes import WriteQueue, WRITE_QUEUE
+from .profiling import request_profiler, request_id, PROFILE_HEADER, PROFILE_SAMPLE_RATE
+from .tracing import span, start_trace, finish_trace, TracedRoute
+from . import tenants
+from .tenants import tenant_registry, resolve_tenant, UnknownTenant
+from .health import LoopLagMonitor, ReadinessProbe
+from .events import evaluation_events, format_sse, TooManySubscribers, STREAM_HEARTBEAT_SECONDS
+from models import User, Player, PlayerRating, Evaluation, Watchlist, ScoringProfile, Job, Base
 
 # Security
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-jwt-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+USER_ROLES = ("user", "scout", "coach", "admin")
+# Roles nobody can give themselves at registration
+PRIVILEGED_ROLES = ("admin",)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -44,6 +73,7 @@ class TokenData(BaseModel):
 
 # Pydantic models for Players
 class PlayerBase(BaseModel):
+    external_id: Optional[str] = None
     first_name: str
     last_name: str
     date_of_birth: Optional[date] = None
@@ -56,6 +86,7 @@ class PlayerCreate(PlayerBase):
     pass
 
 class PlayerUpdate(BaseModel):
+    external_id: Optional[str] = None
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     date_of_birth: Optional[date] = None
@@ -68,23 +99,296 @@ class PlayerResponse(PlayerBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    rating: Optional[float] = None
 
     class Config:
         from_attributes = True
 
+class RosterUpsert(BaseModel):
+    key: str = "external_id"  # 'external_id' or 'identity' (name + date of birth + sport)
+    players: List[PlayerCreate]
+
+class RosterUpsertResult(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+
+class PlayerMerge(BaseModel):
+    duplicate_ids: List[int]
+
+class PlayerMergeResult(BaseModel):
+    kept: int
+    merged: List[int]
+    evaluations: int
+    archived_evaluations: int
+    watchlists: int
+    watchlists_dropped: int
+
+# Pydantic models for Evaluations and Watchlists
+class EvaluationCreate(BaseModel):
+    player_id: int
+    sport: Optional[str] = None
+    criteria: Optional[dict] = None
+    score: Optional[float] = None
+    notes: Optional[str] = None
+
+class EvaluationUpdate(BaseModel):
+    notes: Optional[str] = None
+
+class EvaluationResponse(BaseModel):
+    id: int
+    player_id: int
+    evaluator_id: Optional[int] = None
+    sport: str
+    criteria: Optional[dict] = None
+    score: Optional[float] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    archived: bool = False
+
+    class Config:
+        from_attributes = True
+
+class WatchlistCreate(BaseModel):
+    player_id: int
+    notes: Optional[str] = None
+
+class WatchlistUpdate(BaseModel):
+    notes: Optional[str] = None
+
+class WatchlistResponse(BaseModel):
+    id: int
+    user_id: int
+    player_id: int
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Pydantic models for scoring profiles
+class ScoringProfileUpdate(BaseModel):
+    sport: str
+    position: Optional[str] = None
+    weights: dict
+
+class ScoringProfileResponse(BaseModel):
+    id: int
+    sport: str
+    position: Optional[str] = None
+    weights: dict
+    updated_at: Optional[datetime] = None
+    recompute_job_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+# Pydantic models for the change feed
+class DeletedRecordResponse(BaseModel):
+    entity: str
+    entity_id: int
+    deleted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChangeFeed(BaseModel):
+    next_cursor: str  # pass back as ?cursor= on the next call
+    has_more: bool
+    players: List[PlayerResponse]
+    evaluations: List[EvaluationResponse]
+    watchlists: List[WatchlistResponse]
+    deleted: List[DeletedRecordResponse]
+
+# Pydantic models for batch operations
+class BatchOperation(BaseModel):
+    op: str  # 'create', 'update' or 'delete'
+    entity: str  # 'player', 'evaluation' or 'watchlist'
+    id: Optional[int] = None  # target of updates and deletes
+    data: Optional[dict] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    entity: str
+    status: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
+
+BATCH_SCHEMAS = {
+    ("player", "create"): PlayerCreate,
+    ("player", "update"): PlayerUpdate,
+    ("evaluation", "create"): EvaluationCreate,
+    ("evaluation", "update"): EvaluationUpdate,
+    ("watchlist", "create"): WatchlistCreate,
+    ("watchlist", "update"): WatchlistUpdate,
+}
+
+# Pydantic models for bulk player changes
+class PlayerFilter(BaseModel):
+    sport: Optional[str] = None
+    position: Optional[str] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    ids: Optional[List[int]] = None
+
+class BulkPlayerUpdate(BaseModel):
+    filter: PlayerFilter
+    patch: PlayerUpdate
+    dry_run: bool = False
+
+class BulkPlayerDelete(BaseModel):
+    filter: PlayerFilter
+    dry_run: bool = False
+
+class BulkResult(BaseModel):
+    matched: int
+    dry_run: bool
+    purge_job_id: Optional[int] = None
+
+# Pydantic models for background jobs
+class JobCreate(BaseModel):
+    kind: str
+    params: Optional[dict] = None
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Optional[dict] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Pydantic models for request profiles
+class RequestProfile(BaseModel):
+    request_id: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    format: str
+    created_at: datetime
+    top: List[dict] = []
+
 app = FastAPI(
     title="ScoutConnect ",
     description="Where Underrated Meets Opportunity ",
     version="0.1.0"
 )
 
+app.router.route_class = TracedRoute
+job_runner = JobRunner(SessionLocal)
+write_queue = WriteQueue(SessionLocal)
+loop_lag = LoopLagMonitor()
+readiness = ReadinessProbe(engine, loop_lag)
+
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     Base.metadata.create_all(bind=engine)
+    await job_runner.start()
+    await evaluation_events.start()
+    await loop_lag.start()
+    if WRITE_QUEUE:
+        await write_queue.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await write_queue.stop()
+    await job_runner.stop()
+    await evaluation_events.stop()
+    await loop_lag.stop()
+    tenant_registry.dispose()
+
+def token_claims(request: Request) -> Optional[dict]:
+    """Claims of a valid bearer token on the request, without touching the database"""
+    authorization = request.headers.get("Authorization", "")
+    if not authorization.startswith("Bearer "):
+        return None
+    try:
+        with span("auth.jwt_decode"):
+            return jwt.decode(authorization[len("Bearer "):], SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Root span for sampled requests; phases below it come from tracing.span"""
+    root = start_trace(f"{request.method} {request.url.path}", request.headers.get("traceparent"),
+                       **{"http.method": request.method, "http.route": request.url.path})
+    if root is None:
+        return await call_next(request)
+    try:
+        response = await call_next(request)
+        root.attributes["http.status_code"] = response.status_code
+        return response
+    finally:
+        finish_trace(root)
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile requests an admin asks for with X-Profile, plus a sampled share of all traffic"""
+    rid = request_id(request.headers.get("X-Request-ID"))
+    wanted = random.random() < PROFILE_SAMPLE_RATE
+    if request.headers.get(PROFILE_HEADER):
+        wanted = (token_claims(request) or {}).get("role") == "admin"
+    profiler = request_profiler.start() if wanted else None
+    if profiler is None:
+        response = await call_next(request)
+    else:
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            request_profiler.stop(profiler)
+        await asyncio.to_thread(request_profiler.save, profiler, {
+            "request_id": rid,
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    response.headers["X-Request-ID"] = rid
+    return response
+
+def get_tenant(request: Request) -> Optional[str]:
+    """Tenant for this request; None unless MULTI_TENANT is on.
+
+    A valid token's tenant claim always wins, so a token can't be replayed
+    against another club by changing the X-Tenant header. Only provisioned
+    tenants resolve; other names never create a database.
+    """
+    if not tenants.MULTI_TENANT:
+        return None
+    requested = request.headers.get("X-Tenant")
+    claims = token_claims(request)
+    if claims is not None:
+        requested = claims.get("tenant")
+    try:
+        tenant = resolve_tenant(requested)
+        # Opens (and caches) the tenant's engine, or raises for an unknown one
+        tenant_registry.sessionmaker(tenant)
+    except UnknownTenant as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return tenant
 
 # Dependency for DB session
-def get_db():
-    db = SessionLocal()
+def get_db(tenant: Optional[str] = Depends(get_tenant)):
+    db = tenant_registry.sessionmaker(tenant)() if tenant else SessionLocal()
     try:
         yield db
     finally:
@@ -92,10 +396,12 @@ def get_db():
 
 # Utility functions
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with span("auth.verify_password"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with span("auth.hash_password"):
+        return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -125,20 +431,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        with span("auth.jwt_decode"):
+            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, username=token_data.username)
+    with span("auth.get_user"):
+        user = get_user(db, username=token_data.username)
     if user is None:
         raise credentials_exception
     return user
 
 # Authorization helper
-def require_admin_or_coach(current_user: User = Depends(get_current_user)):
+async def require_admin_or_coach(current_user: User = Depends(get_current_user)):
     if current_user.role not in ["admin", "coach"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -146,6 +454,39 @@ def require_admin_or_coach(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
+async def require_admin(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can perform this action"
+        )
+    return current_user
+
+async def require_evaluator(current_user: User = Depends(get_current_user)):
+    if current_user.role not in ["admin", "coach", "scout"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins, coaches and scouts can submit evaluations"
+        )
+    return current_user
+
+# Field projection helpers
+def requested_fields(fields: Optional[str], allowed) -> Optional[List[str]]:
+    try:
+        return parse_fields(fields, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def player_query(db: Session, fields: Optional[List[str]]):
+    """Query for whole players, or for just the requested columns"""
+    if fields is None:
+        return db.query(Player)
+    return db.query(*player_columns(fields)).select_from(Player)
+
+def projected(rows):
+    """Projected rows go out as-is, skipping validation against the full response model"""
+    return JSONResponse(jsonable_encoder([row if isinstance(row, dict) else dict(row._mapping) for row in rows]))
+
 # Routes
 @app.get("/")
 async def root():
@@ -155,41 +496,52 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness for load balancers: 503 while the database, pool, event loop or backlog is over its limit"""
+    report = await readiness.check({"jobs": job_runner.backlog, "writes": write_queue.backlog})
+    return JSONResponse(report, status_code=200 if not report["failing"] else status.HTTP_503_SERVICE_UNAVAILABLE)
+
 # --- Authentication Routes ---
 
 @app.post("/auth/register", response_model=Token)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    db_user = get_user(db, user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-
-    # Check if email already exists
-    db_user_email = db.query(User).filter(User.email == user.email).first()
-    if db_user_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
+async def register_user(user: UserCreate, request: Request, db: Session = Depends(get_db),
+                        tenant: Optional[str] = Depends(get_tenant)):
+    # Roles gate admin features and the token carries the role, so only an admin can hand out admin
+    if user.role not in USER_ROLES:
+        raise HTTPException(status_code=400, detail=f"role must be one of: {', '.join(USER_ROLES)}")
+    if user.role in PRIVILEGED_ROLES:
+        creator = get_user(db, (token_claims(request) or {}).get("sub"))
+        if creator is None or creator.role != "admin":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can create admin accounts")
 
-    # Create new user
+    # Create new user; the unique constraints catch existing usernames and emails
     hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        password_hash=hashed_password,
-        role=user.role
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        db_user = db.execute(
+            insert(User)
+            .values(username=user.username, email=user.email, password_hash=hashed_password, role=user.role)
+            .returning(User.username, User.role)
+        ).one()
+        with span("db.commit"):
+            db.commit()
+    except IntegrityError:
+        db.rollback()
+        if get_user(db, user.username):
+            raise HTTPException(status_code=400, detail="Username already registered")
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": db_user.username}, expires_delta=access_token_expires
+        data={"sub": db_user.username, "role": db_user.role, "tenant": tenant},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/auth/login", response_model=Token)
-async def login_user(user: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user: UserLogin, db: Session = Depends(get_db),
+                     tenant: Optional[str] = Depends(get_tenant)):
     db_user = authenticate_user(db, user.username, user.password)
     if not db_user:
         raise HTTPException(
@@ -199,7 +551,8 @@ async def login_user(user: UserLogin, db: Session = Depends(get_db)):
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": db_user.username}, expires_delta=access_token_expires
+        data={"sub": db_user.username, "role": db_user.role, "tenant": tenant},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -220,40 +573,86 @@ async def create_player(
     current_user: User = Depends(require_admin_or_coach)
 ):
     """Create a new player profile"""
-    db_player = Player(**player.dict())
-    db.add(db_player)
-    db.commit()
-    db.refresh(db_player)
-    return db_player
+    try:
+        return await write_queue.run(db, lambda session: insert_player(session, player.dict()))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Player already exists")
+
+@app.post("/players/upsert", response_model=RosterUpsertResult)
+async def upsert_roster(
+    roster: RosterUpsert,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_or_coach)
+):
+    """Insert or update players from an external roster without churning ids"""
+    if roster.key not in UPSERT_KEYS:
+        raise HTTPException(status_code=400, detail=f"key must be one of: {', '.join(UPSERT_KEYS)}")
+    try:
+        return upsert_players(db, [p.dict() for p in roster.players], key=roster.key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Roster row conflicts with an existing player")
 
 @app.get("/players", response_model=List[PlayerResponse])
 async def get_players(
     skip: int = 0,
     limit: int = 100,
     sport: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all players with optional filtering by sport"""
-    query = db.query(Player)
+    """Get all players with optional filtering by sport and sorting by rating"""
+    columns = requested_fields(fields, PLAYER_FIELDS)
+    query = player_query(db, columns)
     
     if sport:
         query = query.filter(Player.sport == sport)
+
+    if sort == "rating":
+        query = query.outerjoin(PlayerRating, PlayerRating.player_id == Player.id).order_by(
+            PlayerRating.rating.is_(None), PlayerRating.rating.desc(), Player.id
+        )
+    elif sort is not None:
+        raise HTTPException(status_code=400, detail="sort must be 'rating'")
     
-    players = query.offset(skip).limit(limit).all()
-    return players
+    with span("players.query"):
+        players = query.offset(skip).limit(limit).all()
+    return players if columns is None else projected(players)
+
+@app.get("/leaderboard", response_model=List[PlayerResponse])
+async def get_leaderboard(
+    sport: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Top rated players, optionally within one sport"""
+    columns = requested_fields(fields, PLAYER_FIELDS)
+    query = player_query(db, columns).join(PlayerRating, PlayerRating.player_id == Player.id)
+    if sport:
+        query = query.filter(Player.sport == sport)
+    players = query.order_by(PlayerRating.rating.desc(), Player.id).limit(limit).all()
+    return players if columns is None else projected(players)
 
 @app.get("/players/{player_id}", response_model=PlayerResponse)
 async def get_player(
     player_id: int,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific player by ID"""
-    player = db.query(Player).filter(Player.id == player_id).first()
+    columns = requested_fields(fields, PLAYER_FIELDS)
+    player = player_query(db, columns).filter(Player.id == player_id).first()
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    return player
+    return player if columns is None else JSONResponse(jsonable_encoder(dict(player._mapping)))
 
 @app.put("/players/{player_id}", response_model=PlayerResponse)
 async def update_player(
@@ -263,37 +662,56 @@ async def update_player(
     current_user: User = Depends(require_admin_or_coach)
 ):
     """Update a player's information"""
-    db_player = db.query(Player).filter(Player.id == player_id).first()
-    if not db_player:
-        raise HTTPException(status_code=404, detail="Player not found")
-    
     # Update only provided fields
     update_data = player_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_player, field, value)
-    
-    # Update timestamp
-    db_player.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(db_player)
+    try:
+        db_player = await write_queue.run(db, lambda session: update_player_row(session, player_id, update_data))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Player already exists")
+    if not db_player:
+        raise HTTPException(status_code=404, detail="Player not found")
     return db_player
 
 @app.delete("/players/{player_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_player(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_or_coach)
+    current_user: User = Depends(require_admin_or_coach),
+    tenant: Optional[str] = Depends(get_tenant)
 ):
-    """Delete a player profile"""
-    db_player = db.query(Player).filter(Player.id == player_id).first()
-    if not db_player:
+    """Delete a player profile; evaluations and watchlist entries are purged in the background"""
+    if not soft_delete_player(db, player_id):
         raise HTTPException(status_code=404, detail="Player not found")
-    
-    db.delete(db_player)
-    db.commit()
+    try:
+        job_runner.submit(db, "purge_players", {"player_ids": [player_id]}, user_id=current_user.id, tenant=tenant)
+    except JobQueueFull:
+        # The player is already hidden; a later purge run will clean it up
+        pass
     return None
 
+@app.post("/players/{player_id}/merge", response_model=PlayerMergeResult)
+async def merge_duplicate_players(
+    player_id: int,
+    merge: PlayerMerge,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_or_coach),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Merge duplicate profiles into this player; candidates come from the find_duplicates job"""
+    if not db.query(Player).filter(Player.id == player_id).first():
+        raise HTTPException(status_code=404, detail="Player not found")
+    duplicate_ids = [d for d in set(merge.duplicate_ids) if d != player_id]
+    found = db.query(Player.id).filter(Player.id.in_(duplicate_ids)).count() if duplicate_ids else 0
+    if not duplicate_ids or found != len(duplicate_ids):
+        raise HTTPException(status_code=400, detail="Duplicate players not found")
+    result = merge_players(db, player_id, duplicate_ids)
+    try:
+        job_runner.submit(db, "purge_players", {"player_ids": duplicate_ids}, user_id=current_user.id, tenant=tenant)
+    except JobQueueFull:
+        pass
+    return result
+
 # --- Additional Player Routes ---
 
 @app.get("/players/sport/{sport}", response_model=List[PlayerResponse])
@@ -301,9 +719,344 @@ async def get_players_by_sport(
     sport: str,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all players in a specific sport"""
-    players = db.query(Player).filter(Player.sport == sport).offset(skip).limit(limit).all()
-    return players
\ No newline at end of file
+    columns = requested_fields(fields, PLAYER_FIELDS)
+    players = player_query(db, columns).filter(Player.sport == sport).offset(skip).limit(limit).all()
+    return players if columns is None else projected(players)
+
+# --- Evaluation Routes ---
+
+@app.post("/evaluations", response_model=EvaluationResponse, status_code=status.HTTP_201_CREATED)
+async def create_evaluation(
+    evaluation: EvaluationCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_evaluator),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Submit an evaluation and push it to everyone watching the player"""
+    player = db.query(Player).filter(Player.id == evaluation.player_id).first()
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    data = evaluation.dict()
+    data["sport"] = data["sport"] or player.sport
+    if data["criteria"]:
+        # Scores are derived from the criteria, never trusted from the client
+        profile = resolve_profile(db, data["sport"], player.position)
+        data["score"] = compute_score(data["criteria"], profile.weights if profile else None)
+    db_evaluation = Evaluation(**data, evaluator_id=current_user.id)
+    db.add(db_evaluation)
+    apply_evaluation(db, player.id, current_user.id, db_evaluation.score)
+    db.commit()
+    db.refresh(db_evaluation)
+
+    watchers = [row[0] for row in db.query(Watchlist.user_id).filter(Watchlist.player_id == player.id)]
+    evaluation_events.publish(
+        tenant, watchers, "evaluation", EvaluationResponse.model_validate(db_evaluation).model_dump(mode="json")
+    )
+    return db_evaluation
+
+@app.get("/players/{player_id}/evaluations", response_model=List[EvaluationResponse])
+async def get_player_evaluations(
+    player_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a player's evaluations, newest first; older ranges read through to the archive"""
+    columns = requested_fields(fields, EVALUATION_FIELDS)
+    if not db.query(Player.id).filter(Player.id == player_id).first():
+        raise HTTPException(status_code=404, detail="Player not found")
+    evaluations = list_player_evaluations(db, player_id, since=since, until=until, skip=skip, limit=limit,
+                                          fields=columns)
+    return evaluations if columns is None else projected(evaluations)
+
+@app.get("/stream/evaluations")
+async def stream_evaluations(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Server-sent event stream of new evaluations for the caller's watchlisted players"""
+    try:
+        subscription = evaluation_events.subscribe(tenant, current_user.id)
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many open streams, try again later")
+
+    async def event_stream():
+        try:
+            yield format_sse("ready", {"user": current_user.username})
+            while not await request.is_disconnected():
+                event = await subscription.next_event(STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield format_sse(*event)
+        finally:
+            evaluation_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --- Scoring Routes ---
+
+@app.get("/scoring/profiles", response_model=List[ScoringProfileResponse])
+async def get_scoring_profiles(
+    sport: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List scoring weight profiles"""
+    query = db.query(ScoringProfile)
+    if sport:
+        query = query.filter(ScoringProfile.sport == sport)
+    return query.order_by(ScoringProfile.sport, ScoringProfile.position).all()
+
+@app.put("/scoring/profiles", response_model=ScoringProfileResponse)
+async def put_scoring_profile(
+    profile: ScoringProfileUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Create or replace a scoring profile and recompute the scores it governs"""
+    if not profile.weights or any(
+        not isinstance(w, (int, float)) or isinstance(w, bool) or w < 0 for w in profile.weights.values()
+    ):
+        raise HTTPException(status_code=400, detail="weights must map criteria to non-negative numbers")
+    # position == None renders IS NULL, which finds the sport default
+    db_profile = db.query(ScoringProfile).filter(
+        ScoringProfile.sport == profile.sport, ScoringProfile.position == profile.position
+    ).first()
+    if db_profile is None:
+        db_profile = ScoringProfile(sport=profile.sport, position=profile.position)
+        db.add(db_profile)
+    db_profile.weights = profile.weights
+    db.commit()
+    db.refresh(db_profile)
+
+    response = ScoringProfileResponse.model_validate(db_profile)
+    try:
+        job = job_runner.submit(db, "recompute_scores", {"sport": profile.sport, "position": profile.position},
+                                user_id=current_user.id, tenant=tenant)
+        response.recompute_job_id = job.id
+    except JobQueueFull:
+        pass
+    return response
+
+# --- Watchlist Routes ---
+
+@app.get("/watchlists", response_model=List[WatchlistResponse])
+async def get_watchlist(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the caller's watchlist"""
+    return db.query(Watchlist).filter(Watchlist.user_id == current_user.id).order_by(Watchlist.id).all()
+
+@app.post("/watchlists", response_model=WatchlistResponse, status_code=status.HTTP_201_CREATED)
+async def add_to_watchlist(
+    entry: WatchlistCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add a player to the caller's watchlist"""
+    if not db.query(Player.id).filter(Player.id == entry.player_id).first():
+        raise HTTPException(status_code=404, detail="Player not found")
+    existing = db.query(Watchlist).filter(
+        Watchlist.user_id == current_user.id, Watchlist.player_id == entry.player_id
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Player already on watchlist")
+    db_entry = Watchlist(user_id=current_user.id, player_id=entry.player_id, notes=entry.notes)
+    db.add(db_entry)
+    db.commit()
+    db.refresh(db_entry)
+    return db_entry
+
+@app.delete("/watchlists/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_from_watchlist(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove a player from the caller's watchlist"""
+    db_entry = db.query(Watchlist).filter(Watchlist.id == entry_id, Watchlist.user_id == current_user.id).first()
+    if not db_entry:
+        raise HTTPException(status_code=404, detail="Watchlist entry not found")
+    db.delete(db_entry)
+    db.commit()
+    return None
+
+# --- Batch Routes ---
+
+@app.post("/batch", response_model=BatchResult)
+async def apply_batch(
+    batch: BatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Apply many creates, updates and deletes in one transaction; all or nothing"""
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="No operations given")
+    if len(batch.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_OPERATIONS} operations per batch")
+    with span("batch.apply", operations=len(batch.operations)):
+        result = run_batch(db, current_user, [op.dict() for op in batch.operations], BATCH_SCHEMAS)
+    if not result["committed"]:
+        return result
+
+    def applied(op, entity):
+        return [r["id"] for r in result["results"] if r["op"] == op and r["entity"] == entity]
+
+    evaluation_ids = applied("create", "evaluation")
+    if evaluation_ids:
+        # One query reloads every new evaluation and one finds all their watchers
+        created = db.query(Evaluation).filter(Evaluation.id.in_(evaluation_ids)).all()
+        watchers = {}
+        for user_id, player_id in db.query(Watchlist.user_id, Watchlist.player_id).filter(
+            Watchlist.player_id.in_({e.player_id for e in created})
+        ):
+            watchers.setdefault(player_id, []).append(user_id)
+        for db_evaluation in created:
+            evaluation_events.publish(
+                tenant, watchers.get(db_evaluation.player_id, []), "evaluation",
+                EvaluationResponse.model_validate(db_evaluation).model_dump(mode="json")
+            )
+    deleted = applied("delete", "player")
+    if deleted:
+        try:
+            job_runner.submit(db, "purge_players", {"player_ids": deleted}, user_id=current_user.id, tenant=tenant)
+        except JobQueueFull:
+            pass
+    return result
+
+# --- Sync Routes ---
+
+@app.get("/changes", response_model=ChangeFeed)
+async def get_change_feed(
+    since: Optional[str] = None,
+    limit: int = CHANGES_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get players, evaluations and watchlist entries changed since a cursor, one page at a time"""
+    try:
+        return get_changes(db, current_user, since, max(1, min(limit, CHANGES_PAGE_SIZE)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Admin Routes ---
+
+@app.get("/admin/profiles", response_model=List[RequestProfile])
+async def list_profiles(
+    limit: int = 50,
+    current_user: User = Depends(require_admin)
+):
+    """Recently captured request profiles, newest first"""
+    return request_profiler.recent(limit)
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(require_admin)
+):
+    """Raw profile for a request: pstats data, or HTML from pyinstrument"""
+    path = request_profiler.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name)
+
+@app.post("/admin/players/bulk-update", response_model=BulkResult)
+async def bulk_update(
+    bulk: BulkPlayerUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Patch every player matching a filter in one UPDATE; dry_run only counts them"""
+    try:
+        conditions = player_filter(**bulk.filter.dict())
+        return bulk_update_players(db, conditions, bulk.patch.dict(exclude_unset=True), dry_run=bulk.dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Player already exists")
+
+@app.post("/admin/players/bulk-delete", response_model=BulkResult)
+async def bulk_delete(
+    bulk: BulkPlayerDelete,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Soft-delete every player matching a filter; one purge job cleans up after them"""
+    try:
+        conditions = player_filter(**bulk.filter.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = bulk_delete_players(db, conditions, dry_run=bulk.dry_run)
+    if result["matched"] and not result["dry_run"]:
+        try:
+            # No ids: the purge sweeps every soft-deleted player, however many matched
+            job = job_runner.submit(db, "purge_players", {}, user_id=current_user.id, tenant=tenant)
+            result["purge_job_id"] = job.id
+        except JobQueueFull:
+            pass
+    return result
+
+# --- Background Job Routes ---
+
+def get_visible_job(db: Session, job_id: int, current_user: User) -> Job:
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job or (current_user.role != "admin" and job.created_by != current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_or_coach),
+    tenant: Optional[str] = Depends(get_tenant)
+):
+    """Queue a long-running job and return immediately"""
+    try:
+        return job_runner.submit(db, job.kind, job.params, user_id=current_user.id, tenant=tenant)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status and result of a job"""
+    return get_visible_job(db, job_id, current_user)
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_or_coach)
+):
+    """Cancel a queued or running job"""
+    job = get_visible_job(db, job_id, current_user)
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Job already {job.status}")
+    return job_runner.cancel(db, job)
@@ -0,0 +1,71 @@
+"""
+Single-statement player writes
+Inserts and updates use RETURNING, so the response row comes back with the
+write instead of from a refresh SELECT after commit
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from .dedup import blocking_key
+from .projection import player_rating_column
+from models import Player
+
+players = Player.__table__
+
+# Changing any of these can move a player to another duplicate-detection block
+IDENTITY_FIELDS = ("sport", "last_name", "date_of_birth")
+BLOCK_KEY_CHUNK = 5000
+
+
+def insert_player(db: Session, data: dict) -> dict:
+    """INSERT ... RETURNING a new player; raises IntegrityError on a duplicate"""
+    values = {**data, "block_key": blocking_key(data.get("sport"), data.get("last_name"), data.get("date_of_birth"))}
+    row = db.execute(insert(players).values(**values).returning(*players.c)).one()
+    return {**row._mapping, "rating": None}
+
+
+def update_player(db: Session, player_id: int, data: dict) -> Optional[dict]:
+    """UPDATE ... RETURNING one live player; None when there is no such player"""
+    row = db.execute(
+        update(players)
+        .where(players.c.id == player_id, players.c.deleted_at.is_(None))
+        .values(**data, updated_at=datetime.utcnow())
+        .returning(*players.c, player_rating_column())
+    ).first()
+    if row is None:
+        return None
+    player = dict(row._mapping)
+    # Only renames, sport changes and birth date fixes move a player to another block
+    key = blocking_key(player["sport"], player["last_name"], player["date_of_birth"])
+    if key != player["block_key"]:
+        db.execute(update(players).where(players.c.id == player_id).values(block_key=key))
+        player["block_key"] = key
+    return player
+
+
+def refresh_block_keys(db: Session, player_ids: Iterable[int]) -> int:
+    """Recompute block_key after a set-based write to these players; returns how many moved"""
+    ids = list(player_ids)
+    moved = 0
+    # Chunked so the IN list stays under the driver's bound-parameter limit
+    for start in range(0, len(ids), BLOCK_KEY_CHUNK):
+        rows = db.execute(
+            select(players.c.id, players.c.sport, players.c.last_name, players.c.date_of_birth, players.c.block_key)
+            .where(players.c.id.in_(ids[start:start + BLOCK_KEY_CHUNK]))
+        ).all()
+        changes = [
+            {"b_id": row.id, "b_key": key}
+            for row in rows
+            if (key := blocking_key(row.sport, row.last_name, row.date_of_birth)) != row.block_key
+        ]
+        if changes:
+            db.execute(
+                update(players).where(players.c.id == bindparam("b_id")).values(block_key=bindparam("b_key")),
+                changes,
+            )
+        moved += len(changes)
+    return moved
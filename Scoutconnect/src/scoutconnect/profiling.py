@@ -0,0 +1,134 @@
+"""
+Opt-in CPU profiling of individual requests
+An admin can ask for a profile with the X-Profile header, and PROFILE_SAMPLE_RATE
+profiles a share of all traffic. Profiles are kept on disk by request id, oldest
+pruned first.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    # Statistical and asyncio-aware; plain cProfile is used when it isn't installed
+    from pyinstrument import Profiler as StatisticalProfiler
+except ImportError:
+    StatisticalProfiler = None
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_HEADER = "X-Profile"
+
+REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def request_id(header: Optional[str] = None) -> str:
+    """The caller's X-Request-ID when it is safe to use as a file name, else a new one"""
+    return header if header and REQUEST_ID.match(header) else uuid.uuid4().hex
+
+
+def _top_functions(profile: cProfile.Profile, limit: int = PROFILE_TOP_FUNCTIONS) -> List[dict]:
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{Path(filename).name}:{line}({name})",
+            "calls": calls,
+            "self_ms": round(self_time * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, self_time, cumulative, _) in rows
+    ]
+
+
+class RequestProfiler:
+    """Profiles one request at a time per process and keeps the last few on disk.
+
+    The profiler sees everything on the event loop thread while it runs, so
+    requests served concurrently can show up in each other's profiles.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._busy = threading.Lock()
+
+    def start(self):
+        """Begin profiling, or return None when another request is being profiled"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            if StatisticalProfiler:
+                profiler = StatisticalProfiler(async_mode="enabled")
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except Exception:
+            self._busy.release()
+            raise
+        return profiler
+
+    def stop(self, profiler):
+        try:
+            if StatisticalProfiler:
+                profiler.stop()
+            else:
+                profiler.disable()
+        finally:
+            self._busy.release()
+
+    def save(self, profiler, meta: dict) -> dict:
+        """Write a stopped profile plus its metadata, then prune old profiles"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        rid = meta["request_id"]
+        if StatisticalProfiler:
+            meta.update(format="html", top=[])
+            (self.directory / f"{rid}.html").write_text(profiler.output_html())
+        else:
+            meta.update(format="prof", top=_top_functions(profiler))
+            profiler.dump_stats(str(self.directory / f"{rid}.prof"))
+        meta["created_at"] = datetime.utcnow().isoformat()
+        (self.directory / f"{rid}.json").write_text(json.dumps(meta))
+        self.prune()
+        return meta
+
+    def prune(self):
+        for meta_path in self._meta_files()[self.max_files:]:
+            for path in self.directory.glob(f"{meta_path.stem}.*"):
+                path.unlink(missing_ok=True)
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        profiles = []
+        for meta_path in self._meta_files()[:limit]:
+            try:
+                profiles.append(json.loads(meta_path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def path(self, rid: str) -> Optional[Path]:
+        if not REQUEST_ID.match(rid):
+            return None
+        for suffix in (".prof", ".html"):
+            path = self.directory / f"{rid}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def _meta_files(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+request_profiler = RequestProfiler()
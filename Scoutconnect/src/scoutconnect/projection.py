@@ -0,0 +1,61 @@
+"""
+Field projection for player and evaluation reads
+``fields=id,first_name,sport`` narrows both the SELECT column list and the payload
+"""
+
+from decimal import Decimal
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import literal, select
+
+from models import Player, PlayerRating
+
+# Everything PlayerResponse / EvaluationResponse can carry
+PLAYER_FIELDS = (
+    "id", "external_id", "first_name", "last_name", "date_of_birth", "sport",
+    "position", "height_cm", "weight_kg", "created_at", "updated_at", "rating",
+)
+EVALUATION_FIELDS = (
+    "id", "player_id", "evaluator_id", "sport", "criteria", "score",
+    "notes", "created_at", "updated_at", "archived",
+)
+
+
+def player_rating_column():
+    """The player's current rating as a correlated subquery, so no join is needed"""
+    return (
+        select(PlayerRating.rating)
+        .where(PlayerRating.player_id == Player.__table__.c.id)
+        .scalar_subquery()
+        .label("rating")
+    )
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Split a ``fields=`` parameter; None means every field. Raises ValueError on unknown names."""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in allowed]
+    if unknown or not names:
+        raise ValueError(f"Unknown fields: {', '.join(unknown) or '(none given)'}; choose from {', '.join(allowed)}")
+    return names
+
+
+def player_columns(names: Sequence[str]) -> list:
+    return [player_rating_column() if n == "rating" else getattr(Player, n) for n in names]
+
+
+def evaluation_columns(model, names: Sequence[str]) -> list:
+    """Columns of Evaluation or ArchivedEvaluation; ``archived`` comes from the table read"""
+    return [literal(model.archived).label("archived") if n == "archived" else getattr(model, n) for n in names]
+
+
+def json_default(value):
+    """json.dumps fallback for the column types projections return"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,177 @@
+"""
+Player rating engine
+A Bayesian weighted mean of evaluation scores, corrected for evaluator bias and
+decayed over time. Each new evaluation updates the rating in O(1); a vectorized
+batch job rebuilds every rating from scratch.
+"""
+
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .jobs import job_session, register_job
+from models import Evaluation, EvaluatorStats, PlayerRating
+
+# The prior acts like RATING_PRIOR_WEIGHT evaluations scoring RATING_PRIOR_MEAN
+RATING_PRIOR_MEAN = float(os.getenv("RATING_PRIOR_MEAN", "75"))
+RATING_PRIOR_WEIGHT = float(os.getenv("RATING_PRIOR_WEIGHT", "2"))
+# An evaluation counts half as much after this many days
+RATING_HALF_LIFE_DAYS = float(os.getenv("RATING_HALF_LIFE_DAYS", "365"))
+# Evaluator bias is shrunk towards zero as if from this many unbiased evaluations
+RATING_BIAS_PRIOR = float(os.getenv("RATING_BIAS_PRIOR", "5"))
+
+DECAY_PER_SECOND = math.log(2) / (RATING_HALF_LIFE_DAYS * 86400)
+EPOCH = datetime(1970, 1, 1)
+
+# INSERT ... ON CONFLICT DO NOTHING per dialect
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def posterior_rating(weighted_sum: float, weight: float) -> float:
+    return round((RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + weighted_sum) / (RATING_PRIOR_WEIGHT + weight), 2)
+
+
+def _locked_row(db: Session, model, key: dict, defaults: dict):
+    """The row of ``model`` with primary key ``key``, created if missing and locked until commit.
+
+    Insert-or-ignore lets concurrent first evaluations agree on one row, and
+    SELECT ... FOR UPDATE serializes the read-modify-write that follows on
+    Postgres; SQLite already holds its single write lock after the insert.
+    """
+    insert_for = _INSERTS.get(db.get_bind().dialect.name)
+    if insert_for is not None:
+        db.execute(insert_for(model).values(**key, **defaults).on_conflict_do_nothing())
+    # Sessions don't autoflush; flush so the refresh below can't drop earlier changes in this transaction
+    db.flush()
+    row = db.query(model).filter_by(**key).with_for_update().populate_existing().one_or_none()
+    if row is None:
+        row = model(**key, **defaults)
+        db.add(row)
+        db.flush([row])
+    return row
+
+
+def apply_evaluation(db: Session, player_id: int, evaluator_id: Optional[int], score: Optional[float],
+                     at: Optional[datetime] = None) -> Optional[PlayerRating]:
+    """Fold one new evaluation into the player's rating and the evaluator's bias.
+
+    Touches exactly two rows by primary key, both locked until the caller commits.
+    """
+    if score is None:
+        return None
+    at = at or datetime.utcnow()
+    score = float(score)
+
+    rating = _locked_row(db, PlayerRating, {"player_id": player_id},
+                         {"weighted_sum": 0.0, "weight": 0.0, "rating": RATING_PRIOR_MEAN, "as_of": at})
+    current = float(rating.rating)
+
+    bias = 0.0
+    if evaluator_id is not None:
+        stats = _locked_row(db, EvaluatorStats, {"user_id": evaluator_id}, {"bias": 0.0, "evaluations": 0})
+        bias = stats.bias
+        # Shrunk running mean of how far this evaluator sits from the consensus
+        n = stats.evaluations + RATING_BIAS_PRIOR
+        stats.bias = (stats.bias * n + (score - current)) / (n + 1)
+        stats.evaluations += 1
+
+    # Decay the stored sums to the new evaluation's time, then add it
+    elapsed = max((at - rating.as_of).total_seconds(), 0.0)
+    decay = math.exp(-DECAY_PER_SECOND * elapsed)
+    rating.weighted_sum = rating.weighted_sum * decay + (score - bias)
+    rating.weight = rating.weight * decay + 1.0
+    rating.as_of = max(at, rating.as_of)
+    rating.rating = posterior_rating(rating.weighted_sum, rating.weight)
+    return rating
+
+
+def merge_player_ratings(db: Session, keep_id: int, other_ids) -> Optional[PlayerRating]:
+    """Combine the rating state of merged players into ``keep_id``"""
+    rows = db.query(PlayerRating).filter(PlayerRating.player_id.in_([keep_id, *other_ids])).all()
+    if not rows:
+        return None
+    as_of = max(r.as_of for r in rows)
+    decays = [math.exp(-DECAY_PER_SECOND * (as_of - r.as_of).total_seconds()) for r in rows]
+    weighted_sum = sum(r.weighted_sum * d for r, d in zip(rows, decays))
+    weight = sum(r.weight * d for r, d in zip(rows, decays))
+
+    keep = next((r for r in rows if r.player_id == keep_id), None)
+    for r in rows:
+        if r is not keep:
+            db.delete(r)
+    if keep is None:
+        keep = PlayerRating(player_id=keep_id)
+        db.add(keep)
+    keep.weighted_sum, keep.weight, keep.as_of = weighted_sum, weight, as_of
+    keep.rating = posterior_rating(weighted_sum, weight)
+    return keep
+
+
+def recompute_ratings(db: Session) -> dict:
+    """Rebuild every player rating and evaluator bias from all evaluations at once"""
+    rows = (
+        db.query(Evaluation.player_id, Evaluation.evaluator_id, Evaluation.score, Evaluation.created_at)
+        .filter(Evaluation.score.isnot(None))
+        .all()
+    )
+    if not rows:
+        db.execute(delete(PlayerRating))
+        db.execute(delete(EvaluatorStats))
+        db.commit()
+        return {"players": 0, "evaluators": 0, "evaluations": 0}
+
+    player_ids, player_index = np.unique(np.array([r[0] for r in rows]), return_inverse=True)
+    evaluator_ids, evaluator_index = np.unique(np.array([r[1] or 0 for r in rows]), return_inverse=True)
+    scores = np.array([float(r[2]) for r in rows])
+    now = datetime.utcnow()
+    times = np.array([((r[3] or now) - EPOCH).total_seconds() for r in rows])
+
+    # Evaluator bias: shrunk mean residual against each player's raw mean
+    counts = np.bincount(player_index)
+    player_mean = np.bincount(player_index, weights=scores) / counts
+    residuals = scores - player_mean[player_index]
+    bias = np.bincount(evaluator_index, weights=residuals) / (np.bincount(evaluator_index) + RATING_BIAS_PRIOR)
+    bias[evaluator_ids == 0] = 0.0
+    adjusted = scores - bias[evaluator_index]
+
+    # Decay each evaluation relative to the player's latest one
+    latest = np.full(len(player_ids), -np.inf)
+    np.maximum.at(latest, player_index, times)
+    weights = np.exp(-DECAY_PER_SECOND * (latest[player_index] - times))
+    weighted_sum = np.bincount(player_index, weights=weights * adjusted)
+    weight = np.bincount(player_index, weights=weights)
+    ratings = np.round((RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + weighted_sum) / (RATING_PRIOR_WEIGHT + weight), 2)
+
+    db.execute(delete(PlayerRating))
+    db.execute(insert(PlayerRating), [
+        {
+            "player_id": int(pid), "rating": float(r), "weighted_sum": float(s),
+            "weight": float(w), "as_of": EPOCH + timedelta(seconds=float(t)), "updated_at": now,
+        }
+        for pid, r, s, w, t in zip(player_ids, ratings, weighted_sum, weight, latest)
+    ])
+    evaluator_counts = np.bincount(evaluator_index)
+    db.execute(delete(EvaluatorStats))
+    stats = [
+        {"user_id": int(uid), "bias": float(b), "evaluations": int(n), "updated_at": now}
+        for uid, b, n in zip(evaluator_ids, bias, evaluator_counts)
+        if uid != 0
+    ]
+    if stats:
+        # An empty parameter list would run a single INSERT of defaults
+        db.execute(insert(EvaluatorStats), stats)
+    db.commit()
+    return {"players": len(player_ids), "evaluators": int((evaluator_ids != 0).sum()), "evaluations": len(rows)}
+
+
+@register_job("recompute_ratings", cpu_bound=True, limit=1)
+def recompute_ratings_job(params: dict) -> dict:
+    """Background full rebuild of player ratings"""
+    with job_session(params) as db:
+        return recompute_ratings(db)
@@ -0,0 +1,104 @@
+"""
+Idempotent bulk upsert of players from external club rosters
+Uses INSERT ... ON CONFLICT DO UPDATE so nightly syncs keep player ids stable
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import or_, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .dedup import blocking_key
+from models import Player
+
+UPSERT_BATCH_SIZE = 500
+
+# Columns a roster row may set; everything else is managed by the API
+ROSTER_COLUMNS = [
+    "external_id", "first_name", "last_name", "date_of_birth",
+    "sport", "position", "height_cm", "weight_kg",
+]
+
+# Conflict targets for each supported key
+UPSERT_KEYS = {
+    "external_id": ["external_id"],
+    "identity": ["first_name", "last_name", "date_of_birth", "sport"],
+}
+
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise ValueError(f"Bulk upsert is not supported on {dialect}")
+
+
+def _existing_keys(db: Session, key_columns: List[str], batch: List[dict]) -> set:
+    """Return the conflict keys in this batch that already exist"""
+    columns = [getattr(Player, c) for c in key_columns]
+    keys = [tuple(row[c] for c in key_columns) for row in batch]
+    if len(columns) == 1:
+        condition = columns[0].in_([k[0] for k in keys])
+    else:
+        condition = or_(*[and_(*[col == value for col, value in zip(columns, k)]) for k in keys])
+    query = db.query(*columns).filter(condition).execution_options(include_deleted=True)
+    return set(tuple(r) for r in query.all())
+
+
+def upsert_players(db: Session, rows: List[dict], key: str = "external_id",
+                   batch_size: int = UPSERT_BATCH_SIZE) -> Dict[str, int]:
+    """Insert new players and update changed ones, keyed by ``key``.
+
+    Rows whose values already match the stored player are left alone, so
+    ``updated_at`` only moves when something actually changed. The whole
+    roster is one transaction: when any batch fails (e.g. a row hits another
+    player's identity) nothing is applied. Returns the number of inserted,
+    updated and unchanged rows.
+    """
+    if key not in UPSERT_KEYS:
+        raise ValueError(f"Unknown upsert key: {key}")
+    key_columns = UPSERT_KEYS[key]
+    insert = _insert_for(db)
+
+    # Last row wins when a roster lists the same player twice
+    deduped = {}
+    for row in rows:
+        row = {c: row.get(c) for c in ROSTER_COLUMNS}
+        if any(row[c] is None for c in key_columns):
+            raise ValueError(f"Roster rows need {', '.join(key_columns)} to upsert by {key}")
+        row["block_key"] = blocking_key(row["sport"], row["last_name"], row["date_of_birth"])
+        deduped[tuple(row[c] for c in key_columns)] = row
+    rows = list(deduped.values())
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    table = Player.__table__
+    update_columns = [c for c in ROSTER_COLUMNS + ["block_key"] if c not in key_columns]
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        existing = _existing_keys(db, key_columns, batch)
+
+        stmt = insert(table).values(batch)
+        # A player still on the club roster is restored if it was soft-deleted
+        changed = or_(
+            table.c.deleted_at.isnot(None),
+            *[table.c[c].is_distinct_from(stmt.excluded[c]) for c in update_columns],
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={**{c: stmt.excluded[c] for c in update_columns}, "updated_at": datetime.utcnow(), "deleted_at": None, "change_seq": None},
+            where=changed,
+        ).returning(*[table.c[c] for c in key_columns])
+
+        touched = set(tuple(r) for r in db.execute(stmt).all())
+        inserted = len(touched - existing)
+        counts["inserted"] += inserted
+        counts["updated"] += len(touched) - inserted
+        counts["unchanged"] += len(batch) - len(touched)
+
+    db.commit()
+    return counts
@@ -0,0 +1,123 @@
+"""
+Per-sport scoring engine for evaluations
+Scores are computed from the criteria with weights stored in scoring_profiles,
+and a vectorized batch job recomputes them when a profile changes
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from .jobs import job_session, register_job
+from .ratings import recompute_ratings
+from models import Evaluation, Player, ScoringProfile
+
+RECOMPUTE_CHUNK_SIZE = int(os.getenv("RECOMPUTE_CHUNK_SIZE", "50000"))
+
+
+def resolve_profile(db: Session, sport: str, position: Optional[str] = None) -> Optional[ScoringProfile]:
+    """The position profile for a sport if there is one, else the sport default"""
+    profiles = db.query(ScoringProfile).filter(ScoringProfile.sport == sport).all()
+    by_position = {p.position: p for p in profiles}
+    return by_position.get(position) or by_position.get(None)
+
+
+def compute_score(criteria: Optional[dict], weights: Optional[Dict[str, float]] = None) -> Optional[float]:
+    """Weighted mean of the numeric criteria; a plain mean when there are no weights"""
+    values = {k: v for k, v in (criteria or {}).items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    if weights is None:
+        weights = {k: 1.0 for k in values}
+    total = sum(w for k, w in weights.items() if k in values)
+    if not total:
+        return None
+    return round(sum(values[k] * w for k, w in weights.items() if k in values) / total, 2)
+
+
+def criteria_matrix(criteria_rows: List[Optional[dict]], names: List[str]) -> np.ndarray:
+    """Lay criteria out as a rows x criteria matrix with NaN for anything missing"""
+    index = {name: i for i, name in enumerate(names)}
+    matrix = np.full((len(criteria_rows), len(names)), np.nan)
+    for row, criteria in enumerate(criteria_rows):
+        for name, value in (criteria or {}).items():
+            column = index.get(name)
+            if column is not None and isinstance(value, (int, float)) and not isinstance(value, bool):
+                matrix[row, column] = value
+    return matrix
+
+
+def weighted_scores(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Vectorized compute_score over a criteria matrix; NaN where nothing is scorable"""
+    present = ~np.isnan(matrix)
+    total = (present * weights).sum(axis=1)
+    weighted = np.where(present, matrix, 0.0) @ weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(total > 0, weighted / total, np.nan)
+    return np.round(scores, 2)
+
+
+def recompute_scores(db: Session, sport: str, position: Optional[str] = None,
+                     chunk_size: int = RECOMPUTE_CHUNK_SIZE) -> dict:
+    """Recompute every evaluation score governed by the (sport, position) profile.
+
+    A sport default covers players whose position has no profile of its own.
+    Only rows whose score actually changes are written. Archived evaluations
+    are left alone: they keep the score they had when they were archived,
+    and ratings are built from the hot table only.
+    """
+    profiles = {p.position: p for p in db.query(ScoringProfile).filter(ScoringProfile.sport == sport)}
+    profile = profiles.get(position)
+    if profile is None:
+        return {"evaluations": 0, "updated": 0}
+    names = list(profile.weights)
+    weights = np.array([float(profile.weights[n]) for n in names])
+
+    query = (
+        db.query(Evaluation.id, Evaluation.criteria, Evaluation.score)
+        .join(Player, Player.id == Evaluation.player_id)
+        .filter(Evaluation.sport == sport)
+        .order_by(Evaluation.id)
+    )
+    if position is not None:
+        query = query.filter(Player.position == position)
+    else:
+        others = [p for p in profiles if p is not None]
+        if others:
+            query = query.filter(or_(Player.position.is_(None), Player.position.notin_(others)))
+
+    seen = updated = 0
+    last_id = 0
+    while True:
+        rows = query.filter(Evaluation.id > last_id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        seen += len(rows)
+
+        ids = np.array([r[0] for r in rows])
+        old = np.array([float(r[2]) if r[2] is not None else np.nan for r in rows])
+        new = weighted_scores(criteria_matrix([r[1] for r in rows], names), weights)
+        changed = ~np.isnan(new) & (np.isnan(old) | (np.abs(new - old) >= 0.005))
+        if changed.any():
+            now = datetime.utcnow()
+            db.execute(update(Evaluation), [
+                {"id": int(i), "score": float(s), "updated_at": now}
+                for i, s in zip(ids[changed], new[changed])
+            ])
+            db.commit()
+            updated += int(changed.sum())
+
+    return {"evaluations": seen, "updated": updated}
+
+
+@register_job("recompute_scores", cpu_bound=True, limit=1)
+def recompute_scores_job(params: dict) -> dict:
+    """Background recompute after a scoring profile changes; ratings are rebuilt from the new scores"""
+    with job_session(params) as db:
+        result = recompute_scores(db, params["sport"], params.get("position"))
+        if result["updated"]:
+            result["ratings"] = recompute_ratings(db)
+        return result
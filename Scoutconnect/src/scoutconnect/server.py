@@ -0,0 +1,129 @@
+"""
+Production server
+Runs uvicorn with one worker per usable core, uvloop and httptools when they
+are installed and a bounded graceful drain on SIGTERM. Workers share a runtime
+directory: evaluation streams relay events through it and a lock file in it
+picks the one worker that runs background jobs
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+APP = "src.scoutconnect.main:app"
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+# Worker processes; unset means one per usable core
+WEB_CONCURRENCY = os.getenv("WEB_CONCURRENCY")
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# Seconds in-flight requests get to finish after SIGTERM
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+# Above this many open connections new requests get a 503 instead of queueing
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0")) or None
+# Recycle a worker after this many requests; 0 never does
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0")) or None
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def available_cores() -> int:
+    """Cores this process may use: CPU affinity, capped by a cgroup v2 CPU quota"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            # docker run --cpus=2 shows up as "200000 100000"
+            cores = min(cores, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def default_workers(database_url: str) -> int:
+    """One worker per core; SQLite allows a single writer, so extra processes only fight over the lock"""
+    if database_url.startswith("sqlite"):
+        return 1
+    return available_cores()
+
+
+def server_config(host: Optional[str] = None, port: Optional[int] = None,
+                  workers: Optional[int] = None) -> dict:
+    """Keyword arguments for uvicorn.run; explicit arguments win over the environment"""
+    if workers is None:
+        workers = (int(WEB_CONCURRENCY) if WEB_CONCURRENCY
+                   else default_workers(os.getenv("DATABASE_URL", "sqlite:///./scoutconnect.db")))
+    return {
+        "host": host or SERVER_HOST,
+        "port": port or SERVER_PORT,
+        "workers": max(1, workers),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "timeout_keep_alive": SERVER_KEEPALIVE,
+        "backlog": SERVER_BACKLOG,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_TIMEOUT,
+        "limit_concurrency": SERVER_LIMIT_CONCURRENCY,
+        "limit_max_requests": SERVER_MAX_REQUESTS,
+        "proxy_headers": True,
+        "forwarded_allow_ips": FORWARDED_ALLOW_IPS,
+        "log_level": LOG_LEVEL,
+    }
+
+
+def preload(app: str = APP):
+    """Import the app and create its schema in the supervisor, before any worker starts.
+
+    A broken build fails once, up front, and workers starting together on a
+    fresh database find the tables in place instead of racing to create them.
+    uvicorn spawns its workers, so each still imports the app itself.
+    """
+    from .db import Base, engine
+
+    module, _, attribute = app.partition(":")
+    loaded = getattr(importlib.import_module(module), attribute)
+    Base.metadata.create_all(bind=engine)
+    return loaded
+
+
+def share_runtime(directory: str) -> None:
+    """Point the workers at one stream relay directory and job runner lock; explicit settings win"""
+    os.environ.setdefault("STREAM_RELAY_DIR", os.path.join(directory, "streams"))
+    os.environ.setdefault("JOB_RUNNER_LOCK", os.path.join(directory, "jobs.lock"))
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None) -> None:
+    """Run the API until SIGTERM/SIGINT, then drain in-flight requests"""
+    import uvicorn
+
+    config = server_config(host, port, workers)
+    runtime = tempfile.mkdtemp(prefix="scoutconnect-") if config["workers"] > 1 else None
+    if runtime:
+        # Set before the app is imported here or in the spawned workers
+        share_runtime(runtime)
+    try:
+        preload()
+        logger.info("Serving %s with %d worker(s), loop=%s, http=%s",
+                    APP, config["workers"], config["loop"], config["http"])
+        uvicorn.run(APP, **config)
+    finally:
+        if runtime:
+            shutil.rmtree(runtime, ignore_errors=True)
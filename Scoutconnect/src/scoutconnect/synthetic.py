@@ -0,0 +1,338 @@
+"""
+Deterministic synthetic datasets for benchmarking
+The same seed always yields the same users, players, evaluations and watchlist
+entries. Rows are generated with NumPy and bulk-inserted in large batches on a
+connection tuned for loading.
+"""
+
+import os
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from passlib.context import CryptContext
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .changes import stamp_changes
+from .dedup import blocking_key
+from .loading import bulk_load, insert_rows
+from .ratings import recompute_ratings
+from models import Base, User, Player, Evaluation, Watchlist
+
+GENERATE_BATCH_SIZE = int(os.getenv("GENERATE_BATCH_SIZE", "50000"))
+
+# Positions and evaluation criteria per sport, with (mean, sd) height in cm and weight in kg
+SPORTS = {
+    "soccer": {
+        "positions": ["GK", "DF", "MF", "FW"],
+        "criteria": ["pace", "passing", "shooting", "defending", "stamina", "vision"],
+        "height": (180, 7), "weight": (75, 7),
+    },
+    "basketball": {
+        "positions": ["PG", "SG", "SF", "PF", "C"],
+        "criteria": ["shooting", "defense", "speed", "rebounding", "leadership"],
+        "height": (198, 9), "weight": (95, 10),
+    },
+    "football": {
+        "positions": ["QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S"],
+        "criteria": ["accuracy", "decision_making", "speed", "strength", "tackling", "leadership"],
+        "height": (188, 7), "weight": (102, 15),
+    },
+    "tennis": {
+        "positions": ["Singles", "Doubles"],
+        "criteria": ["serve", "groundstrokes", "footwork", "mental_toughness", "fitness"],
+        "height": (183, 7), "weight": (77, 7),
+    },
+    "baseball": {
+        "positions": ["P", "C", "1B", "2B", "SS", "3B", "OF"],
+        "criteria": ["hitting", "power", "fielding", "arm", "speed"],
+        "height": (185, 6), "weight": (88, 9),
+    },
+}
+SPORT_NAMES = list(SPORTS)
+MAX_CRITERIA = max(len(s["criteria"]) for s in SPORTS.values())
+
+FIRST_NAMES = (
+    "James Mary Michael Patricia John Jennifer Robert Linda David Elizabeth William Barbara Richard Susan "
+    "Joseph Jessica Thomas Sarah Charles Karen Daniel Lisa Matthew Nancy Anthony Betty Mark Sandra Donald "
+    "Ashley Steven Kimberly Andrew Emily Paul Donna Joshua Michelle Kenneth Carol Kevin Amanda Brian Melissa "
+    "George Deborah Timothy Stephanie Ronald Rebecca Jason Sharon Edward Laura Jeffrey Cynthia Ryan Amy Jacob "
+    "Kathleen Gary Angela Nicholas Shirley Eric Brenda Jonathan Emma Stephen Anna Larry Pamela Justin Nicole "
+    "Scott Samantha Brandon Katherine Benjamin Christine Samuel Debra Gregory Rachel Alexander Carolyn Patrick "
+    "Janet Frank Maria Raymond Olivia Jack Heather Dennis Helen Jerry Catherine Tyler Diane Aaron Julie"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez Lopez Gonzalez Wilson "
+    "Anderson Thomas Taylor Moore Jackson Martin Lee Perez Thompson White Harris Sanchez Clark Ramirez Lewis "
+    "Robinson Walker Young Allen King Wright Scott Torres Nguyen Hill Flores Green Adams Nelson Baker Hall "
+    "Rivera Campbell Mitchell Carter Roberts Gomez Phillips Evans Turner Diaz Parker Cruz Edwards Collins Reyes "
+    "Stewart Morris Morales Murphy Cook Rogers Gutierrez Ortiz Morgan Cooper Peterson Bailey Reed Kelly Howard "
+    "Ramos Kim Cox Ward Richardson Watson Brooks Chavez Wood James Bennett Gray Mendoza Ruiz Hughes Price "
+    "Alvarez Castillo Sanders Patel Myers Long Ross Foster Jimenez Powell Jenkins Perry Russell Sullivan Bell "
+    "Coleman Butler Henderson Barnes Gonzales Fisher Vasquez Simmons Romero Jordan Patterson Alexander Hamilton "
+    "Graham Reynolds Griffin Wallace Moreno West Cole Hayes Bryant Herrera Gibson Ellis Tran Medina Aguilar "
+    "Stevens Murray Ford Castro Marshall Owens Harrison Fernandez Mcdonald Woods Washington Kennedy Wells "
+    "Vargas Henry Chen Freeman Webb Tucker Guzman Burns Crawford Olson Simpson Porter Hunter Gordon Mendez "
+    "Silva Shaw Snyder Mason Dixon Munoz Hunt Hicks Holmes Palmer Wagner Black Robertson Boyd Rose Stone"
+).split()
+NOTES = [
+    "Strong showing under pressure", "Needs work on consistency", "High ceiling, raw technique",
+    "Leader on and off the field", "Watch again next season", "Injury history worth checking",
+]
+WATCHLIST_NOTES = ["Priority target", "Follow up with coach", "Compare with current starters", None]
+
+# Role shares for generated users; the first user is always an admin
+ROLE_SHARES = {"coach": 0.3, "scout": 0.5, "user": 0.2}
+# One password per role, so only a handful of bcrypt hashes are ever computed
+ROLE_PASSWORDS = {"admin": "admin123", "coach": "coach123", "scout": "scout123", "user": "user123"}
+EVALUATOR_ROLES = ("admin", "coach", "scout")
+
+AGE_RANGE_DAYS = (15 * 365, 35 * 365)
+HISTORY_SECONDS = 3 * 365 * 86400
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+USER_COLUMNS = ("id", "username", "email", "password_hash", "role", "created_at", "updated_at")
+PLAYER_COLUMNS = (
+    "id", "external_id", "first_name", "last_name", "date_of_birth", "sport", "position",
+    "height_cm", "weight_kg", "created_at", "updated_at", "block_key",
+)
+EVALUATION_COLUMNS = (
+    "id", "player_id", "evaluator_id", "sport", "criteria", "score", "notes", "created_at", "updated_at",
+)
+WATCHLIST_COLUMNS = ("id", "user_id", "player_id", "notes", "created_at", "updated_at")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _next_id(conn: Connection, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _batches(total: int, batch_size: int) -> Iterator[slice]:
+    for start in range(0, total, batch_size):
+        yield slice(start, min(start + batch_size, total))
+
+
+def _timestamps(moments: np.ndarray) -> List[str]:
+    """datetime64 values as the 'YYYY-MM-DD HH:MM:SS' text both SQLite and Postgres read back"""
+    return [t.replace("T", " ") for t in np.datetime_as_string(moments, unit="s").tolist()]
+
+
+def _unique_codes(rng: np.random.Generator, count: int, space: int,
+                  taken: Optional[np.ndarray] = None) -> np.ndarray:
+    """``count`` distinct integers below ``space`` and not in ``taken``, in random order"""
+    taken = np.unique(taken) if taken is not None else np.empty(0, dtype=np.int64)
+    if count > space - len(taken):
+        raise ValueError(f"Cannot draw {count} distinct rows from {space - len(taken)} free combinations")
+    codes = np.setdiff1d(rng.integers(0, space, size=count, dtype=np.int64), taken)
+    while len(codes) < count:
+        extra = rng.integers(0, space, size=count - len(codes), dtype=np.int64)
+        codes = np.setdiff1d(np.concatenate([codes, extra]), taken)
+    return rng.permutation(codes)[:count]
+
+
+def _existing_identity_codes(conn: Connection, now: datetime) -> np.ndarray:
+    """Identity codes of the players already stored, as drawn by ``generate_players``.
+
+    Rows whose names, sport or birth date fall outside the generator's
+    vocabulary can't collide and are skipped.
+    """
+    days = AGE_RANGE_DAYS[1] - AGE_RANGE_DAYS[0]
+    firsts = {name: i for i, name in enumerate(FIRST_NAMES)}
+    lasts = {name: i for i, name in enumerate(LAST_NAMES)}
+    sports = {name: i for i, name in enumerate(SPORT_NAMES)}
+    youngest = now.date().toordinal() - AGE_RANGE_DAYS[0]
+    codes = []
+    rows = conn.execution_options(stream_results=True).execute(
+        select(Player.first_name, Player.last_name, Player.date_of_birth, Player.sport)
+    )
+    for first, last, born, sport in rows:
+        if first not in firsts or last not in lasts or sport not in sports or born is None:
+            continue
+        day = youngest - born.toordinal()
+        if 0 <= day < days:
+            codes.append(((firsts[first] * len(LAST_NAMES) + lasts[last]) * days + day) * len(SPORT_NAMES)
+                         + sports[sport])
+    return np.array(codes, dtype=np.int64)
+
+
+def generate_users(conn: Connection, rng: np.random.Generator, count: int, now: datetime,
+                   batch_size: int) -> Dict[str, np.ndarray]:
+    """Users named after their role and id, e.g. ``scout42``; returns their ids and roles"""
+    first_id = _next_id(conn, User)
+    roles = np.array(list(ROLE_SHARES))[
+        rng.choice(len(ROLE_SHARES), size=count, p=list(ROLE_SHARES.values()))
+    ].astype(object)
+    if first_id == 1 and count:
+        roles[0] = "admin"
+    hashes = {role: pwd_context.hash(password) for role, password in ROLE_PASSWORDS.items()}
+    ids = np.arange(first_id, first_id + count)
+    stamp = now.strftime(TIMESTAMP_FORMAT)
+    for part in _batches(count, batch_size):
+        insert_rows(conn, User.__table__, USER_COLUMNS, [
+            (user_id, f"{role}{user_id}", f"{role}{user_id}@example.com", hashes[role], role, stamp, stamp)
+            for user_id, role in zip(ids[part].tolist(), roles[part].tolist())
+        ])
+    return {"ids": ids, "roles": roles}
+
+
+def generate_players(conn: Connection, rng: np.random.Generator, count: int, now: datetime,
+                     batch_size: int) -> Dict[str, np.ndarray]:
+    """Players with unique identities; returns ids, sport indexes and a hidden talent level"""
+    first_id = _next_id(conn, Player)
+    days = AGE_RANGE_DAYS[1] - AGE_RANGE_DAYS[0]
+    # Draw distinct (first, last, birth date, sport) combinations, none already stored,
+    # so uq_players_identity holds
+    taken = _existing_identity_codes(conn, now) if first_id > 1 else None
+    codes = _unique_codes(rng, count, len(FIRST_NAMES) * len(LAST_NAMES) * days * len(SPORT_NAMES), taken)
+    codes, sport = np.divmod(codes, len(SPORT_NAMES))
+    codes, day = np.divmod(codes, days)
+    first, last = np.divmod(codes, len(LAST_NAMES))
+    births = np.datetime_as_string(np.datetime64(now.date()) - AGE_RANGE_DAYS[0] - day, unit="D")
+    position = (rng.random(count) * np.array([len(SPORTS[s]["positions"]) for s in SPORT_NAMES])[sport]).astype(int)
+    height = np.array([SPORTS[s]["height"] for s in SPORT_NAMES])[sport]
+    weight = np.array([SPORTS[s]["weight"] for s in SPORT_NAMES])[sport]
+    heights = np.rint(rng.normal(height[:, 0], height[:, 1])).astype(int)
+    weights = np.rint(rng.normal(weight[:, 0], weight[:, 1])).astype(int)
+    talent = rng.normal(70, 8, size=count).clip(40, 95)
+
+    # Few distinct (sport, surname, birth year) triples, so soundex runs once per triple
+    key = lru_cache(maxsize=None)(lambda s, l, year: blocking_key(s, l, date(int(year), 1, 1)))
+    ids = np.arange(first_id, first_id + count)
+    stamp = now.strftime(TIMESTAMP_FORMAT)
+    for part in _batches(count, batch_size):
+        insert_rows(conn, Player.__table__, PLAYER_COLUMNS, [
+            (
+                player_id, f"syn-{player_id}", FIRST_NAMES[f], LAST_NAMES[l], dob, SPORT_NAMES[s],
+                SPORTS[SPORT_NAMES[s]]["positions"][p], h, w, stamp, stamp,
+                key(SPORT_NAMES[s], LAST_NAMES[l], dob[:4]),
+            )
+            for player_id, f, l, dob, s, p, h, w in zip(
+                ids[part].tolist(), first[part].tolist(), last[part].tolist(), births[part].tolist(),
+                sport[part].tolist(), position[part].tolist(), heights[part].tolist(), weights[part].tolist(),
+            )
+        ])
+    return {"ids": ids, "sport": sport, "talent": talent}
+
+
+def generate_evaluations(conn: Connection, rng: np.random.Generator, count: int, now: datetime,
+                         users: Dict[str, np.ndarray], players: Dict[str, np.ndarray], batch_size: int) -> int:
+    """Evaluations with the player's sport's criteria; scores are the plain criteria mean"""
+    evaluators = users["ids"][np.isin(users["roles"], EVALUATOR_ROLES)]
+    if not count or not len(evaluators) or not len(players["ids"]):
+        return 0
+    # Evaluators are consistently a little harsh or generous
+    leniency = rng.normal(0, 3, size=len(evaluators))
+    criteria_counts = np.array([len(SPORTS[s]["criteria"]) for s in SPORT_NAMES])
+    lengths = criteria_counts.tolist()
+    # The JSON json.dumps would produce, filled in with % instead of encoded row by row
+    templates = ["{" + ", ".join(f'"{c}": %d' for c in SPORTS[s]["criteria"]) + "}" for s in SPORT_NAMES]
+    first_id = _next_id(conn, Evaluation)
+    for part in _batches(count, batch_size):
+        size = part.stop - part.start
+        player = rng.integers(0, len(players["ids"]), size=size)
+        evaluator = rng.integers(0, len(evaluators), size=size)
+        sport = players["sport"][player]
+        values = np.rint(
+            players["talent"][player, None] + leniency[evaluator, None] + rng.normal(0, 6, size=(size, MAX_CRITERIA))
+        ).clip(1, 99).astype(int)
+        used = np.arange(MAX_CRITERIA)[None, :] < criteria_counts[sport][:, None]
+        scores = np.round((values * used).sum(axis=1) / used.sum(axis=1), 2)
+        created = _timestamps(np.datetime64(now) - rng.integers(0, HISTORY_SECONDS, size=size).astype("timedelta64[s]"))
+        notes = rng.integers(0, len(NOTES) * 3, size=size)
+        insert_rows(conn, Evaluation.__table__, EVALUATION_COLUMNS, [
+            (
+                evaluation_id, player_id, evaluator_id, SPORT_NAMES[s], templates[s] % tuple(row[:lengths[s]]),
+                score, NOTES[n] if n < len(NOTES) else None, at, at,
+            )
+            for evaluation_id, player_id, evaluator_id, s, row, score, n, at in zip(
+                range(first_id + part.start, first_id + part.stop),
+                players["ids"][player].tolist(), evaluators[evaluator].tolist(), sport.tolist(),
+                values.tolist(), scores.tolist(), notes.tolist(), created,
+            )
+        ])
+    return count
+
+
+def generate_watchlists(conn: Connection, rng: np.random.Generator, count: int, now: datetime,
+                        users: Dict[str, np.ndarray], players: Dict[str, np.ndarray], batch_size: int) -> int:
+    """Distinct (user, player) watchlist entries"""
+    if not count or not len(users["ids"]) or not len(players["ids"]):
+        return 0
+    pairs = _unique_codes(rng, count, len(users["ids"]) * len(players["ids"]))
+    user_index, player_index = np.divmod(pairs, len(players["ids"]))
+    notes = rng.integers(0, len(WATCHLIST_NOTES), size=count)
+    first_id = _next_id(conn, Watchlist)
+    stamp = now.strftime(TIMESTAMP_FORMAT)
+    for part in _batches(count, batch_size):
+        insert_rows(conn, Watchlist.__table__, WATCHLIST_COLUMNS, [
+            (entry_id, user_id, player_id, WATCHLIST_NOTES[n], stamp, stamp)
+            for entry_id, user_id, player_id, n in zip(
+                range(first_id + part.start, first_id + part.stop), users["ids"][user_index[part]].tolist(),
+                players["ids"][player_index[part]].tolist(), notes[part].tolist(),
+            )
+        ])
+    return count
+
+
+def _sync_sequences(conn: Connection, tables) -> None:
+    """Explicit ids leave Postgres serial sequences behind; move them past the loaded rows"""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def generate(engine: Engine, users: int, players: int, evaluations: int, watchlists: int,
+             seed: int = 42, reset: bool = False, ratings: bool = False,
+             batch_size: int = GENERATE_BATCH_SIZE, now: Optional[datetime] = None,
+             progress: Optional[Callable[[str, int, float], None]] = None) -> dict:
+    """Load a synthetic dataset; returns the number of rows written per table.
+
+    ``reset`` empties every table first, which is what makes two runs with the
+    same seed produce identical databases; timestamps are relative to ``now``.
+    ``ratings`` rebuilds player ratings from the generated evaluations afterwards.
+    """
+    Base.metadata.create_all(bind=engine)
+    tables = [User.__table__, Player.__table__, Evaluation.__table__, Watchlist.__table__]
+    counts = {}
+    with bulk_load(engine, tables) as conn:
+        if reset:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+            conn.commit()
+        # Appending to existing rows draws a fresh stream; generate_players skips stored identities
+        rng = np.random.default_rng([seed, _next_id(conn, Player)])
+        now = (now or datetime.utcnow()).replace(microsecond=0)
+
+        def step(name, fn, *args):
+            started = time.perf_counter()
+            result = fn(conn, rng, *args)
+            conn.commit()
+            counts[name] = len(result["ids"]) if isinstance(result, dict) else result
+            if progress:
+                progress(name, counts[name], time.perf_counter() - started)
+            return result
+
+        user_rows = step("users", generate_users, users, now, batch_size)
+        player_rows = step("players", generate_players, players, now, batch_size)
+        step("evaluations", generate_evaluations, evaluations, now, user_rows, player_rows, batch_size)
+        step("watchlists", generate_watchlists, watchlists, now, user_rows, player_rows, batch_size)
+        _sync_sequences(conn, tables)
+        # Rows written outside a session get their change feed position here
+        stamp_changes(conn)
+        conn.commit()
+    if ratings:
+        started = time.perf_counter()
+        with Session(engine) as db:
+            counts["ratings"] = recompute_ratings(db)["players"]
+        if progress:
+            progress("ratings", counts["ratings"], time.perf_counter() - started)
+    return counts
@@ -0,0 +1,140 @@
+"""
+Per-tenant database routing
+Each club gets its own SQLite file (or Postgres schema), created when the club
+is provisioned. Engines of provisioned tenants are opened on first use and kept
+in a small LRU so open connections stay bounded.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from .db import engine as default_engine
+from models import Base
+
+MULTI_TENANT = os.getenv("MULTI_TENANT", "false").lower() in ("1", "true", "yes")
+# "{tenant}" in the URL gives one database per tenant; without it every tenant
+# shares the database and gets its own schema (Postgres only)
+TENANT_DATABASE_URL = os.getenv("TENANT_DATABASE_URL", "sqlite:///./tenants/{tenant}.db")
+TENANT_DEFAULT = os.getenv("TENANT_DEFAULT") or None
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "32"))
+# Connections per tenant engine; at most TENANT_CACHE_SIZE * TENANT_POOL_SIZE are open
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "5"))
+
+TENANT_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+class UnknownTenant(ValueError):
+    pass
+
+
+class TenantRegistry:
+    """LRU of per-tenant engines and sessionmakers"""
+
+    def __init__(self, url_template: str = TENANT_DATABASE_URL, max_engines: int = TENANT_CACHE_SIZE,
+                 pool_size: int = TENANT_POOL_SIZE):
+        self.url_template = url_template
+        self.max_engines = max_engines
+        self.pool_size = pool_size
+        self._sessionmakers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sessionmaker(self, tenant: str) -> sessionmaker:
+        """Sessions on a provisioned tenant's database; any other name raises UnknownTenant"""
+        return self._factory(tenant, provision=False)
+
+    def provision(self, tenant: str) -> sessionmaker:
+        """Create the tenant's database (or schema) and tables if missing"""
+        return self._factory(tenant, provision=True)
+
+    def _factory(self, tenant: str, provision: bool) -> sessionmaker:
+        if not TENANT_NAME.match(tenant or ""):
+            raise UnknownTenant(f"Invalid tenant: {tenant!r}")
+        with self._lock:
+            factory = self._sessionmakers.get(tenant)
+            if factory is not None:
+                self._sessionmakers.move_to_end(tenant)
+                return factory
+
+            # Unknown tenants raise before they take a cache slot
+            factory = sessionmaker(autocommit=False, autoflush=False, bind=self._create_engine(tenant, provision))
+            self._sessionmakers[tenant] = factory
+            while len(self._sessionmakers) > self.max_engines:
+                # Checked-out connections of the evicted engine close when their sessions do
+                _, evicted = self._sessionmakers.popitem(last=False)
+                evicted.kw["bind"].dispose()
+            return factory
+
+    def _create_engine(self, tenant: str, provision: bool):
+        options = {"echo": default_engine.echo, "pool_size": self.pool_size, "max_overflow": 0}
+        unknown = UnknownTenant(f"Unknown tenant: {tenant!r}")
+        if "{tenant}" in self.url_template:
+            url = make_url(self.url_template.format(tenant=tenant))
+            if url.get_backend_name() == "sqlite":
+                if url.database:
+                    path = Path(url.database)
+                    if not provision and not path.exists():
+                        # Connecting would create the file
+                        raise unknown
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                options["connect_args"] = {"check_same_thread": False}
+                engine = create_engine(url, **options)
+            else:
+                # A database per tenant is created by the DBA; provisioning adds the tables
+                engine = create_engine(url, **options)
+                try:
+                    engine.connect().close()
+                except OperationalError:
+                    engine.dispose()
+                    raise unknown
+        else:
+            schema = f"tenant_{tenant.replace('-', '_')}"
+            engine = create_engine(
+                self.url_template, connect_args={"options": f"-csearch_path={schema}"}, **options
+            )
+            if provision:
+                with engine.begin() as conn:
+                    conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            elif schema not in inspect(engine).get_schema_names():
+                engine.dispose()
+                raise unknown
+        # Also adds tables introduced since the tenant was provisioned
+        Base.metadata.create_all(bind=engine)
+        return engine
+
+    def cached(self) -> list:
+        """Tenants with an open engine, least recently used first"""
+        with self._lock:
+            return list(self._sessionmakers)
+
+    def dispose(self):
+        with self._lock:
+            for factory in self._sessionmakers.values():
+                factory.kw["bind"].dispose()
+            self._sessionmakers.clear()
+
+
+tenant_registry = TenantRegistry()
+
+
+def resolve_tenant(requested: Optional[str]) -> Optional[str]:
+    """Validate the tenant a request asked for, falling back to TENANT_DEFAULT.
+
+    Returns None when multi-tenant mode is off.
+    """
+    if not MULTI_TENANT:
+        return None
+    tenant = (requested or TENANT_DEFAULT or "").lower()
+    if not tenant:
+        raise UnknownTenant("Tenant required")
+    if not TENANT_NAME.match(tenant):
+        raise UnknownTenant(f"Invalid tenant: {tenant!r}")
+    return tenant
@@ -0,0 +1,352 @@
+"""
+Lightweight request tracing
+Nested spans for the phases of a request (auth, dependencies, queries, commit,
+serialization) are recorded per request and exported as JSON lines to a local
+file or as OTLP/JSON to a collector. Spans are only recorded for sampled
+requests, so the cost is one context variable lookup otherwise.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+# Requests slower than this are always exported, sampled or not (0 turns it off)
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")  # 'file' or 'otlp'
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "1000"))
+SERVICE_NAME = "scoutconnect"
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span = contextvars.ContextVar("scoutconnect_span", default=None)
+
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2}
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict, kind: str = "internal"):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        trace.spans.append(self)
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "spans", "token")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.token = None
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+    """Open the root span for a request, or return None when it isn't recorded.
+
+    A W3C ``traceparent`` header continues the caller's trace and sampling decision.
+    """
+    match = TRACEPARENT.match(traceparent or "")
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        sampled = bool(int(flags, 16) & 1)
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    if not sampled and not TRACE_SLOW_MS:
+        return None
+    trace = Trace(trace_id, sampled)
+    # The request root is the server side even when it continues a caller's trace
+    root = Span(trace, name, parent_id, attributes, kind="server")
+    trace.token = _current_span.set(root)
+    return root
+
+
+def finish_trace(root: Span):
+    """Close the root span and export the trace if it was sampled or slow"""
+    root.finish()
+    _current_span.reset(root.trace.token)
+    if root.trace.sampled or root.duration_ms >= TRACE_SLOW_MS:
+        exporter.export(root.trace.spans)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; a no-op outside a recorded trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = repr(exc)
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Decorator form of ``span`` for plain and async functions"""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# --- SQLAlchemy ---
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is not None and context is not None:
+        context._trace_span = Span(parent.trace, "db.execute", parent.span_id, {
+            "db.statement": statement[:500], "db.executemany": executemany,
+        })
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_query_span(conn, cursor, statement, parameters, context, executemany):
+    query_span = getattr(context, "_trace_span", None)
+    if query_span is not None:
+        query_span.attributes["db.rowcount"] = cursor.rowcount
+        query_span.finish()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(exception_context):
+    query_span = getattr(exception_context.execution_context, "_trace_span", None)
+    if query_span is not None:
+        query_span.error = repr(exception_context.original_exception)
+        query_span.finish()
+
+
+# --- FastAPI ---
+
+@contextmanager
+def _endpoint_phase():
+    """Close the dependency span opened by TracedRoute and time the endpoint itself"""
+    dependencies = _current_span.get()
+    if dependencies is None or dependencies.name != "fastapi.dependencies":
+        yield
+        return
+    dependencies.finish()
+    endpoint = Span(dependencies.trace, "fastapi.endpoint", dependencies.parent_id, {})
+    token = _current_span.set(endpoint)
+    try:
+        yield
+    except BaseException as exc:
+        endpoint.error = repr(exc)
+        raise
+    finally:
+        endpoint.finish()
+        _current_span.reset(token)
+
+
+def _trace_endpoint(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_endpoint(*args, **kwargs):
+            with _endpoint_phase():
+                return await func(*args, **kwargs)
+        return async_endpoint
+
+    @functools.wraps(func)
+    def endpoint(*args, **kwargs):
+        with _endpoint_phase():
+            return func(*args, **kwargs)
+    return endpoint
+
+
+class TracedRoute(APIRoute):
+    """Route class splitting a recorded request into dependencies, endpoint and serialization spans.
+
+    Set it as the router's ``route_class`` before routes are declared.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _trace_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            root = _current_span.get()
+            if root is None:
+                return await handler(request)
+            dependencies = Span(root.trace, "fastapi.dependencies", root.span_id, {})
+            token = _current_span.set(dependencies)
+            try:
+                return await handler(request)
+            finally:
+                _current_span.reset(token)
+                if dependencies.end_ns is None:
+                    # A dependency failed before the endpoint ran
+                    dependencies.finish()
+                endpoint = next((s for s in reversed(root.trace.spans)
+                                 if s.name == "fastapi.endpoint" and s.parent_id == root.span_id), None)
+                if endpoint is not None and endpoint.end_ns is not None and endpoint.start_ns >= dependencies.start_ns:
+                    # Whatever the handler did after the endpoint returned
+                    serialize = Span(root.trace, "fastapi.serialize", root.span_id, {})
+                    serialize.start_ns = endpoint.end_ns
+                    serialize.finish()
+
+        return traced_handler
+
+
+# --- Export ---
+
+def otlp_payload(spans: List[dict]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans"""
+    def attribute(key, value):
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+        "scopeSpans": [{
+            "scope": {"name": SERVICE_NAME},
+            "spans": [
+                {
+                    "traceId": s["trace_id"],
+                    "spanId": s["span_id"],
+                    **({"parentSpanId": s["parent_span_id"]} if s["parent_span_id"] else {}),
+                    "name": s["name"],
+                    "kind": SPAN_KINDS[s.get("kind", "internal")],
+                    "startTimeUnixNano": str(s["start_ns"]),
+                    "endTimeUnixNano": str(s["end_ns"]),
+                    "attributes": [attribute(k, v) for k, v in s["attributes"].items() if v is not None],
+                    "status": {"code": 2, "message": s["error"]} if s["error"] else {},
+                }
+                for s in spans
+            ],
+        }],
+    }]}
+
+
+class SpanExporter:
+    """Ships finished traces from a background thread so requests never wait on I/O"""
+
+    def __init__(self, kind: str = TRACE_EXPORTER, path: str = TRACE_FILE,
+                 endpoint: str = TRACE_OTLP_ENDPOINT, queue_size: int = TRACE_QUEUE_SIZE):
+        self.kind = kind
+        self.path = path
+        self.endpoint = endpoint
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait([s.to_dict() for s in spans])
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until everything queued so far has been written"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty() and len(batch) < 100:
+                batch.append(self._queue.get_nowait())
+            try:
+                self._write([s for spans in batch for s in spans])
+            except Exception:
+                logger.exception("Trace export failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, spans: List[dict]):
+        if self.kind == "otlp":
+            request = urllib.request.Request(
+                self.endpoint, data=json.dumps(otlp_payload(spans)).encode(),
+                headers={"Content-Type": "application/json"}, method="POST",
+            )
+            urllib.request.urlopen(request, timeout=5).close()
+        else:
+            with open(self.path, "a") as f:
+                for s in spans:
+                    f.write(json.dumps(s) + "\n")
+
+
+exporter = SpanExporter()
@@ -0,0 +1,130 @@
+"""
+Group-commit write queue for SQLite deployments
+Mutations are handed to a single writer task that applies a batch of them in one
+transaction, each under its own savepoint, and resolves every caller on commit.
+One commit (and one fsync) then covers many small writes, and requests stop
+fighting over SQLite's writer lock.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .db import begin_transaction
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+WRITE_QUEUE = os.getenv("WRITE_QUEUE", "false").lower() in ("1", "true", "yes")
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "200"))
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "10000"))
+
+WriteOp = Callable[[Session], Any]
+
+
+class WriteQueue:
+    """Single writer that batches mutations into group commits.
+
+    Until ``start()`` is called, ``run()`` applies each op and commits in the
+    caller's own session, so callers don't need to care which mode is on.
+    """
+
+    def __init__(self, session_factory, batch_size: int = WRITE_BATCH_SIZE, queue_size: int = WRITE_QUEUE_SIZE):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # One thread keeps every transaction on the same writer
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None
+
+    @property
+    def backlog(self) -> int:
+        """Writes waiting for the writer thread"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self):
+        if not self.running:
+            return
+        # Let queued writes finish before shutting down
+        await self._queue.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    async def run(self, db: Session, op: WriteOp) -> Any:
+        """Apply ``op(session)`` and commit; returns what the op returned.
+
+        Ops return plain data (e.g. RETURNING rows), which stays valid after commit.
+
+        Exceptions raised by the op or by its flush (e.g. IntegrityError) are
+        re-raised to the caller. Sessions bound to another engine (tenant or
+        test databases) always take the direct path.
+        """
+        if not self.running or db.get_bind() is not self.session_factory.kw["bind"]:
+            result = op(db)
+            with span("db.commit"):
+                db.commit()
+            return result
+        # Hand the request's connection back first, or waiting requests could
+        # hold the whole pool while the writer waits for a connection
+        db.close()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._apply_batch, [op for op, _ in batch])
+            except Exception as exc:
+                logger.exception("Write batch failed")
+                outcomes = [(None, exc)] * len(batch)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                if not future.done():
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+                self._queue.task_done()
+
+    def _apply_batch(self, ops: List[WriteOp]) -> List[Tuple[Any, Optional[BaseException]]]:
+        outcomes = []
+        with self.session_factory() as db:
+            # Savepoints must sit inside one real transaction, or each release commits
+            begin_transaction(db)
+            for op in ops:
+                # A failing op only rolls back its own savepoint
+                try:
+                    with db.begin_nested():
+                        result = op(db)
+                    outcomes.append((result, None))
+                except Exception as exc:
+                    outcomes.append((None, exc))
+            try:
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                return [(None, exc)] * len(ops)
+        return outcomes
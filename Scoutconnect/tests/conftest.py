@@ -0,0 +1,64 @@
+"""
+Shared fixtures for ScoutConnect tests
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.scoutconnect.db import Base
+from src.scoutconnect.main import app, get_db, get_password_hash
+from models import User
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory bound to a fresh in-memory SQLite database"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    """Test client whose requests use the in-memory database"""
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def coach_headers(client):
+    """Authorization headers for a freshly registered coach"""
+    response = client.post("/auth/register", json={
+        "username": "coach_test",
+        "email": "coach_test@scoutconnect.com",
+        "password": "coach123",
+        "role": "coach",
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client, session_factory):
+    """Authorization headers for an admin; admins can't self-register, so the row is inserted directly"""
+    with session_factory() as db:
+        db.add(User(username="admin_test", email="admin_test@scoutconnect.com",
+                    password_hash=get_password_hash("admin123"), role="admin"))
+        db.commit()
+    response = client.post("/auth/login", json={"username": "admin_test", "password": "admin123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,64 @@
+"""
+Tests for evaluation archival and read-through
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from src.scoutconnect.archive import archive_evaluations, list_player_evaluations
+from models import Player, Evaluation, ArchivedEvaluation
+
+
+def test_old_evaluations_move_to_archive_and_read_through(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        player = Player(first_name="Serena", last_name="Williams", sport="tennis")
+        db.add(player)
+        db.flush()
+        for days_ago in (1000, 800, 30, 1):
+            db.add(Evaluation(player_id=player.id, sport="tennis", score=90,
+                              created_at=now - timedelta(days=days_ago)))
+        db.commit()
+
+        assert archive_evaluations(db, now - timedelta(days=730), batch_size=1) == 2
+        assert db.query(Evaluation).count() == 2
+        assert db.query(ArchivedEvaluation).count() == 2
+
+        recent = list_player_evaluations(db, player.id, since=now - timedelta(days=365))
+        assert [e.archived for e in recent] == [False, False]
+
+        everything = list_player_evaluations(db, player.id)
+        assert [e.archived for e in everything] == [False, False, True, True]
+        assert everything[0].created_at > everything[-1].created_at
+
+        page = list_player_evaluations(db, player.id, skip=1, limit=2)
+        assert [e.id for e in page] == [e.id for e in everything[1:3]]
+
+
+def test_full_hot_page_skips_archive_rows(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        player = Player(first_name="Serena", last_name="Williams", sport="tennis")
+        db.add(player)
+        db.flush()
+        for days_ago in (1000, 3, 2, 1):
+            db.add(Evaluation(player_id=player.id, sport="tennis", score=90,
+                              created_at=now - timedelta(days=days_ago)))
+        db.commit()
+        archive_evaluations(db, now - timedelta(days=730))
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            assert len(list_player_evaluations(db, player.id, limit=2)) == 2
+            # Only the horizon lookup touches the archive
+            archive_reads = [s for s in statements if "evaluations_archive" in s]
+            assert len(archive_reads) == 1 and "max(" in archive_reads[0]
+
+            statements.clear()
+            assert [e.archived for e in list_player_evaluations(db, player.id, limit=4)] == [False] * 3 + [True]
+            assert len([s for s in statements if "evaluations_archive" in s]) == 2
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
@@ -0,0 +1,90 @@
+"""
+Tests for incremental backups
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import src.scoutconnect.changes  # noqa: F401  (tombstones for ORM deletes)
+from scripts import backup_database as backups_module
+from scripts.backup_database import backup_database, read_manifest, restore_backup
+from scripts.export_database import EXPORT_TABLES
+from src.scoutconnect.archive import archive_evaluations
+from src.scoutconnect.deletion import purge_players, soft_delete_player
+from src.scoutconnect.synthetic import generate
+from models import ArchivedEvaluation, Evaluation, Player, PlayerRating, ScoringProfile, Watchlist
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return {table: conn.execute(text(f"SELECT * FROM {table} ORDER BY 1")).all() for table in EXPORT_TABLES}
+
+
+def test_deltas_replay_to_the_source(tmp_path, monkeypatch):
+    # No overlap with the previous window, so the delta holds exactly the changes below
+    monkeypatch.setattr(backups_module, "BACKUP_LAG_SECONDS", 0)
+    source = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    # Stamped a day ago, so only the changes below fall inside the delta window
+    generate(source, users=5, players=40, evaluations=200, watchlists=20, ratings=True,
+             now=datetime.utcnow() - timedelta(days=1))
+    backups = tmp_path / "backups"
+    assert backup_database(backups, db_engine=source)["kind"] == "base"
+    with Session(source) as db:
+        assert archive_evaluations(db, older_than=datetime.utcnow() - timedelta(days=1000))
+        db.add(ScoringProfile(sport="soccer", position="Goalkeeper", weights={"reflexes": 3}))
+        db.commit()
+    assert backup_database(backups, db_engine=source)["changed"] > 0
+
+    with Session(source) as db:
+        db.get(Player, 1).position = "Coach"
+        db.add(Evaluation(player_id=2, evaluator_id=1, sport=db.get(Player, 2).sport, criteria={"speed": 7}, score=7))
+        db.delete(db.query(Watchlist).first())
+        db.commit()
+        soft_delete_player(db, 3)
+        soft_delete_player(db, 4)
+        purge_players(db, [4], pause=0)
+        moved = archive_evaluations(db, older_than=datetime.utcnow() - timedelta(days=700))
+    assert moved
+
+    delta = backup_database(backups, compress=True, db_engine=source)
+    assert delta["kind"] == "delta" and delta["file"] == "0002-delta.sql.gz"
+    with Session(source) as db:
+        tombstones = db.execute(text("SELECT count(*) FROM deleted_records")).scalar()
+        ratings = db.query(PlayerRating).count()
+    # Players 1 and 3, the new evaluation, the newly archived rows and the tombstones, plus
+    # every rating: the purged player's rating went, so the derived table is copied whole
+    assert delta["changed"] == 3 + moved + tombstones + ratings
+    # The watchlist entry, the purged player with its evaluations and the archived evaluations go
+    assert delta["deleted"] > moved + 1
+    unchanged = backup_database(backups, db_engine=source)
+    assert (unchanged["sequence"], unchanged["changed"], unchanged["deleted"]) == (3, 0, 0)
+
+    target = create_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    counts = restore_backup(backups, target)
+    assert counts == read_manifest(backups)["files"][-1]["rows"]
+    assert counts["evaluations_archive"] > moved and counts["scoring_profiles"] == 1
+    assert _rows(target) == _rows(source)
+    with Session(target) as db:
+        assert db.query(ArchivedEvaluation).filter(ArchivedEvaluation.player_id == 4).count() == 0
+    source.dispose()
+    target.dispose()
+
+
+def test_full_backup_starts_a_new_chain(tmp_path):
+    source = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(source, users=2, players=5, evaluations=10, watchlists=2)
+    backups = tmp_path / "backups"
+    backup_database(backups, db_engine=source)
+    backup_database(backups, db_engine=source)
+    assert backup_database(backups, full=True, db_engine=source)["file"] == "0002-base.sql"
+    assert [entry["kind"] for entry in read_manifest(backups)["files"]] == ["base", "delta", "base"]
+
+    target = create_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    assert restore_backup(backups, target)["players"] == 5
+    with pytest.raises(ValueError, match="No backups"):
+        restore_backup(tmp_path / "empty", target)
+    source.dispose()
+    target.dispose()
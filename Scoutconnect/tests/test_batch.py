@@ -0,0 +1,151 @@
+"""
+Tests for transactional batch operations
+"""
+
+from sqlalchemy import event
+
+from models import Player, Evaluation, Watchlist, DeletedRecord
+
+
+def player(first_name, **extra):
+    return {"first_name": first_name, "last_name": "Batch", "sport": "soccer", **extra}
+
+
+def run(client, headers, *operations):
+    response = client.post("/batch", headers=headers, json={"operations": list(operations)})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_mixed_batch_commits_once(client, coach_headers, session_factory):
+    existing = client.post("/players", headers=coach_headers, json=player("Old")).json()["id"]
+    entry = client.post("/watchlists", headers=coach_headers, json={"player_id": existing}).json()["id"]
+
+    commits = []
+    event.listen(session_factory.kw["bind"], "commit", lambda conn: commits.append(1))
+    result = run(
+        client, coach_headers,
+        {"op": "create", "entity": "player", "data": player("Ann")},
+        {"op": "create", "entity": "player", "data": player("Bea", external_id="club-2")},
+        {"op": "create", "entity": "evaluation", "data": {"player_id": existing, "score": 80}},
+        {"op": "update", "entity": "player", "id": existing, "data": {"position": "GK"}},
+        {"op": "update", "entity": "watchlist", "id": entry, "data": {"notes": "keep an eye"}},
+        {"op": "delete", "entity": "watchlist", "id": entry},
+    )
+    assert result["committed"] is True
+    assert [r["status"] for r in result["results"]] == [201, 201, 201, 200, 200, 204]
+    # Authenticating the request does not commit; the batch commits exactly once
+    assert len(commits) == 1
+
+    with session_factory() as db:
+        assert db.query(Player).count() == 3
+        assert db.get(Player, existing).position == "GK"
+        assert db.query(Evaluation).one().player_id == existing
+        assert db.query(Watchlist).count() == 0
+        tombstone = db.query(DeletedRecord).one()
+        assert (tombstone.entity, tombstone.entity_id, tombstone.user_id) == ("watchlist", entry, 1)
+
+
+def test_one_failure_rolls_back_the_batch(client, coach_headers, session_factory):
+    client.post("/players", headers=coach_headers, json=player("Old", external_id="club-1"))
+    result = run(
+        client, coach_headers,
+        {"op": "create", "entity": "player", "data": player("New")},
+        {"op": "create", "entity": "player", "data": player("Dup", external_id="club-1")},
+        {"op": "update", "entity": "player", "id": 1, "data": {"position": "GK"}},
+    )
+    assert result["committed"] is False
+    assert [r["status"] for r in result["results"]] == [424, 400, 424]
+    assert result["results"][1]["error"] == "Player already exists"
+
+    with session_factory() as db:
+        assert db.query(Player).count() == 1
+        assert db.get(Player, 1).position is None
+
+    # Invalid operations fail the batch before anything runs
+    result = run(
+        client, coach_headers,
+        {"op": "update", "entity": "player", "data": {"position": "GK"}},
+        {"op": "create", "entity": "watchlist", "data": {}},
+        {"op": "archive", "entity": "player", "id": 1},
+    )
+    assert [r["status"] for r in result["results"]] == [400, 422, 400]
+
+
+def test_later_failure_undoes_earlier_groups(client, coach_headers, session_factory, tmp_path):
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    result = run(
+        client, coach_headers,
+        {"op": "create", "entity": "player", "data": player("Ann")},
+        {"op": "update", "entity": "player", "id": 999, "data": {"position": "GK"}},
+    )
+    assert result["committed"] is False
+    assert [r["status"] for r in result["results"]] == [424, 404]
+    # The savepoints nest inside a real transaction, so releasing one commits nothing
+    assert statements.count("BEGIN") == 1
+    with session_factory() as db:
+        assert db.query(Player).count() == 0
+
+
+def test_same_patch_is_one_update(client, coach_headers, session_factory):
+    ids = [client.post("/players", headers=coach_headers, json=player(name)).json()["id"] for name in "ABC"]
+
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    result = run(client, coach_headers, *[
+        {"op": "update", "entity": "player", "id": player_id, "data": {"last_name": "Fields"}} for player_id in ids
+    ], {"op": "delete", "entity": "player", "id": 999})
+    assert [r["status"] for r in result["results"]] == [424, 424, 424, 404]
+
+    statements.clear()
+    result = run(client, coach_headers, *[
+        {"op": "update", "entity": "player", "id": player_id, "data": {"last_name": "Fields"}} for player_id in ids
+    ], {"op": "delete", "entity": "player", "id": ids[0]})
+    assert result["committed"] is True
+    player_updates = [s for s in statements if s.startswith("UPDATE players SET last_name")]
+    assert len(player_updates) == 1
+
+    with session_factory() as db:
+        assert {p.block_key for p in db.query(Player).execution_options(include_deleted=True)} == {"soccer|F432|----"}
+        assert db.query(Player).count() == 2
+        assert db.query(DeletedRecord).filter(DeletedRecord.entity == "player").count() == 1
+
+
+def test_operations_apply_in_request_order(client, coach_headers, session_factory):
+    player_id = client.post("/players", headers=coach_headers, json=player("Ann")).json()["id"]
+    entry = client.post("/watchlists", headers=coach_headers, json={"player_id": player_id}).json()["id"]
+
+    result = run(
+        client, coach_headers,
+        # Re-adding the player only works because the delete runs first
+        {"op": "delete", "entity": "watchlist", "id": entry},
+        {"op": "create", "entity": "watchlist", "data": {"player_id": player_id, "notes": "again"}},
+        # Later writes to the same row win
+        {"op": "update", "entity": "player", "id": player_id, "data": {"position": "GK"}},
+        {"op": "update", "entity": "player", "id": player_id, "data": {"position": "CB"}},
+    )
+    assert [r["status"] for r in result["results"]] == [204, 201, 200, 200]
+
+    with session_factory() as db:
+        assert db.query(Watchlist.notes).one() == ("again",)
+        assert db.get(Player, player_id).position == "CB"
+
+
+def test_roles_are_checked_per_operation(client, coach_headers):
+    token = client.post("/auth/register", json={
+        "username": "scout_test", "email": "scout_test@scoutconnect.com", "password": "x", "role": "scout",
+    }).json()["access_token"]
+    scout = {"Authorization": f"Bearer {token}"}
+    player_id = client.post("/players", headers=coach_headers, json=player("Ann")).json()["id"]
+    coach_eval = client.post("/evaluations", headers=coach_headers, json={"player_id": player_id, "score": 70}).json()
+
+    result = run(
+        client, scout,
+        {"op": "create", "entity": "evaluation", "data": {"player_id": player_id, "score": 75}},
+        {"op": "create", "entity": "player", "data": player("Bea")},
+        {"op": "delete", "entity": "evaluation", "id": coach_eval["id"]},
+    )
+    assert [r["status"] for r in result["results"]] == [424, 403, 403]
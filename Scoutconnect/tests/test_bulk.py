@@ -0,0 +1,73 @@
+"""
+Tests for set-based bulk player updates and deletes
+"""
+
+from datetime import date
+
+from sqlalchemy import event
+
+from models import Player, DeletedRecord
+
+
+def add_players(client, headers):
+    today = date.today()
+    rows = [
+        ("Ann", "soccer", "Forward", date(today.year - 17, 1, 1)),
+        ("Bea", "soccer", "Forward", date(today.year - 25, 1, 1)),
+        ("Cat", "soccer", "Keeper", date(today.year - 17, 1, 1)),
+        ("Dee", "basketball", "Forward", None),
+    ]
+    return [
+        client.post("/players", headers=headers, json={
+            "first_name": first_name, "last_name": "Bulk", "sport": sport, "position": position,
+            "date_of_birth": dob.isoformat() if dob else None,
+        }).json()["id"]
+        for first_name, sport, position, dob in rows
+    ]
+
+
+def test_bulk_update_is_one_statement(client, admin_headers, session_factory):
+    add_players(client, admin_headers)
+    body = {"filter": {"sport": "soccer", "position": "Forward"}, "patch": {"position": "Striker"}}
+
+    dry = client.post("/admin/players/bulk-update", headers=admin_headers, json={**body, "dry_run": True})
+    assert dry.json() == {"matched": 2, "dry_run": True, "purge_job_id": None}
+
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    result = client.post("/admin/players/bulk-update", headers=admin_headers, json=body).json()
+    assert result["matched"] == 2
+    # Besides the change feed stamp at commit
+    updates = [s for s in statements if s.startswith("UPDATE players") and "change_seq IS NULL" not in s]
+    assert len(updates) == 1
+
+    with session_factory() as db:
+        assert [p.position for p in db.query(Player).order_by(Player.id)] == ["Striker", "Striker", "Keeper", "Forward"]
+
+
+def test_age_range_and_block_keys(client, admin_headers, session_factory):
+    ids = add_players(client, admin_headers)
+    result = client.post("/admin/players/bulk-update", headers=admin_headers, json={
+        "filter": {"min_age": 16, "max_age": 18}, "patch": {"sport": "futsal"},
+    }).json()
+    assert result["matched"] == 2
+    with session_factory() as db:
+        moved = db.query(Player).filter(Player.sport == "futsal").order_by(Player.id).all()
+        assert [p.id for p in moved] == [ids[0], ids[2]]
+        assert all(p.block_key.startswith("futsal|") for p in moved)
+
+
+def test_bulk_delete_soft_deletes_with_tombstones(client, admin_headers, coach_headers, session_factory):
+    ids = add_players(client, admin_headers)
+    body = {"filter": {"ids": [ids[0], ids[3], 999]}}
+    assert client.post("/admin/players/bulk-delete", headers=coach_headers, json=body).status_code == 403
+    assert client.post("/admin/players/bulk-delete", headers=admin_headers, json={"filter": {}}).status_code == 400
+
+    result = client.post("/admin/players/bulk-delete", headers=admin_headers, json=body).json()
+    assert result["matched"] == 2 and result["purge_job_id"] is not None
+    with session_factory() as db:
+        assert db.query(Player).count() == 2
+        assert sorted(t.entity_id for t in db.query(DeletedRecord)) == [ids[0], ids[3]]
+    # Already deleted players no longer match
+    assert client.post("/admin/players/bulk-delete", headers=admin_headers, json=body).json()["matched"] == 0
@@ -0,0 +1,124 @@
+"""
+Tests for the incremental change feed
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.scoutconnect import changes
+from src.scoutconnect.db import Base
+from models import Player, Watchlist, User, DeletedRecord
+
+
+def test_change_feed_returns_only_delta(client, coach_headers):
+    created = client.post("/players", json={
+        "first_name": "Jordan", "last_name": "Fields", "sport": "football",
+    }, headers=coach_headers)
+    player_id = created.json()["id"]
+
+    full = client.get("/changes", headers=coach_headers).json()
+    assert [p["id"] for p in full["players"]] == [player_id]
+    assert full["has_more"] is False
+    cursor = full["next_cursor"]
+
+    empty = client.get("/changes", params={"since": cursor}, headers=coach_headers).json()
+    assert empty["players"] == [] and empty["deleted"] == []
+    assert empty["next_cursor"] == cursor
+
+    client.put(f"/players/{player_id}", json={"position": "LB"}, headers=coach_headers)
+    delta = client.get("/changes", params={"since": cursor}, headers=coach_headers).json()
+    assert [p["position"] for p in delta["players"]] == ["LB"]
+
+    assert client.get("/changes", params={"since": "yesterday"}, headers=coach_headers).status_code == 400
+
+
+def test_change_feed_is_read_only(client, coach_headers, session_factory):
+    client.post("/players", json={"first_name": "Jordan", "last_name": "Fields", "sport": "football"},
+                headers=coach_headers)
+    with session_factory() as db:
+        # Positions are handed out when the write commits
+        assert db.query(Player.change_seq).scalar() is not None
+
+    statements = []
+    engine = session_factory.kw["bind"]
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.get("/changes", headers=coach_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert set(statements) == {"SELECT"}
+
+
+def test_change_feed_pages(client, coach_headers):
+    ids = [
+        client.post("/players", json={
+            "first_name": f"Page{i}", "last_name": "Fields", "sport": "football",
+        }, headers=coach_headers).json()["id"]
+        for i in range(5)
+    ]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"since": cursor} if cursor else {})}
+        page = client.get("/changes", params=params, headers=coach_headers).json()
+        seen += [p["id"] for p in page["players"]]
+        cursor, pages = page["next_cursor"], pages + 1
+        if not page["has_more"]:
+            break
+    assert sorted(seen) == sorted(ids) and len(seen) == len(ids)
+    assert pages == 3
+
+
+def test_slow_commit_is_not_skipped(tmp_path):
+    """A row stamped before a client synced but committed after still reaches that client"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'feed.db'}", connect_args={"timeout": 1})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = User(username="u", email="u@x.com", password_hash="x", role="coach")
+        player = Player(first_name="A", last_name="B", sport="soccer")
+        db.add_all([user, player])
+        db.commit()
+        player_id = player.id
+        cursor = changes.get_changes(db, user)["next_cursor"]
+
+        with Session() as slow:
+            slow.get(Player, player_id).position = "GK"
+            slow.get(Player, player_id).updated_at = datetime.utcnow() - timedelta(minutes=5)
+            slow.flush()
+            # Still uncommitted: nothing to send yet, and the cursor stays put
+            feed = changes.get_changes(db, user, cursor)
+            assert feed["players"] == [] and feed["next_cursor"] == cursor
+            slow.commit()
+
+        feed = changes.get_changes(db, user, cursor)
+        assert [(p.id, p.position) for p in feed["players"]] == [(player_id, "GK")]
+        # Stamping a feed position is not an edit
+        assert feed["players"][0].updated_at < datetime.utcnow() - timedelta(minutes=4)
+    engine.dispose()
+
+
+def test_orm_deletes_leave_tombstones(session_factory):
+    with session_factory() as db:
+        user = User(username="u", email="u@x.com", password_hash="x", role="coach")
+        player = Player(first_name="A", last_name="B", sport="soccer")
+        db.add_all([user, player])
+        db.flush()
+        entry = Watchlist(user_id=user.id, player_id=player.id)
+        db.add(entry)
+        db.commit()
+        entry_id = entry.id
+
+        cursor = changes.get_changes(db, user)["next_cursor"]
+        db.delete(entry)
+        db.commit()
+
+        tombstone = db.query(DeletedRecord).one()
+        assert (tombstone.entity, tombstone.entity_id, tombstone.user_id) == ("watchlist", entry_id, user.id)
+
+        feed = changes.get_changes(db, user, cursor)
+        assert [d.entity_id for d in feed["deleted"]] == [entry_id]
+        assert feed["watchlists"] == []
@@ -0,0 +1,89 @@
+"""
+Tests for the columnar snapshot export
+"""
+
+import json
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+
+from scripts import export_columnar
+from scripts.export_columnar import export_columnar as export, load_table
+from src.scoutconnect.synthetic import SPORTS, generate
+
+
+def test_numpy_snapshot_round_trips(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=4, players=30, evaluations=120, watchlists=0)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE evaluations SET evaluator_id = NULL, notes = 'it''s ✓' WHERE id = 2"))
+    schema = export(tmp_path / "snapshot", fmt="numpy", chunk_rows=50, db_engine=engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, evaluator_id, sport, criteria, score, notes FROM evaluations ORDER BY id")).all()
+    engine.dispose()
+
+    assert schema["format"] == "numpy"
+    assert schema["tables"]["watchlists"]["rows"] == 0
+    evaluations = load_table(tmp_path / "snapshot", "evaluations")
+    # Fixed-width columns are memory-mapped straight from disk
+    assert isinstance(evaluations["score"], np.memmap)
+    assert evaluations["created_at"].dtype == np.dtype("datetime64[us]")
+    assert evaluations["id"].tolist() == [row.id for row in rows]
+    assert evaluations["evaluator_id"].mask.tolist() == [row.evaluator_id is None for row in rows]
+    assert evaluations["notes"].tolist() == [row.notes for row in rows]
+    assert np.allclose(evaluations["score"], [float(row.score) for row in rows])
+
+    names = sorted({name for sport in SPORTS.values() for name in sport["criteria"]})
+    assert [name for name in evaluations if name.startswith("criteria_")] == ["criteria_" + n for n in names]
+    for i, row in enumerate(rows):
+        criteria = json.loads(row.criteria)
+        for name in names:
+            value = evaluations["criteria_" + name][i]
+            assert value == criteria[name] if name in criteria else np.isnan(value)
+
+    users = load_table(tmp_path / "snapshot", "users")
+    assert "password_hash" not in users and users["username"][0] == "admin1"
+    assert load_table(tmp_path / "snapshot", "watchlists")["id"].shape == (0,)
+
+
+def test_parquet_needs_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_columnar, "pa", None)
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=1, players=1, evaluations=0, watchlists=0)
+    with pytest.raises(ValueError, match="pyarrow"):
+        export(tmp_path / "snapshot", fmt="parquet", db_engine=engine)
+    assert export(tmp_path / "snapshot", db_engine=engine)["format"] == "numpy"
+    engine.dispose()
+
+
+def test_parquet_snapshot_round_trips(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=4, players=30, evaluations=120, watchlists=0)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE evaluations SET evaluator_id = NULL WHERE id = 2"))
+    schema = export(tmp_path / "snapshot", fmt="parquet", chunk_rows=50, db_engine=engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, evaluator_id, criteria, score, created_at FROM evaluations ORDER BY id")).all()
+    engine.dispose()
+
+    assert schema["format"] == "parquet"
+    evaluations = load_table(tmp_path / "snapshot", "evaluations")
+    assert evaluations.num_rows == len(rows)
+    assert evaluations.column("id").to_pylist() == [row.id for row in rows]
+    # Nullable integers keep their nulls instead of turning into 0
+    assert evaluations.schema.field("evaluator_id").nullable
+    assert evaluations.column("evaluator_id").to_pylist() == [row.evaluator_id for row in rows]
+    assert evaluations.schema.field("created_at").type == pa.timestamp("us")
+    assert [value.isoformat(" ") for value in evaluations.column("created_at").to_pylist()] == \
+        [str(row.created_at) for row in rows]
+    assert np.allclose(evaluations.column("score").to_numpy(), [float(row.score) for row in rows])
+
+    names = sorted({name for sport in SPORTS.values() for name in sport["criteria"]})
+    assert [name for name in evaluations.column_names if name.startswith("criteria_")] == ["criteria_" + n for n in names]
+    for i, row in enumerate(rows):
+        criteria = json.loads(row.criteria)
+        for name in names:
+            # Criteria an evaluation doesn't use are null
+            assert evaluations.column("criteria_" + name)[i].as_py() == criteria.get(name)
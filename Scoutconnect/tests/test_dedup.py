@@ -0,0 +1,103 @@
+"""
+Tests for duplicate player detection and merging
+"""
+
+from datetime import date
+
+from src.scoutconnect import dedup
+from src.scoutconnect.dedup import soundex, blocking_key, find_duplicates, merge_players
+from src.scoutconnect.ratings import apply_evaluation
+from models import Player, User, Evaluation, Watchlist, PlayerRating, DeletedRecord
+
+
+def test_blocking_key_is_phonetic():
+    assert soundex("Fields") == soundex("Feilds") == "F432"
+    assert soundex("Ashcraft") == "A261"
+    assert blocking_key("Soccer", "Müller", date(2005, 3, 1)) == "soccer|M460|2005"
+
+
+def test_only_players_in_the_same_block_are_compared(session_factory):
+    with session_factory() as db:
+        fields = Player(first_name="Jordan", last_name="Fields", sport="soccer", date_of_birth=date(2005, 3, 1))
+        feilds = Player(first_name="Jordan", last_name="Feilds", sport="soccer", date_of_birth=date(2005, 3, 1))
+        db.add_all([
+            fields,
+            feilds,
+            # Same name, different birth year and sport: different blocks
+            Player(first_name="Jordan", last_name="Fields", sport="soccer", date_of_birth=date(2001, 3, 1)),
+            Player(first_name="Jordan", last_name="Fields", sport="basketball", date_of_birth=date(2005, 3, 1)),
+        ])
+        db.commit()
+
+        report = find_duplicates(db)
+        assert report["players_scanned"] == 4
+        assert report["blocks"] == 3
+        assert report["truncated_blocks"] == {}
+        assert [c["player_ids"] for c in report["candidates"]] == [[fields.id, feilds.id]]
+
+
+def test_oversized_blocks_are_reported(session_factory, monkeypatch, caplog):
+    monkeypatch.setattr(dedup, "DEDUP_MAX_BLOCK_SIZE", 2)
+    with session_factory() as db:
+        players = [
+            Player(first_name=name, last_name="Fields", sport="soccer", date_of_birth=date(2005, 3, 1))
+            for name in ("Jordan", "Jordon", "Jordann")
+        ]
+        db.add_all(players)
+        db.commit()
+
+        report = find_duplicates(db)
+        # Only the first two players of the block were compared
+        assert report["truncated_blocks"] == {players[0].block_key: 3}
+        assert [c["player_ids"] for c in report["candidates"]] == [[players[0].id, players[1].id]]
+        assert players[0].block_key in caplog.text
+
+
+def test_merge_moves_history_and_soft_deletes_duplicate(session_factory):
+    with session_factory() as db:
+        scout = User(username="scout", email="s@x.com", password_hash="x", role="scout")
+        keep = Player(first_name="Jordan", last_name="Fields", sport="soccer")
+        dup = Player(first_name="Jordan", last_name="Feilds", sport="soccer", external_id="club-7")
+        db.add_all([scout, keep, dup])
+        db.flush()
+        db.add_all([
+            Evaluation(player_id=dup.id, evaluator_id=scout.id, sport="soccer", score=90),
+            Watchlist(user_id=scout.id, player_id=keep.id),
+            Watchlist(user_id=scout.id, player_id=dup.id),
+        ])
+        apply_evaluation(db, keep.id, None, 80)
+        apply_evaluation(db, dup.id, None, 90)
+        db.commit()
+
+        result = merge_players(db, keep.id, [dup.id])
+        assert result["evaluations"] == 1
+        assert result["watchlists_dropped"] == 1
+
+        assert db.query(Evaluation).filter(Evaluation.player_id == keep.id).count() == 1
+        assert db.query(Watchlist).count() == 1
+        assert db.get(PlayerRating, dup.id) is None
+        assert db.get(PlayerRating, keep.id).weight > 1.9
+        assert db.query(Player).filter(Player.id == dup.id).first() is None
+        assert db.get(Player, keep.id).external_id == "club-7"
+        assert db.query(DeletedRecord).filter(DeletedRecord.entity == "watchlist").count() == 1
+
+
+def test_merge_keeps_one_entry_per_user(session_factory):
+    with session_factory() as db:
+        scout = User(username="scout", email="s@x.com", password_hash="x", role="scout")
+        keep = Player(first_name="Jordan", last_name="Fields", sport="soccer")
+        dups = [Player(first_name="Jordan", last_name=name, sport="soccer") for name in ("Feilds", "Fieldz")]
+        db.add_all([scout, keep, *dups])
+        db.flush()
+        # Watching both duplicates but not the player that is kept
+        first = Watchlist(user_id=scout.id, player_id=dups[0].id)
+        second = Watchlist(user_id=scout.id, player_id=dups[1].id)
+        db.add_all([first, second])
+        db.commit()
+        first_id, second_id = first.id, second.id
+
+        result = merge_players(db, keep.id, [d.id for d in dups])
+        assert (result["watchlists"], result["watchlists_dropped"]) == (1, 1)
+        assert db.query(Watchlist.id, Watchlist.player_id).all() == [(first_id, keep.id)]
+        tombstone = db.query(DeletedRecord).filter(DeletedRecord.entity == "watchlist").one()
+        assert tombstone.entity_id == second_id
@@ -0,0 +1,53 @@
+"""
+Tests for soft delete and the batched player purge
+"""
+
+from src.scoutconnect.deletion import soft_delete_player, purge_players
+from models import Player, Evaluation, Watchlist, User, DeletedRecord
+
+
+def make_player_with_history(db, evaluations=5):
+    user = User(username="scout", email="scout@x.com", password_hash="x", role="scout")
+    player = Player(first_name="Jordan", last_name="Fields", sport="football")
+    db.add_all([user, player])
+    db.flush()
+    db.add_all([Evaluation(player_id=player.id, evaluator_id=user.id, sport="football", score=80)
+                for _ in range(evaluations)])
+    db.add(Watchlist(user_id=user.id, player_id=player.id))
+    db.commit()
+    return player.id
+
+
+def test_soft_deleted_player_is_hidden(session_factory):
+    with session_factory() as db:
+        player_id = make_player_with_history(db)
+        assert soft_delete_player(db, player_id)
+        assert not soft_delete_player(db, player_id)
+
+        assert db.query(Player).filter(Player.id == player_id).first() is None
+        hidden = db.query(Player).execution_options(include_deleted=True).filter(Player.id == player_id).one()
+        assert hidden.deleted_at is not None
+        # Children stay until the purge runs
+        assert db.query(Evaluation).count() == 5
+
+
+def test_purge_removes_cascade_in_batches(session_factory):
+    with session_factory() as db:
+        player_id = make_player_with_history(db, evaluations=7)
+        soft_delete_player(db, player_id)
+
+        counts = purge_players(db, batch_size=3, pause=0)
+        assert counts == {"players": 1, "evaluations": 7, "watchlists": 1}
+        assert db.query(Evaluation).count() == 0
+        assert db.query(Player).execution_options(include_deleted=True).count() == 0
+        # One tombstone, the soft delete's; clients drop the player's rows along with it
+        assert [(t.entity, t.entity_id) for t in db.query(DeletedRecord)] == [("player", player_id)]
+
+
+def test_delete_endpoint_soft_deletes(client, coach_headers):
+    player_id = client.post("/players", json={
+        "first_name": "Tom", "last_name": "Brady", "sport": "football",
+    }, headers=coach_headers).json()["id"]
+    assert client.delete(f"/players/{player_id}", headers=coach_headers).status_code == 204
+    assert client.get(f"/players/{player_id}", headers=coach_headers).status_code == 404
+    assert client.delete(f"/players/{player_id}", headers=coach_headers).status_code == 404
@@ -0,0 +1,85 @@
+"""
+Tests for the evaluation event stream
+"""
+
+import asyncio
+import os
+
+from src.scoutconnect.events import EventBroker, evaluation_events
+
+
+def test_broker_fans_out_to_target_users():
+    async def scenario():
+        broker = EventBroker(queue_size=10)
+        first, second, other = broker.subscribe(None, 1), broker.subscribe(None, 1), broker.subscribe(None, 2)
+        # Same user id in another tenant's database
+        elsewhere = broker.subscribe("club-b", 1)
+        broker.publish(None, [1], "evaluation", {"id": 7})
+        assert await first.next_event(0.1) == ("evaluation", {"id": 7})
+        assert await second.next_event(0.1) == ("evaluation", {"id": 7})
+        assert await other.next_event(0.01) is None
+        assert await elsewhere.next_event(0.01) is None
+        broker.publish("club-b", [1], "evaluation", {"id": 8})
+        assert await elsewhere.next_event(0.1) == ("evaluation", {"id": 8})
+        assert await first.next_event(0.01) is None
+        for subscription in (first, second, other, elsewhere):
+            broker.unsubscribe(subscription)
+        assert broker._subscribers == {}
+    asyncio.run(scenario())
+
+
+def test_events_relay_across_workers(tmp_path):
+    async def scenario():
+        here, there = EventBroker(relay_dir=str(tmp_path)), EventBroker(relay_dir=str(tmp_path))
+        await here.start()
+        await there.start()
+        # A socket left behind by a worker that died
+        stale = EventBroker(relay_dir=str(tmp_path))
+        await stale.start()
+        stale._loop.remove_reader(stale._relay.fileno())
+        stale._relay.close()
+        try:
+            remote, local = there.subscribe("club-b", 1), here.subscribe("club-b", 1)
+            here.publish("club-b", [1], "evaluation", {"id": 9})
+            assert await remote.next_event(1) == ("evaluation", {"id": 9})
+            assert await local.next_event(1) == ("evaluation", {"id": 9})
+            assert not os.path.exists(stale._relay_path)
+        finally:
+            await here.stop()
+            await there.stop()
+        assert os.listdir(tmp_path) == []
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_told_to_resync():
+    async def scenario():
+        broker = EventBroker(queue_size=2)
+        slow = broker.subscribe(None, 1)
+        for i in range(5):
+            broker.publish(None, [1], "evaluation", {"id": i})
+        assert (await slow.next_event(0.1))[0] == "lagged"
+        broker.publish(None, [1], "evaluation", {"id": 99})
+        assert await slow.next_event(0.1) == ("evaluation", {"id": 99})
+    asyncio.run(scenario())
+
+
+def test_new_evaluation_is_published_to_watchers(client, coach_headers):
+    player_id = client.post("/players", json={
+        "first_name": "Alex", "last_name": "Morgan", "sport": "soccer",
+    }, headers=coach_headers).json()["id"]
+    client.post("/watchlists", json={"player_id": player_id}, headers=coach_headers)
+
+    received = []
+    original = evaluation_events.publish
+    evaluation_events.publish = lambda tenant, users, event, data: received.append((list(users), event, data))
+    try:
+        response = client.post("/evaluations", json={
+            "player_id": player_id, "criteria": {"speed": 90}, "score": 90,
+        }, headers=coach_headers)
+    finally:
+        evaluation_events.publish = original
+
+    assert response.status_code == 201
+    assert response.json()["sport"] == "soccer"
+    [(users, event, data)] = received
+    assert event == "evaluation" and data["player_id"] == player_id and len(users) == 1
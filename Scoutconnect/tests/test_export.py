@@ -0,0 +1,84 @@
+"""
+Tests for the SQL export script
+"""
+
+import gzip
+import sqlite3
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import INTEGER, create_engine, text
+from sqlalchemy.dialects import postgresql
+
+from scripts.export_database import (
+    EXPORT_TABLES, _column_type, export_database, export_table_schema, snapshot_connections, sql_literal,
+)
+from src.scoutconnect.synthetic import generate
+
+
+def _dump_rows(path):
+    with sqlite3.connect(path) as conn:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall() for table in EXPORT_TABLES}
+
+
+def test_export_round_trips(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=5, players=30, evaluations=120, watchlists=15)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE players SET last_name = 'O''Neil' WHERE id = 1"))
+
+    plain = export_database(tmp_path / "export.sql", batch_size=50, db_engine=engine)
+    packed = export_database(tmp_path / "export.sql.gz", compress=True, batch_size=50, workers=2, db_engine=engine)
+    engine.dispose()
+
+    sql = plain.read_text(encoding="utf-8")
+    # Sections come out in table order, rows in batches of at most 50
+    assert [sql.index(f"-- Data for {table}") for table in EXPORT_TABLES] == sorted(
+        sql.index(f"-- Data for {table}") for table in EXPORT_TABLES)
+    assert sql.count("INSERT INTO evaluations") == 3
+    # Compressed sections are gzip members that read back as one stream
+    assert gzip.open(packed, "rt", encoding="utf-8").read().split("\n", 2)[2] == sql.split("\n", 2)[2]
+
+    with sqlite3.connect(tmp_path / "restored.db") as conn:
+        conn.executescript(sql)
+    assert _dump_rows(tmp_path / "restored.db") == _dump_rows(tmp_path / "source.db")
+
+
+def test_snapshot_connections_share_one_state(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=3, players=5, evaluations=0, watchlists=0)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    with snapshot_connections(engine, 2) as connections:
+        with engine.begin() as writer:
+            writer.execute(text("DELETE FROM players"))
+        assert [conn.execute(text("SELECT count(*) FROM players")).scalar() for conn in connections] == [5, 5]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM players")).scalar() == 0
+    engine.dispose()
+
+
+def test_sql_literal():
+    assert sql_literal(None) == "NULL"
+    assert sql_literal("it's") == "'it''s'"
+    assert sql_literal(datetime(2024, 1, 2, 3, 4, 5)) == "'2024-01-02T03:04:05'"
+    assert sql_literal({"speed": 8}) == "'{\"speed\": 8}'"
+    assert sql_literal(True) == "TRUE" and sql_literal(2.5) == "2.5"
+
+
+def test_schema_comes_from_inspection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(engine, users=1, players=0, evaluations=0, watchlists=0)
+    with engine.connect() as conn:
+        ddl = export_table_schema(conn, "evaluations")
+    engine.dispose()
+    assert ddl.startswith("CREATE TABLE evaluations (\n    id INTEGER NOT NULL PRIMARY KEY,\n")
+    assert "    score DECIMAL(5, 2),\n" in ddl
+    # Same key order as SQLite's own PRAGMA listing
+    assert ddl.index("REFERENCES users (id) ON DELETE SET NULL") < ddl.index("REFERENCES players (id) ON DELETE CASCADE")
+
+    conn = SimpleNamespace(dialect=postgresql.dialect())
+    serial = {"name": "id", "type": INTEGER(), "default": "nextval('users_id_seq'::regclass)", "autoincrement": True}
+    assert _column_type(conn, serial) == ("SERIAL", None)
+    assert _column_type(conn, {**serial, "default": "0", "autoincrement": False}) == ("INTEGER", "0")
@@ -0,0 +1,64 @@
+"""
+Tests for the readiness endpoint
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from src.scoutconnect import main, health
+from src.scoutconnect.health import LoopLagMonitor, ReadinessProbe, pool_status
+
+
+def test_ready_when_everything_is_quiet(client, session_factory, monkeypatch):
+    monkeypatch.setattr(main, "readiness", ReadinessProbe(session_factory.kw["bind"], LoopLagMonitor()))
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready" and report["failing"] == []
+    assert report["database"]["ok"] and report["database"]["latency_ms"] >= 0
+    assert set(report["backlog"]) == {"threadpool", "jobs", "writes"}
+
+
+def test_saturated_pool_and_lagging_loop_fail(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}", poolclass=QueuePool, pool_size=1,
+                           max_overflow=0, pool_timeout=5)
+    lag = LoopLagMonitor()
+    lag.lag_ms = 1000
+    probe = ReadinessProbe(engine, lag)
+    monkeypatch.setattr(health, "HEALTH_DB_TIMEOUT", 0.2)
+
+    async def scenario():
+        with engine.connect():
+            # The only connection is taken: the probe waits for the pool and times out
+            report = await probe.check({"jobs": 0})
+            # The stuck probe is not stacked with another one
+            again = await probe.database()
+        return report, again
+
+    report, again = asyncio.run(scenario())
+    assert report["status"] == "unavailable"
+    assert set(report["failing"]) == {"database", "pool", "event_loop"}
+    assert report["pool"]["usage"] == 1.0
+    assert again == {"ok": False, "error": "previous probe still pending"}
+    engine.dispose()
+
+
+def test_lag_monitor_sees_a_blocked_loop():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01)
+        await monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.2)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+        return monitor.lag_ms
+
+    assert asyncio.run(scenario()) > 100
+
+
+def test_unbounded_pools_report_no_usage():
+    engine = create_engine("sqlite://")
+    assert pool_status(engine).get("usage") is None
@@ -0,0 +1,139 @@
+"""
+Tests for the background job runner
+"""
+
+import asyncio
+import threading
+
+from src.scoutconnect.jobs import JobRunner, register_job
+from models import Job
+
+
+@register_job("test_echo")
+async def echo_job(params):
+    return {"echo": params.get("value")}
+
+
+@register_job("test_sleep")
+async def sleep_job(params):
+    await asyncio.sleep(10)
+    return {}
+
+
+release = threading.Event()
+
+
+@register_job("test_block")
+def block_job(params):
+    release.wait(10)
+    return {}
+
+
+@register_job("test_fail")
+def fail_job(params):
+    raise ValueError("boom")
+
+
+def run_jobs(session_factory, scenario):
+    async def main():
+        runner = JobRunner(session_factory, workers=2, poll_seconds=60)
+        await runner.start()
+        try:
+            with session_factory() as db:
+                return await scenario(runner, db)
+        finally:
+            await runner.stop()
+    return asyncio.run(main())
+
+
+async def wait_for(db, job_id, statuses=("succeeded", "failed", "cancelled")):
+    for _ in range(200):
+        db.expire_all()
+        job = db.get(Job, job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job.status}")
+
+
+def test_job_succeeds(session_factory):
+    async def scenario(runner, db):
+        job = runner.submit(db, "test_echo", {"value": 42})
+        job = await wait_for(db, job.id)
+        assert job.status == "succeeded"
+        assert job.result == {"echo": 42}
+        assert job.started_at is not None and job.finished_at is not None
+    run_jobs(session_factory, scenario)
+
+
+def test_job_failure_is_recorded(session_factory):
+    async def scenario(runner, db):
+        job = runner.submit(db, "test_fail")
+        job = await wait_for(db, job.id)
+        assert job.status == "failed"
+        assert "boom" in job.error
+    run_jobs(session_factory, scenario)
+
+
+def test_running_job_can_be_cancelled(session_factory):
+    async def scenario(runner, db):
+        job = runner.submit(db, "test_sleep")
+        job = await wait_for(db, job.id, statuses=("running",))
+        runner.cancel(db, job)
+        job = await wait_for(db, job.id)
+        assert job.status == "cancelled"
+    run_jobs(session_factory, scenario)
+
+
+def test_stop_requeues_running_jobs(session_factory):
+    async def main():
+        runner = JobRunner(session_factory, workers=2, poll_seconds=60)
+        await runner.start()
+        release.clear()
+        try:
+            with session_factory() as db:
+                jobs = [runner.submit(db, "test_sleep"), runner.submit(db, "test_block")]
+                for job in jobs:
+                    await wait_for(db, job.id, statuses=("running",))
+                await asyncio.wait_for(runner.stop(), timeout=5)
+                db.expire_all()
+                return [db.get(Job, job.id).status for job in jobs]
+        finally:
+            # Let the executor thread finish so asyncio.run can shut down
+            release.set()
+    assert asyncio.run(main()) == ["queued", "queued"]
+
+
+def test_one_runner_owns_the_jobs(session_factory, tmp_path):
+    """Runners sharing a lock file run jobs in one place; a standby takes over when the owner stops"""
+    lock_path = str(tmp_path / "jobs.lock")
+
+    async def main():
+        owner = JobRunner(session_factory, poll_seconds=0.01, lock_path=lock_path)
+        standby = JobRunner(session_factory, poll_seconds=0.01, lock_path=lock_path)
+        await owner.start()
+        await standby.start()
+        try:
+            assert owner.owner and not standby.owner
+            with session_factory() as db:
+                job = standby.submit(db, "test_echo", {"value": 1})
+                assert standby.backlog == 0
+                assert (await wait_for(db, job.id)).result == {"echo": 1}
+
+                await owner.stop()
+                for _ in range(100):
+                    if standby.owner:
+                        break
+                    await asyncio.sleep(0.01)
+                assert standby.owner
+                job = standby.submit(db, "test_echo", {"value": 2})
+                assert (await wait_for(db, job.id)).result == {"echo": 2}
+        finally:
+            await owner.stop()
+            await standby.stop()
+    asyncio.run(main())
+
+
+def test_unknown_kind_is_rejected(client, coach_headers):
+    response = client.post("/jobs", json={"kind": "nope"}, headers=coach_headers)
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+"""
+Tests for the RETURNING-based player and user writes
+"""
+
+from sqlalchemy import event
+
+from models import Player
+
+
+def test_create_and_update_return_the_written_row(client, coach_headers, session_factory):
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    created = client.post("/players", headers=coach_headers, json={
+        "first_name": "Jordan", "last_name": "Fields", "sport": "soccer",
+    })
+    assert created.status_code == 201
+    assert created.json()["created_at"] and created.json()["rating"] is None
+    # Authenticating the request, then the write and its change feed stamp: no refresh SELECT
+    assert "SELECT" not in statements[statements.index("INSERT"):]
+
+    player_id = created.json()["id"]
+    client.post("/evaluations", headers=coach_headers, json={"player_id": player_id, "score": 90})
+    updated = client.put(f"/players/{player_id}", headers=coach_headers, json={"last_name": "Feilds"})
+    assert updated.status_code == 200
+    assert updated.json()["last_name"] == "Feilds"
+    assert updated.json()["rating"] is not None
+
+    with session_factory() as db:
+        assert db.get(Player, player_id).block_key == "soccer|F432|----"
+
+    assert client.put("/players/999", headers=coach_headers, json={"position": "GK"}).status_code == 404
+
+
+def test_unique_violations_keep_their_errors(client, coach_headers):
+    player = {"first_name": "A", "last_name": "B", "sport": "soccer", "external_id": "club-1"}
+    assert client.post("/players", headers=coach_headers, json=player).status_code == 201
+    duplicate = client.post("/players", headers=coach_headers, json={**player, "first_name": "C"})
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Player already exists"
+
+    user = {"username": "coach_test", "email": "new@scoutconnect.com", "password": "x", "role": "coach"}
+    assert client.post("/auth/register", json=user).json()["detail"] == "Username already registered"
+    user = {**user, "username": "someone_else", "email": "coach_test@scoutconnect.com"}
+    assert client.post("/auth/register", json=user).json()["detail"] == "Email already registered"
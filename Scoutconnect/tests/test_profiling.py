@@ -0,0 +1,54 @@
+"""
+Tests for per-request profiling
+"""
+
+import pytest
+
+from src.scoutconnect import main
+from src.scoutconnect.profiling import RequestProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    profiler = RequestProfiler(str(tmp_path), max_files=2)
+    monkeypatch.setattr(main, "request_profiler", profiler)
+    return profiler
+
+
+def test_admin_can_profile_a_request(client, admin_headers, profiler):
+    response = client.get("/players", headers={**admin_headers, "X-Profile": "1", "X-Request-ID": "slow-players"})
+    assert response.headers["X-Request-ID"] == "slow-players"
+
+    profiles = client.get("/admin/profiles", headers=admin_headers).json()
+    assert [p["request_id"] for p in profiles] == ["slow-players"]
+    assert profiles[0]["path"] == "/players"
+    assert profiles[0]["top"]
+
+    download = client.get("/admin/profiles/slow-players", headers=admin_headers)
+    assert download.status_code == 200
+    assert client.get("/admin/profiles/missing", headers=admin_headers).status_code == 404
+
+
+def test_only_admins_can_opt_in(client, coach_headers, profiler):
+    client.get("/players", headers={**coach_headers, "X-Profile": "1"})
+    assert profiler.recent() == []
+    assert client.get("/admin/profiles", headers=coach_headers).status_code == 403
+
+
+def test_admin_role_cannot_be_self_assigned(client, admin_headers, coach_headers, profiler):
+    account = {"username": "mallory", "email": "mallory@x.com", "password": "x", "role": "admin"}
+    assert client.post("/auth/register", json=account).status_code == 403
+    assert client.post("/auth/register", json=account, headers=coach_headers).status_code == 403
+    assert client.post("/auth/register", json={**account, "role": "owner"}).status_code == 400
+    # An admin can create another one
+    response = client.post("/auth/register", json=account, headers=admin_headers)
+    assert response.status_code == 200
+    new_admin = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/admin/profiles", headers=new_admin).status_code == 200
+
+
+def test_old_profiles_are_pruned(client, admin_headers, profiler):
+    for i in range(4):
+        client.get("/players", headers={**admin_headers, "X-Profile": "1", "X-Request-ID": f"r{i}"})
+    assert len(profiler.recent()) == 2
+    assert len(list(profiler.directory.iterdir())) == 4  # metadata + profile for each
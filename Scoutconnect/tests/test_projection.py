@@ -0,0 +1,62 @@
+"""
+Tests for fields= projection on player and evaluation reads
+"""
+
+import json
+
+from sqlalchemy import event
+
+from src.scoutconnect import jobs
+
+
+def add_players(client, headers):
+    ids = []
+    for first_name in ("Ann", "Bea"):
+        response = client.post("/players", headers=headers, json={
+            "first_name": first_name, "last_name": "Smith", "sport": "soccer", "position": "GK", "height_cm": 180,
+        })
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_fields_narrow_select_and_payload(client, coach_headers, session_factory):
+    first, second = add_players(client, coach_headers)
+    client.post("/evaluations", headers=coach_headers, json={"player_id": first, "score": 88})
+    client.delete(f"/players/{second}", headers=coach_headers)
+
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    players = client.get("/players?fields=id,first_name,rating", headers=coach_headers).json()
+    assert players == [{"id": first, "first_name": "Ann", "rating": players[0]["rating"]}]
+    assert players[0]["rating"] is not None
+    assert "height_cm" not in statements[-1]
+
+    player = client.get(f"/players/{first}?fields=sport,position", headers=coach_headers).json()
+    assert player == {"sport": "soccer", "position": "GK"}
+    by_sport = client.get("/players/sport/soccer?fields=id", headers=coach_headers).json()
+    assert by_sport == [{"id": first}]
+    leaderboard = client.get("/leaderboard?fields=first_name", headers=coach_headers).json()
+    assert leaderboard == [{"first_name": "Ann"}]
+
+    evaluations = client.get(f"/players/{first}/evaluations?fields=score,archived", headers=coach_headers).json()
+    assert evaluations == [{"score": 88.0, "archived": False}]
+
+
+def test_unknown_fields_are_rejected(client, coach_headers):
+    response = client.get("/players?fields=id,password_hash", headers=coach_headers)
+    assert response.status_code == 400
+    assert "password_hash" in response.json()["detail"]
+    assert client.get("/players/1/evaluations?fields=block_key", headers=coach_headers).status_code == 400
+
+
+def test_export_writes_only_requested_fields(client, coach_headers, session_factory, tmp_path, monkeypatch):
+    add_players(client, coach_headers)
+    monkeypatch.setattr(jobs, "SessionLocal", session_factory)
+    monkeypatch.setattr(jobs, "EXPORT_DIR", tmp_path)
+
+    result = jobs.export_players({"fields": "id,date_of_birth,sport"})
+    with open(result["path"]) as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[0] == {"id": 1, "date_of_birth": None, "sport": "soccer"}
+    assert result["rows"] == 2
@@ -0,0 +1,102 @@
+"""
+Tests for the player rating engine
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.scoutconnect import ratings
+from src.scoutconnect.db import Base
+from src.scoutconnect.ratings import apply_evaluation, recompute_ratings
+from models import Player, User, Evaluation, PlayerRating, EvaluatorStats
+
+
+def setup_players(db):
+    strict = User(username="strict", email="s@x.com", password_hash="x", role="scout")
+    fair = User(username="fair", email="f@x.com", password_hash="x", role="scout")
+    first = Player(first_name="A", last_name="One", sport="soccer")
+    second = Player(first_name="B", last_name="Two", sport="soccer")
+    db.add_all([strict, fair, first, second])
+    db.flush()
+    return strict, fair, first, second
+
+
+def test_incremental_update_moves_rating_towards_scores(session_factory):
+    with session_factory() as db:
+        strict, fair, first, _ = setup_players(db)
+        start = datetime(2025, 1, 1)
+        for day in range(5):
+            apply_evaluation(db, first.id, fair.id, 95, at=start + timedelta(days=day))
+        db.commit()
+        rating = db.get(PlayerRating, first.id)
+        assert ratings.RATING_PRIOR_MEAN < float(rating.rating) < 95
+        assert rating.weight < 5  # older evaluations have decayed a little
+
+        # An evaluator who always scores low builds up a negative bias
+        for day in range(5):
+            apply_evaluation(db, first.id, strict.id, 60, at=start + timedelta(days=10 + day))
+        db.commit()
+        assert db.get(EvaluatorStats, strict.id).bias < 0
+
+
+def test_concurrent_updates_are_serialized(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ratings.db'}", connect_args={"timeout": 0.1})
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _, fair, first, _ = setup_players(db)
+        apply_evaluation(db, first.id, fair.id, 90)
+        db.commit()
+        player_id, evaluator_id = first.id, fair.id
+
+    with Session(engine) as one, Session(engine) as two:
+        apply_evaluation(one, player_id, evaluator_id, 80)
+        # The second writer waits for the row instead of reading a value about to go stale
+        with pytest.raises(OperationalError, match="locked"):
+            apply_evaluation(two, player_id, evaluator_id, 60)
+        two.rollback()
+        one.commit()
+        apply_evaluation(two, player_id, evaluator_id, 60)
+        two.commit()
+
+    with Session(engine) as db:
+        assert db.get(EvaluatorStats, evaluator_id).evaluations == 3
+        assert round(db.get(PlayerRating, player_id).weight) == 3
+    engine.dispose()
+
+
+def test_batch_recompute_corrects_for_strict_evaluator(session_factory):
+    with session_factory() as db:
+        strict, fair, first, second = setup_players(db)
+        when = datetime(2025, 6, 1)
+        db.add_all([
+            Evaluation(player_id=first.id, evaluator_id=fair.id, sport="soccer", score=90, created_at=when),
+            Evaluation(player_id=first.id, evaluator_id=strict.id, sport="soccer", score=70, created_at=when),
+            Evaluation(player_id=second.id, evaluator_id=strict.id, sport="soccer", score=70, created_at=when),
+            Evaluation(player_id=second.id, evaluator_id=strict.id, sport="soccer", score=70, created_at=when),
+        ])
+        db.commit()
+
+        assert recompute_ratings(db) == {"players": 2, "evaluators": 2, "evaluations": 4}
+        assert db.get(EvaluatorStats, strict.id).bias < 0 < db.get(EvaluatorStats, fair.id).bias
+        db.expire_all()
+        assert db.get(Player, first.id).rating > db.get(Player, second.id).rating
+
+
+def test_leaderboard_orders_by_rating(client, coach_headers):
+    ids = []
+    for name, score in (("Low", 60), ("High", 99)):
+        player_id = client.post("/players", json={
+            "first_name": name, "last_name": "Player", "sport": "tennis",
+        }, headers=coach_headers).json()["id"]
+        client.post("/evaluations", json={"player_id": player_id, "score": score}, headers=coach_headers)
+        ids.append(player_id)
+
+    board = client.get("/leaderboard", params={"sport": "tennis"}, headers=coach_headers).json()
+    assert [p["id"] for p in board] == ids[::-1]
+    assert board[0]["rating"] > board[1]["rating"]
+    sorted_players = client.get("/players", params={"sort": "rating"}, headers=coach_headers).json()
+    assert [p["id"] for p in sorted_players] == ids[::-1]
@@ -0,0 +1,76 @@
+"""
+Tests for the SQL restore script
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from scripts.export_database import EXPORT_TABLES, export_database
+from scripts.restore_database import read_statements, restore_database
+from src.scoutconnect.synthetic import generate
+
+LEGACY_DUMP = """-- ScoutConnect Database Export
+
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    notes TEXT
+);
+
+-- Data for users
+INSERT INTO users (id, username, notes) VALUES (1, 'ann', 'fast; strong');
+INSERT INTO users (id, username, notes) VALUES (2, 'bo''b', 'line one
+(line two);
+');
+INSERT INTO users (id, username, notes) VALUES (3, 'cy', NULL);
+"""
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return {table: conn.execute(text(f"SELECT * FROM {table} ORDER BY 1")).all() for table in EXPORT_TABLES}
+
+
+def test_restore_round_trips(tmp_path):
+    source = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    generate(source, users=5, players=40, evaluations=150, watchlists=20)
+    dump = export_database(tmp_path / "export.sql.gz", compress=True, batch_size=30, db_engine=source)
+
+    target = create_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    counts = restore_database(dump, target, batch_rows=100, commit_rows=50)
+    assert set(counts) == set(EXPORT_TABLES)
+    assert {table: n for table, n in counts.items() if n} == {"users": 5, "players": 40, "evaluations": 150,
+                                                              "watchlists": 20}
+    assert _rows(target) == _rows(source)
+    # The dump has no indexes; the app's are built after the load
+    names = {index["name"] for index in inspect(target).get_indexes("players")}
+    assert {"uq_players_identity", "ix_players_block_key"} <= names
+
+    with pytest.raises(ValueError, match="already exists"):
+        restore_database(dump, target)
+    assert restore_database(dump, target, replace=True) == counts
+    source.dispose()
+    target.dispose()
+
+
+def test_statements_split_outside_strings():
+    statements = list(read_statements(LEGACY_DUMP.splitlines(keepends=True)))
+    assert [rows for _, _, rows in statements] == [0, 1, 1, 1]
+    assert statements[2][1].endswith("');\n")
+
+
+def test_legacy_dump_merges_and_verifies(tmp_path):
+    path = tmp_path / "legacy.sql"
+    path.write_text(LEGACY_DUMP, encoding="utf-8")
+    target = create_engine(f"sqlite:///{tmp_path / 'restored.db'}")
+    assert restore_database(path, target) == {"users": 3}
+    with target.connect() as conn:
+        assert conn.execute(text("SELECT notes FROM users WHERE id = 2")).scalar() == "line one\n(line two);\n"
+
+    # Rows the database silently dropped are caught by the count check
+    path.write_text(LEGACY_DUMP.replace("INSERT INTO users", "INSERT OR IGNORE INTO users")
+                    + "INSERT OR IGNORE INTO users (id, username, notes) VALUES (1, 'dup', NULL);\n",
+                    encoding="utf-8")
+    with pytest.raises(RuntimeError, match="users: dump 4, database 3"):
+        restore_database(path, target, replace=True)
+    target.dispose()
@@ -0,0 +1,100 @@
+"""
+Tests for bulk roster upserts
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from scripts.add_player_identity_index import add_identity_index
+from src.scoutconnect.rosters import upsert_players
+from models import Player, User, Evaluation, DeletedRecord
+
+ROSTER = [
+    {"external_id": "club-1", "first_name": "Jordan", "last_name": "Fields",
+     "date_of_birth": date(1995, 1, 31), "sport": "football", "position": "LB"},
+    {"external_id": "club-2", "first_name": "Alex", "last_name": "Morgan",
+     "date_of_birth": date(1989, 7, 2), "sport": "soccer", "position": "Forward"},
+]
+
+
+def test_upsert_is_idempotent(session_factory):
+    with session_factory() as db:
+        assert upsert_players(db, ROSTER) == {"inserted": 2, "updated": 0, "unchanged": 0}
+        ids = {p.external_id: p.id for p in db.query(Player)}
+
+        assert upsert_players(db, ROSTER) == {"inserted": 0, "updated": 0, "unchanged": 2}
+
+        changed = [dict(ROSTER[0], position="MLB"), ROSTER[1]]
+        assert upsert_players(db, changed, batch_size=1) == {"inserted": 0, "updated": 1, "unchanged": 1}
+        db.expire_all()
+        assert {p.external_id: p.id for p in db.query(Player)} == ids
+        assert db.query(Player).filter(Player.external_id == "club-1").one().position == "MLB"
+
+
+def test_upsert_by_identity(session_factory):
+    rows = [{k: v for k, v in row.items() if k != "external_id"} for row in ROSTER]
+    with session_factory() as db:
+        assert upsert_players(db, rows, key="identity")["inserted"] == 2
+        result = upsert_players(db, [dict(rows[1], height_cm=170)], key="identity")
+        assert result == {"inserted": 0, "updated": 1, "unchanged": 0}
+        assert db.query(Player).count() == 2
+
+
+def test_upsert_endpoint(client, coach_headers):
+    payload = {"players": [dict(row, date_of_birth=row["date_of_birth"].isoformat()) for row in ROSTER]}
+    response = client.post("/players/upsert", json=payload, headers=coach_headers)
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "updated": 0, "unchanged": 0}
+
+
+def test_upsert_restores_soft_deleted_player(session_factory):
+    from src.scoutconnect.deletion import soft_delete_player
+
+    with session_factory() as db:
+        upsert_players(db, ROSTER[:1])
+        player_id = db.query(Player.id).scalar()
+        soft_delete_player(db, player_id)
+
+        assert upsert_players(db, ROSTER[:1]) == {"inserted": 0, "updated": 1, "unchanged": 0}
+        assert db.query(Player.id).scalar() == player_id
+
+
+def test_failed_sync_applies_nothing(session_factory):
+    with session_factory() as db:
+        upsert_players(db, ROSTER)
+        # The first batch is fine; the second reuses club-1's identity under a new external id
+        rows = [
+            {"external_id": "club-3", "first_name": "Sam", "last_name": "Kerr",
+             "date_of_birth": date(1993, 9, 10), "sport": "soccer"},
+            dict(ROSTER[0], external_id="club-9"),
+        ]
+        with pytest.raises(IntegrityError):
+            upsert_players(db, rows, batch_size=1)
+        db.rollback()
+        assert db.query(Player).filter(Player.external_id == "club-3").count() == 0
+
+
+def test_identity_index_migration_merges_duplicates(session_factory):
+    with session_factory() as db:
+        engine = db.get_bind()
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX uq_players_identity"))
+        scout = User(username="scout", email="s@x.com", password_hash="x", role="scout")
+        players = [Player(**{k: v for k, v in ROSTER[0].items() if k != "external_id"}) for _ in range(3)]
+        db.add_all([scout, *players])
+        db.flush()
+        db.add(Evaluation(player_id=players[2].id, evaluator_id=scout.id, sport="football", score=70))
+        db.commit()
+        keep_id, duplicate_ids = players[0].id, [p.id for p in players[1:]]
+
+        assert add_identity_index(engine, dry_run=True) == {"groups": 1, "merged": 2, "created": False}
+        assert add_identity_index(engine) == {"groups": 1, "merged": 2, "created": True}
+
+        db.expire_all()
+        assert db.query(Player.id).execution_options(include_deleted=True).all() == [(keep_id,)]
+        assert db.query(Evaluation.player_id).scalar() == keep_id
+        assert {r.entity_id for r in db.query(DeletedRecord).filter(DeletedRecord.entity == "player")} == set(duplicate_ids)
+        assert "uq_players_identity" in {i["name"] for i in inspect(engine).get_indexes("players")}
@@ -0,0 +1,92 @@
+"""
+Tests for the scoring engine
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.scoutconnect import jobs
+from src.scoutconnect.archive import archive_evaluations
+from src.scoutconnect.ratings import recompute_ratings
+from src.scoutconnect.scoring import (
+    compute_score, criteria_matrix, weighted_scores, recompute_scores, recompute_scores_job,
+)
+from models import Player, Evaluation, ArchivedEvaluation, PlayerRating, ScoringProfile, User
+
+SEED_CRITERIA = {"shooting": 95, "defense": 90, "speed": 88, "leadership": 92}
+
+
+def test_unweighted_score_is_the_mean():
+    assert compute_score(SEED_CRITERIA) == 91.25
+    assert compute_score({}) is None
+
+
+def test_vectorized_scores_match_scalar_scores():
+    weights = {"shooting": 3, "defense": 1, "speed": 0.5}
+    rows = [SEED_CRITERIA, {"shooting": 70}, {"notes": "n/a"}, None]
+    names = list(weights)
+    scores = weighted_scores(criteria_matrix(rows, names), np.array(list(weights.values()), dtype=float))
+    assert scores[0] == compute_score(SEED_CRITERIA, weights)
+    assert scores[1] == 70
+    assert np.isnan(scores[2]) and np.isnan(scores[3])
+
+
+def test_recompute_respects_position_profiles(session_factory):
+    with session_factory() as db:
+        guard = Player(first_name="A", last_name="G", sport="basketball", position="Guard")
+        center = Player(first_name="B", last_name="C", sport="basketball", position="Center")
+        db.add_all([guard, center])
+        db.flush()
+        db.add_all([
+            Evaluation(player_id=guard.id, sport="basketball", criteria=SEED_CRITERIA, score=91.25),
+            Evaluation(player_id=center.id, sport="basketball", criteria=SEED_CRITERIA, score=91.25),
+            ScoringProfile(sport="basketball", position="Center", weights={"defense": 1}),
+            ScoringProfile(sport="basketball", position=None, weights={"shooting": 1}),
+        ])
+        db.commit()
+
+        assert recompute_scores(db, "basketball", chunk_size=1) == {"evaluations": 1, "updated": 1}
+        assert recompute_scores(db, "basketball", "Center") == {"evaluations": 1, "updated": 1}
+        assert recompute_scores(db, "basketball", "Center") == {"evaluations": 1, "updated": 0}
+
+        scores = {e.player_id: float(e.score) for e in db.query(Evaluation)}
+        assert scores == {guard.id: 95.0, center.id: 90.0}
+
+
+def test_recompute_job_refreshes_ratings_not_the_archive(session_factory, monkeypatch):
+    monkeypatch.setattr(jobs, "SessionLocal", session_factory)
+    with session_factory() as db:
+        player = Player(first_name="A", last_name="G", sport="soccer", position="Forward")
+        scout = User(username="scout", email="scout@x.com", password_hash="x", role="scout")
+        db.add_all([player, scout])
+        db.flush()
+        old = Evaluation(player_id=player.id, evaluator_id=scout.id, sport="soccer", criteria={"speed": 60},
+                         score=60, created_at=datetime.utcnow() - timedelta(days=1000))
+        db.add_all([old, Evaluation(player_id=player.id, evaluator_id=scout.id, sport="soccer",
+                                    criteria={"speed": 80, "passing": 40}, score=60)])
+        db.commit()
+        player_id, archived_id = player.id, old.id
+        archive_evaluations(db, older_than=datetime.utcnow() - timedelta(days=500))
+        recompute_ratings(db)
+        before = float(db.get(PlayerRating, player_id).rating)
+        db.add(ScoringProfile(sport="soccer", position=None, weights={"speed": 1}))
+        db.commit()
+
+    result = recompute_scores_job({"sport": "soccer"})
+    assert result["updated"] == 1 and result["ratings"]["players"] == 1
+    with session_factory() as db:
+        assert float(db.query(Evaluation).one().score) == 80
+        assert float(db.get(PlayerRating, player_id).rating) > before
+        # The archive keeps the score it was archived with
+        assert float(db.get(ArchivedEvaluation, archived_id).score) == 60
+
+
+def test_evaluation_score_is_computed_on_write(client, coach_headers):
+    player_id = client.post("/players", json={
+        "first_name": "Michael", "last_name": "Jordan", "sport": "basketball",
+    }, headers=coach_headers).json()["id"]
+    response = client.post("/evaluations", json={
+        "player_id": player_id, "criteria": SEED_CRITERIA, "score": 10,
+    }, headers=coach_headers)
+    assert response.json()["score"] == 91.25
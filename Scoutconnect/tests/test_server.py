@@ -0,0 +1,52 @@
+"""
+Tests for the production server settings
+"""
+
+import os
+
+from src.scoutconnect import server
+from src.scoutconnect.__main__ import main
+from src.scoutconnect.db import Base, engine
+
+
+def test_worker_count_follows_cores(monkeypatch):
+    monkeypatch.setattr(server, "available_cores", lambda: 6)
+    assert server.default_workers("postgresql://db/scoutconnect") == 6
+    assert server.default_workers("sqlite:///./scoutconnect.db") == 1
+
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", None)
+    monkeypatch.setenv("DATABASE_URL", "postgresql://db/scoutconnect")
+    assert server.server_config()["workers"] == 6
+    monkeypatch.setattr(server, "WEB_CONCURRENCY", "3")
+    assert server.server_config()["workers"] == 3
+    assert server.server_config(workers=2, port=9000)["port"] == 9000
+
+
+def test_config_is_production_shaped(monkeypatch):
+    monkeypatch.setattr(server, "_installed", lambda module: module == "httptools")
+    config = server.server_config(workers=1)
+    assert config["loop"] == "asyncio" and config["http"] == "httptools"
+    assert config["timeout_graceful_shutdown"] == server.SERVER_GRACEFUL_TIMEOUT
+    assert "reload" not in config
+
+
+def test_preload_creates_schema_once(monkeypatch):
+    created = []
+    monkeypatch.setattr(Base.metadata, "create_all", lambda bind: created.append(bind))
+    assert server.preload().title.startswith("ScoutConnect")
+    assert created == [engine]
+
+
+def test_workers_share_runtime(monkeypatch, tmp_path):
+    monkeypatch.delenv("STREAM_RELAY_DIR", raising=False)
+    monkeypatch.setenv("JOB_RUNNER_LOCK", "/run/jobs.lock")
+    server.share_runtime(str(tmp_path))
+    assert os.environ["STREAM_RELAY_DIR"] == str(tmp_path / "streams")
+    assert os.environ["JOB_RUNNER_LOCK"] == "/run/jobs.lock"
+
+
+def test_cli_dispatches_serve(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server, "serve", lambda *args: calls.append(args))
+    main(["serve", "--port", "9001", "--workers", "2"])
+    assert calls == [(None, 9001, 2)]
@@ -0,0 +1,97 @@
+"""
+Tests for the synthetic dataset generator
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import Session
+
+from src.scoutconnect import synthetic
+from src.scoutconnect.loading import secondary_indexes
+from src.scoutconnect.synthetic import SPORTS, generate
+from src.scoutconnect.__main__ import main
+from models import Evaluation, Player, User, Watchlist
+from passlib.context import CryptContext
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _snapshot(engine):
+    # Everything but the password hashes, whose salts are random by design
+    with engine.connect() as conn:
+        return {
+            table.__tablename__: conn.execute(
+                select(*[c for c in table.__table__.c if c.name != "password_hash"]).order_by(table.id)
+            ).all()
+            for table in (User, Player, Evaluation, Watchlist)
+        }
+
+
+def test_same_seed_gives_same_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'gen.db'}")
+    counts = generate(engine, users=6, players=40, evaluations=150, watchlists=20, seed=7, now=NOW)
+    assert counts == {"users": 6, "players": 40, "evaluations": 150, "watchlists": 20}
+    first = _snapshot(engine)
+
+    generate(engine, users=6, players=40, evaluations=150, watchlists=20, seed=7, now=NOW, reset=True)
+    assert _snapshot(engine) == first
+    generate(engine, users=6, players=40, evaluations=150, watchlists=20, seed=8, now=NOW, reset=True)
+    assert _snapshot(engine)["players"] != first["players"]
+    engine.dispose()
+
+
+def test_appending_skips_stored_identities(tmp_path, monkeypatch):
+    # A tiny identity space, so a second run would almost surely redraw stored identities
+    monkeypatch.setattr(synthetic, "FIRST_NAMES", ("Ann",))
+    monkeypatch.setattr(synthetic, "LAST_NAMES", ("Fields",))
+    monkeypatch.setattr(synthetic, "AGE_RANGE_DAYS", (15 * 365, 15 * 365 + 20))
+    space = 20 * len(SPORTS)
+    engine = create_engine(f"sqlite:///{tmp_path / 'gen.db'}")
+    generate(engine, users=1, players=space // 2, evaluations=0, watchlists=0, now=NOW)
+    generate(engine, users=1, players=space - space // 2, evaluations=0, watchlists=0, now=NOW)
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Player)) == space
+    with pytest.raises(ValueError, match="free combinations"):
+        generate(engine, users=0, players=1, evaluations=0, watchlists=0, now=NOW)
+    engine.dispose()
+
+
+def test_rows_are_consistent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'gen.db'}")
+    generate(engine, users=8, players=60, evaluations=300, watchlists=40, now=NOW, batch_size=25)
+    # Appending continues the ids instead of clashing with them
+    generate(engine, users=2, players=10, evaluations=20, watchlists=5, now=NOW)
+
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(Player)) == 70
+        users = db.scalars(select(User).order_by(User.id)).all()
+        assert users[0].username == "admin1" and users[0].role == "admin"
+        assert CryptContext(schemes=["bcrypt"]).verify("admin123", users[0].password_hash)
+
+        for evaluation in db.scalars(select(Evaluation)):
+            assert evaluation.sport == evaluation.player.sport
+            assert set(evaluation.criteria) == set(SPORTS[evaluation.sport]["criteria"])
+            assert evaluation.evaluator.role in ("admin", "coach", "scout")
+            assert abs(float(evaluation.score) - sum(evaluation.criteria.values()) / len(evaluation.criteria)) < 0.01
+        for player in db.scalars(select(Player)):
+            assert player.position in SPORTS[player.sport]["positions"]
+            assert player.block_key.startswith(player.sport + "|")
+        pairs = db.execute(select(Watchlist.user_id, Watchlist.player_id)).all()
+        assert len(pairs) == len(set(pairs)) == 45
+
+    # Deferred indexes are back and the connection settings restored
+    names = {index["name"] for index in inspect(engine).get_indexes("evaluations")}
+    assert {index.name for index in secondary_indexes([Evaluation.__table__])} <= names
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+    engine.dispose()
+
+
+def test_cli_generate(tmp_path, capsys):
+    main(["generate", "--database-url", f"sqlite:///{tmp_path / 'cli.db'}", "--users", "3", "--players", "5",
+          "--evaluations", "10", "--watchlists", "2"])
+    output = capsys.readouterr().out
+    assert "evaluations" in output and "total" in output
@@ -0,0 +1,133 @@
+"""
+Tests for per-tenant database routing
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.scoutconnect import jobs, main, tenants
+from src.scoutconnect.deletion import soft_delete_player
+from src.scoutconnect.jobs import JobRunner
+from src.scoutconnect.tenants import TenantRegistry, UnknownTenant
+from models import Job, Player
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = TenantRegistry(f"sqlite:///{tmp_path}/{{tenant}}.db", max_engines=2, pool_size=2)
+    yield registry
+    registry.dispose()
+
+
+def test_each_tenant_gets_its_own_database(registry, tmp_path):
+    with registry.provision("club-a")() as db:
+        db.add(Player(first_name="A", last_name="One", sport="soccer"))
+        db.commit()
+    with registry.provision("club-b")() as db:
+        assert db.query(Player).count() == 0
+    assert (tmp_path / "club-a.db").exists()
+
+    with pytest.raises(UnknownTenant):
+        registry.sessionmaker("../etc")
+
+
+def test_only_provisioned_tenants_open(registry, tmp_path):
+    registry.provision("club-a")
+    registry.dispose()
+    assert registry.sessionmaker("club-a") is not None
+    with pytest.raises(UnknownTenant):
+        registry.sessionmaker("club-z")
+    assert not (tmp_path / "club-z.db").exists()
+    assert registry.cached() == ["club-a"]
+
+
+def test_least_recently_used_engine_is_evicted(registry):
+    first = registry.provision("a")
+    registry.provision("b")
+    assert registry.sessionmaker("a") is first  # refreshes "a"
+    registry.provision("c")
+    assert list(registry._sessionmakers) == ["a", "c"]
+
+
+def test_token_pins_requests_to_its_tenant(registry, monkeypatch):
+    monkeypatch.setattr(tenants, "MULTI_TENANT", True)
+    monkeypatch.setattr(main, "tenant_registry", registry)
+    client = TestClient(main.app)
+    registry.provision("club-a")
+    registry.provision("club-b")
+
+    def register(tenant):
+        response = client.post("/auth/register", headers={"X-Tenant": tenant}, json={
+            "username": "coach", "email": "coach@x.com", "password": "coach123", "role": "coach",
+        })
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    club_a, club_b = register("club-a"), register("club-b")
+    player = {"first_name": "A", "last_name": "One", "sport": "soccer"}
+    assert client.post("/players", json=player, headers=club_a).status_code == 201
+
+    assert len(client.get("/players", headers=club_a).json()) == 1
+    assert client.get("/players", headers=club_b).json() == []
+    # The header can't move a token to another tenant
+    assert client.get("/players", headers={**club_b, "X-Tenant": "club-a"}).json() == []
+    assert client.post("/auth/login", json={"username": "coach", "password": "coach123"}).status_code == 400
+    # Unknown tenants are refused instead of created
+    assert client.get("/players", headers={"X-Tenant": "club-z"}).status_code == 400
+    assert "club-z" not in registry.cached()
+
+    # The purge job is stored in, and tagged with, the tenant's database
+    player_id = client.get("/players", headers=club_a).json()[0]["id"]
+    assert client.delete(f"/players/{player_id}", headers=club_a).status_code == 204
+    with registry.sessionmaker("club-a")() as db:
+        assert [(job.kind, job.tenant) for job in db.query(Job)] == [("purge_players", "club-a")]
+    with registry.sessionmaker("club-b")() as db:
+        assert db.query(Job).count() == 0
+
+
+def test_jobs_run_against_their_tenant(registry, session_factory, monkeypatch):
+    monkeypatch.setattr(jobs, "tenant_registry", registry)
+    databases = {"default": session_factory, "club-a": registry.provision("club-a")}
+    player_ids = {}
+    for name, factory in databases.items():
+        with factory() as db:
+            player = Player(first_name="A", last_name="One", sport="soccer")
+            db.add(player)
+            db.commit()
+            player_ids[name] = player.id
+            soft_delete_player(db, player.id)
+
+    async def scenario():
+        runner = JobRunner(session_factory, workers=1, poll_seconds=60, tenants=registry)
+        await runner.start()
+        try:
+            with databases["club-a"]() as db:
+                # A tenant named in the params is ignored; the job runs where it is stored
+                job = runner.submit(db, "purge_players", {"player_ids": [player_ids["club-a"]], "tenant": "club-b"},
+                                    tenant="club-a")
+                for _ in range(200):
+                    db.expire_all()
+                    if db.get(Job, job.id).status not in ("queued", "running"):
+                        break
+                    await asyncio.sleep(0.01)
+                return db.get(Job, job.id).status
+        finally:
+            await runner.stop()
+
+    assert asyncio.run(scenario()) == "succeeded"
+    remaining = {}
+    for name, factory in databases.items():
+        with factory() as db:
+            remaining[name] = db.query(Player).execution_options(include_deleted=True).count()
+    assert remaining == {"default": 1, "club-a": 0}
+    assert "club-b" not in registry.cached()
+
+
+def test_single_tenant_mode_skips_token_decoding(monkeypatch):
+    monkeypatch.setattr(tenants, "MULTI_TENANT", False)
+
+    def decode(request):
+        raise AssertionError("token decoded")
+    monkeypatch.setattr(main, "token_claims", decode)
+    assert main.get_tenant(None) is None
@@ -0,0 +1,79 @@
+"""
+Tests for request tracing
+"""
+
+import json
+
+import pytest
+
+from src.scoutconnect import tracing
+from src.scoutconnect.tracing import SpanExporter, otlp_payload
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    exporter = SpanExporter(kind="file", path=str(path))
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+
+    def read():
+        exporter.flush()
+        return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+    return read
+
+
+def test_request_phases_are_nested_spans(client, coach_headers, trace_file):
+    client.get("/players", headers=coach_headers)
+    spans = trace_file()
+    root = next(s for s in spans if s["name"] == "GET /players")
+    trace = [s for s in spans if s["trace_id"] == root["trace_id"]]
+    by_id = {s["span_id"]: s for s in trace}
+    names = {s["name"] for s in trace}
+    assert {"fastapi.dependencies", "auth.jwt_decode", "auth.get_user", "players.query",
+            "fastapi.serialize", "db.execute"} <= names
+
+    def ancestors(s):
+        while s["parent_span_id"] in by_id:
+            s = by_id[s["parent_span_id"]]
+            yield s["name"]
+
+    get_user = next(s for s in trace if s["name"] == "auth.get_user")
+    assert "fastapi.dependencies" in ancestors(get_user)
+    query = next(s for s in trace if s["name"] == "players.query")
+    assert any(s["name"] == "db.execute" and s["parent_span_id"] == query["span_id"] for s in trace)
+
+
+def test_unsampled_requests_record_nothing(client, coach_headers, trace_file, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    client.get("/players", headers=coach_headers)
+    assert not any(s["name"] == "GET /players" for s in trace_file())
+
+
+def test_traceparent_continues_the_callers_trace(client, coach_headers, trace_file):
+    parent = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+    client.get("/players", headers={**coach_headers, "traceparent": parent})
+    root = next(s for s in trace_file() if s["name"] == "GET /players")
+    assert root["trace_id"] == "a" * 32
+    assert root["parent_span_id"] == "b" * 16
+    # Continuing a caller's trace doesn't make the request root an internal span
+    assert otlp_payload([root])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["kind"] == 2
+
+
+def test_phase_spans_leave_fastapi_untouched():
+    from fastapi import routing
+
+    assert not hasattr(routing.solve_dependencies, "__wrapped__")
+    assert not hasattr(routing.serialize_response, "__wrapped__")
+
+
+def test_otlp_payload_shape():
+    spans = [{
+        "trace_id": "a" * 32, "span_id": "b" * 16, "parent_span_id": None, "name": "GET /players", "kind": "server",
+        "start_ns": 1, "end_ns": 2, "attributes": {"http.status_code": 200}, "error": None,
+    }]
+    otlp_span = otlp_payload(spans)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["traceId"] == "a" * 32
+    assert "parentSpanId" not in otlp_span
+    assert otlp_span["kind"] == 2
+    assert otlp_span["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
@@ -0,0 +1,62 @@
+"""
+Tests for the group-commit write queue
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.scoutconnect.players import insert_player
+from src.scoutconnect.writes import WriteQueue
+from models import Player
+
+
+def add_player(first_name, external_id):
+    return lambda session: insert_player(session, {
+        "first_name": first_name, "last_name": "Queue", "sport": "soccer", "external_id": external_id,
+    })
+
+
+def test_concurrent_writes_share_one_commit(session_factory):
+    engine = session_factory.kw["bind"]
+    # What SQLite itself runs, including the transaction statements the driver sends
+    statements = []
+    raw = engine.raw_connection()
+    raw.dbapi_connection.set_trace_callback(statements.append)
+    raw.close()
+
+    async def scenario():
+        queue = WriteQueue(session_factory)
+        await queue.start()
+        with session_factory() as db:
+            results = await asyncio.gather(
+                *[queue.run(db, add_player(f"P{i}", f"ext-{i}")) for i in range(20)],
+                queue.run(db, add_player("Dup", "ext-0")),
+                return_exceptions=True,
+            )
+        await queue.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert [p["first_name"] for p in results[:20]] == [f"P{i}" for i in range(20)]
+    assert all(p["id"] and p["created_at"] for p in results[:20])
+    # The duplicate fails alone; everything else landed in a single transaction
+    assert isinstance(results[20], IntegrityError)
+    transaction = [s.split()[0] for s in statements if s.split()[0] in ("BEGIN", "COMMIT", "RELEASE")]
+    assert transaction[0] == "BEGIN" and transaction[-1] == "COMMIT"
+    assert transaction.count("BEGIN") == 1 and transaction.count("COMMIT") == 1
+    with session_factory() as db:
+        assert db.query(Player).count() == 20
+
+
+def test_direct_path_when_not_running(session_factory):
+    async def scenario():
+        queue = WriteQueue(session_factory)
+        with session_factory() as db:
+            player = await queue.run(db, add_player("Solo", "ext-1"))
+            assert player["id"] is not None
+            with pytest.raises(IntegrityError):
+                await queue.run(db, add_player("Again", "ext-1"))
+
+    asyncio.run(scenario())